@@ -0,0 +1,80 @@
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from crud.gameSchedule import schedule_index
+from crud.seasonRepo import current_season
+from crud.versionRepo import bump_table_version
+from models.archive import ArchivedGame
+from models.game import Game as GameModel
+
+# Finished games are archived once they are this old, unless they belong to
+# the current season
+ARCHIVE_HORIZON_DAYS = int(os.getenv("ARCHIVE_HORIZON_DAYS", "365"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+
+GAME_COLUMNS = [column.name for column in GameModel.__table__.columns]
+
+
+def archive_batch(db: Session, cutoff: datetime, season: str, batch_size: int) -> int:
+    """Move up to batch_size archivable games in one transaction; return how many.
+
+    The rows are copied and deleted under a row lock, skipping games that a
+    request is updating, so a batch either moves completely or not at all.
+    """
+    ids = db.scalars(
+        select(GameModel.id)
+        .where(
+            GameModel.finished.is_(True),
+            GameModel.date_time < cutoff,
+            GameModel.season != season,
+        )
+        .order_by(GameModel.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not ids:
+        db.rollback()
+        return 0
+
+    games = GameModel.__table__
+    db.execute(
+        insert(ArchivedGame).from_select(
+            GAME_COLUMNS,
+            select(*(games.c[name] for name in GAME_COLUMNS)).where(games.c.id.in_(ids)),
+        )
+    )
+    db.execute(delete(GameModel).where(GameModel.id.in_(ids)))
+    bump_table_version(db, GameModel.__tablename__)
+    bump_table_version(db, ArchivedGame.__tablename__)
+    db.commit()
+    schedule_index.invalidate()
+
+    return len(ids)
+
+
+def archive_games(
+    db: Session,
+    now: Optional[datetime] = None,
+    horizon_days: int = ARCHIVE_HORIZON_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> int:
+    """Archive finished games of past seasons older than horizon_days.
+
+    Every batch commits on its own and the games to move are found from the
+    table contents, so a run that stops halfway is resumed by running it
+    again. Standings are left alone: they already count these games.
+    """
+    now = now or datetime.now()
+    cutoff = now - timedelta(days=horizon_days)
+    season = current_season(now)
+
+    archived = 0
+    while True:
+        moved = archive_batch(db, cutoff, season, batch_size)
+        archived += moved
+        if moved < batch_size:
+            return archived
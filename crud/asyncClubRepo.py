@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud import clubRepo
+from crud.imageRepo import create_image, update_image
+from schemas.club import ClubCreate, ClubUpdate
+
+# Like asyncGameRepo, the database work is clubRepo's, run on the
+# AsyncSession's connection with run_sync. Only the image upload between
+# the two writes is awaited here, so the row is never locked while it runs.
+
+
+async def create_club(new_club: ClubCreate, image: UploadFile, db: AsyncSession):
+    if image is None:
+        raise HTTPException(status_code=400, detail="Image file is required")
+
+    club = await db.run_sync(lambda session: clubRepo.add_club(new_club, session))
+    img_path = await create_image(image, f"clubs/{club.id}")
+
+    return await db.run_sync(
+        lambda session: clubRepo.save_club(club, session, image=f"{img_path}")
+    )
+
+
+async def update_club(
+    club_id: int, club_data: ClubUpdate, image: Optional[UploadFile], db: AsyncSession
+):
+    club = await db.run_sync(lambda session: clubRepo.get_club_by_id(club_id, session))
+
+    img_path = None
+    if image:
+        img_path = f"/{await update_image(image, f'clubs/{club_id}')}"
+
+    return await db.run_sync(
+        lambda session: clubRepo.save_club(club, session, club_data, img_path)
+    )
@@ -0,0 +1,27 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud import gameRepo
+from schemas.game import GameCreate, GameUpdate
+
+# The game repository keeps several tables in step with every write
+# (standings, version stamps, booking checks). Rather than duplicate that
+# logic, these variants run the sync repository on the AsyncSession's
+# connection with run_sync: the code is the same, but each database round
+# trip awaits the async driver instead of blocking the event loop.
+#
+# Only writes go through here: reads use the read session, which routes
+# SELECTs to the replicas that the async engine does not know about.
+
+
+async def create_game(new_game: GameCreate, db: AsyncSession):
+    return await db.run_sync(lambda session: gameRepo.create_game(new_game, session))
+
+
+async def update_game(game_id: int, game_data: GameUpdate, db: AsyncSession):
+    return await db.run_sync(
+        lambda session: gameRepo.update_game(game_id, game_data, session)
+    )
+
+
+async def delete_game(game_id: int, db: AsyncSession):
+    return await db.run_sync(lambda session: gameRepo.delete_game(game_id, session))
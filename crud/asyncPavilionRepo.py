@@ -0,0 +1,45 @@
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud import pavilionRepo
+from crud.imageRepo import create_image, update_image
+from schemas.pavilion import CreatePavilion, UpdatePavilion
+
+# See asyncClubRepo: pavilionRepo does the database work through run_sync.
+
+
+async def create_pavilion(
+    new_pavilion: CreatePavilion, image: UploadFile, db: AsyncSession
+):
+    if image is None:
+        raise HTTPException(status_code=400, detail="Image file is required")
+
+    pavilion = await db.run_sync(
+        lambda session: pavilionRepo.add_pavilion(new_pavilion, session)
+    )
+    img_path = await create_image(image, f"pavilions/{pavilion.id}")
+
+    return await db.run_sync(
+        lambda session: pavilionRepo.save_pavilion(pavilion, session, image=f"{img_path}")
+    )
+
+
+async def update_pavilion(
+    pavilion_id: int,
+    pavilion_data: UpdatePavilion,
+    image: Optional[UploadFile],
+    db: AsyncSession,
+):
+    pavilion = await db.run_sync(
+        lambda session: pavilionRepo.get_pavilion_by_id(pavilion_id, session)
+    )
+
+    img_path = None
+    if image:
+        img_path = f"/{await update_image(image, f'pavilions/{pavilion_id}')}"
+
+    return await db.run_sync(
+        lambda session: pavilionRepo.save_pavilion(pavilion, session, pavilion_data, img_path)
+    )
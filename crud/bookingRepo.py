@@ -0,0 +1,143 @@
+import os
+from collections import defaultdict
+from datetime import timedelta
+
+from fastapi import HTTPException, status
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from models.club import Club as ClubModel
+from models.game import Game as GameModel
+from models.pavilion import Pavilion as PavilionModel
+
+# How long a game occupies its pavilion and clubs
+GAME_DURATION = timedelta(minutes=int(os.getenv("GAME_DURATION_MINUTES", "120")))
+
+
+def booked_resources(game):
+    resources = {("pavilion", game.pavilion_id)}
+    resources.update(("club", club_id) for club_id in (game.club_home_id, game.club_visitor_id))
+    return resources
+
+
+def lock_resources(db: Session, pavilion_ids, club_ids):
+    """Lock the pavilion and club rows until the transaction ends.
+
+    Rows are locked pavilions first, each table in id order, so that two
+    writers never wait on each other in opposite orders.
+    """
+    for model, ids in ((PavilionModel, pavilion_ids), (ClubModel, club_ids)):
+        db.execute(
+            select(model.id).where(model.id.in_(sorted(ids))).order_by(model.id).with_for_update()
+        )
+
+
+def find_conflicts(candidates, db: Session, exclude_ids=()):
+    """Find every double booking involving the candidate games in one pass.
+
+    candidates are (key, game) pairs where game has date_time, pavilion_id,
+    club_home_id and club_visitor_id. Two games conflict when they share the
+    pavilion or a club and start less than GAME_DURATION apart, whatever
+    their season. Existing games are read with one range scan of the
+    date_time index over the window spanned by the batch; conflicts between
+    candidates of the same batch are found too. exclude_ids are existing
+    games that the candidates replace.
+
+    Call it in the transaction that writes the candidates: it first locks
+    the rows of the pavilions and clubs they book. Two bookings can only
+    conflict by sharing one of these, so a concurrent writer of an
+    overlapping game waits until this transaction ends and then sees its
+    game. No double booking commits.
+    """
+    candidates = list(candidates)
+    if not candidates:
+        return []
+
+    times = [game.date_time for _, game in candidates]
+    lower, upper = min(times) - GAME_DURATION, max(times) + GAME_DURATION
+    pavilion_ids = {game.pavilion_id for _, game in candidates}
+    club_ids = {game.club_home_id for _, game in candidates} | {
+        game.club_visitor_id for _, game in candidates
+    }
+    lock_resources(db, pavilion_ids, club_ids)
+
+    columns = (
+        GameModel.id,
+        GameModel.date_time,
+        GameModel.pavilion_id,
+        GameModel.club_home_id,
+        GameModel.club_visitor_id,
+    )
+    query = select(*columns).where(
+        GameModel.date_time > lower,
+        GameModel.date_time < upper,
+        or_(
+            GameModel.pavilion_id.in_(pavilion_ids),
+            GameModel.club_home_id.in_(club_ids),
+            GameModel.club_visitor_id.in_(club_ids),
+        ),
+    )
+    existing = {
+        row.id: row for row in db.execute(query).all() if row.id not in exclude_ids
+    }
+
+    # Bucket every game by the pavilion and clubs it occupies, then sweep
+    # each bucket in start order: only neighbours closer than GAME_DURATION
+    # can overlap.
+    buckets = defaultdict(list)
+    for game_id, game in existing.items():
+        for resource in booked_resources(game):
+            buckets[resource].append((game.date_time, False, game_id))
+    for key, game in candidates:
+        for resource in booked_resources(game):
+            buckets[resource].append((game.date_time, True, key))
+
+    conflicts = []
+    for (kind, resource_id), entries in buckets.items():
+        entries.sort(key=lambda entry: entry[0])
+        for i, (start, is_candidate, key) in enumerate(entries):
+            for other_start, other_is_candidate, other_key in entries[i + 1 :]:
+                if other_start - start >= GAME_DURATION:
+                    break
+                if not is_candidate and not other_is_candidate:
+                    continue
+                first, second = (
+                    ((key, is_candidate), (other_key, other_is_candidate))
+                    if is_candidate
+                    else ((other_key, other_is_candidate), (key, is_candidate))
+                )
+                conflicts.append(
+                    {
+                        "key": first[0],
+                        "conflicting_game_id": None if second[1] else second[0],
+                        "conflicting_key": second[0] if second[1] else None,
+                        "resource": kind,
+                        "resource_id": resource_id,
+                    }
+                )
+
+    return conflicts
+
+
+def describe_conflict(conflict) -> str:
+    if conflict["conflicting_game_id"] is not None:
+        other = f"game {conflict['conflicting_game_id']}"
+    else:
+        other = f"row {conflict['conflicting_key']}"
+    return f"{conflict['resource']} {conflict['resource_id']} is already booked by {other}"
+
+
+def ensure_no_conflicts(game, db: Session, exclude_ids=()):
+    conflicts = find_conflicts([(None, game)], db, exclude_ids)
+    if conflicts:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=[
+                {
+                    "resource": conflict["resource"],
+                    "resource_id": conflict["resource_id"],
+                    "conflicting_game_id": conflict["conflicting_game_id"],
+                }
+                for conflict in conflicts
+            ],
+        )
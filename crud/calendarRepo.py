@@ -0,0 +1,127 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from crud.bookingRepo import GAME_DURATION
+from crud.clubRepo import get_club_by_id, get_games_by_club_id
+from models.club import Club as ClubModel
+from models.pavilion import Pavilion as PavilionModel
+
+ICS_MAX_LINE_OCTETS = 75
+
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    # RFC 5545 3.1: lines longer than 75 octets continue on lines starting with a space
+    encoded = line.encode()
+    if len(encoded) <= ICS_MAX_LINE_OCTETS:
+        return line + "\r\n"
+
+    parts = []
+    start = 0
+    limit = ICS_MAX_LINE_OCTETS
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split a UTF-8 sequence
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start = end
+        limit = ICS_MAX_LINE_OCTETS - 1
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _format_datetime(value: datetime) -> str:
+    # Game times are stored as local wall-clock times, so they are emitted floating
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def get_club_calendar(club_id: int, db: Session, season: Optional[str] = None):
+    """Load everything the feed needs up front and return a line generator.
+
+    The rows are read before streaming starts, so the generator never touches
+    the session after the request dependency has closed it.
+    """
+    club = get_club_by_id(club_id, db)
+    games = get_games_by_club_id(club_id, db, season=season)
+
+    club_names = {}
+    pavilions = {}
+    if games:
+        club_ids = {game.club_home_id for game in games} | {
+            game.club_visitor_id for game in games
+        }
+        club_names = dict(
+            db.query(ClubModel.id, ClubModel.name).filter(ClubModel.id.in_(club_ids))
+        )
+        pavilions = {
+            pavilion_id: (name, location)
+            for pavilion_id, name, location in db.query(
+                PavilionModel.id, PavilionModel.name, PavilionModel.location
+            ).filter(PavilionModel.id.in_({game.pavilion_id for game in games}))
+        }
+
+    events = [
+        (
+            game.id,
+            game.date_time,
+            game.updated_at,
+            club_names.get(game.club_home_id, ""),
+            club_names.get(game.club_visitor_id, ""),
+            game.score_home if game.finished else None,
+            game.score_visitor if game.finished else None,
+            pavilions.get(game.pavilion_id),
+        )
+        for game in games
+    ]
+
+    return render_calendar(club.name, events)
+
+
+def render_calendar(calendar_name: str, events):
+    now = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    yield _fold("BEGIN:VCALENDAR")
+    yield _fold("VERSION:2.0")
+    yield _fold("PRODID:-//ClubSync//Game Microservice//PT")
+    yield _fold("CALSCALE:GREGORIAN")
+    yield _fold("METHOD:PUBLISH")
+    yield _fold(f"X-WR-CALNAME:{_escape(calendar_name)}")
+
+    for (
+        game_id,
+        date_time,
+        updated_at,
+        home,
+        visitor,
+        score_home,
+        score_visitor,
+        pavilion,
+    ) in events:
+        if score_home is not None and score_visitor is not None:
+            summary = f"{home} {score_home} - {score_visitor} {visitor}"
+        else:
+            summary = f"{home} vs {visitor}"
+        stamp = updated_at.strftime("%Y%m%dT%H%M%SZ") if updated_at else now
+
+        yield _fold("BEGIN:VEVENT")
+        yield _fold(f"UID:game-{game_id}@clubsync")
+        yield _fold(f"DTSTAMP:{stamp}")
+        yield _fold(f"DTSTART:{_format_datetime(date_time)}")
+        yield _fold(f"DTEND:{_format_datetime(date_time + GAME_DURATION)}")
+        yield _fold(f"SUMMARY:{_escape(summary)}")
+        if pavilion is not None:
+            name, location = pavilion
+            yield _fold(f"LOCATION:{_escape(f'{name}, {location}')}")
+        yield _fold("END:VEVENT")
+
+    yield _fold("END:VCALENDAR")
@@ -0,0 +1,74 @@
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from crud.versionRepo import bump_table_version
+from models.change import Change as ChangeModel
+from schemas.club import ClubInDB
+from schemas.game import GameInDB
+from schemas.pavilion import PavilionInDB
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+ENTITY_SCHEMAS = {
+    "game": GameInDB,
+    "club": ClubInDB,
+    "pavilion": PavilionInDB,
+}
+
+
+def record_changes(db: Session, entity: str, rows, operation: str = UPSERT):
+    """Append rows to the change log; call before the commit of the write.
+
+    Upserts carry the new state of the row, deletes are tombstones without
+    data. Every writer bumps the same version row first, so the row lock
+    orders concurrent writers: change ids are assigned and committed in the
+    same order, and a consumer that has read up to an id never misses a
+    smaller one committed later.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+
+    # New rows need their ids
+    db.flush()
+    bump_table_version(db, ChangeModel.__tablename__)
+
+    schema = ENTITY_SCHEMAS[entity]
+    db.execute(
+        insert(ChangeModel),
+        [
+            {
+                "entity": entity,
+                "entity_id": row.id,
+                "operation": operation,
+                "data": None
+                if operation == DELETE
+                else schema.model_validate(row, from_attributes=True).model_dump(mode="json"),
+            }
+            for row in rows
+        ],
+    )
+
+
+def record_change(db: Session, entity: str, row, operation: str = UPSERT):
+    record_changes(db, entity, [row], operation)
+
+
+def get_changes(db: Session, since: int = 0, limit: int = 100, entity: Optional[str] = None):
+    query = db.query(ChangeModel).filter(ChangeModel.id > since)
+    if entity is not None:
+        query = query.filter(ChangeModel.entity == entity)
+
+    # One extra row tells whether there is another page
+    changes = query.order_by(ChangeModel.id).limit(limit + 1).all()
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    return {
+        "changes": changes,
+        "next_since": changes[-1].id if changes else since,
+        "has_more": has_more,
+    }
@@ -2,59 +2,81 @@ import os
 from datetime import datetime
 from typing import Optional
 
-import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, UploadFile, status
 from sqlalchemy import asc
 from sqlalchemy.orm import Session
 from starlette.datastructures import UploadFile as StarletteUploadFile
 
-from crud.imageRepo import create_image, update_image
+from crud.gameRepo import after_game_cursor, games_of_club
+from crud.changeRepo import DELETE, record_change
+from crud.imageRepo import (create_image, delete_image_folder, s3_executor,
+                             update_image)
+from crud.versionRepo import bump_table_version
 from db.database import get_db
 from models.club import Club as ClubModel
+from models.game import Game as GameModel
 from models.pavilion import Pavilion as PavilionModel
+from models.standing import Standing as StandingModel
 from schemas.club import ClubCreate, ClubUpdate
 
 load_dotenv()
 
-AWS_S3_BUCKET = os.getenv("AWS_S3_BUCKET")
-S3_REGION_NAME = os.getenv("AWS_REGION")
-S3_ACCESS_KEY = os.getenv("AWS_ACCESS_KEY_ID")
-S3_SECRET_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
-
-s3_client = boto3.client(
-    "s3",
-    region_name=S3_REGION_NAME,
-    aws_access_key_id=S3_ACCESS_KEY,
-    aws_secret_access_key=S3_SECRET_KEY,
-)
 
 club_not_found_exception = HTTPException(
     status_code=status.HTTP_404_NOT_FOUND, detail="Club not found"
 )
 
 
-async def create_club(new_club: ClubCreate, image: UploadFile, db: Session):
-    if image is None:
-        raise HTTPException(status_code=400, detail="Image file is required")
-
+def add_club(new_club: ClubCreate, db: Session):
+    """Insert and log new_club without an image; its image folder needs the id."""
     new_club_record = ClubModel(
         name=new_club.name,
         pavilion_id=new_club.pavilion_id,
         image="",  # Temporariamente vazio
     )
     db.add(new_club_record)
+    # Logged in the same commit, so a club whose image then fails is still
+    # in /changes and moves the ETag
+    record_change(db, "club", new_club_record)
+    bump_table_version(db, ClubModel.__tablename__)
     db.commit()
     db.refresh(new_club_record)  # Agora temos o ID do clube
 
-    img_path = await create_image(image, f"clubs/{new_club_record.id}")
+    return new_club_record
+
+
+def save_club(
+    club: ClubModel,
+    db: Session,
+    club_data: Optional[ClubUpdate] = None,
+    image: Optional[str] = None,
+):
+    """Apply club_data and image to club, log the change and commit."""
+    if image is not None:
+        club.image = image
+
+    if club_data is not None:
+        for key, value in club_data.dict(exclude_unset=True).items():
+            if value is not None:
+                setattr(club, key, value)
 
-    new_club_record.image = f"{img_path}"
+    record_change(db, "club", club)
+    bump_table_version(db, ClubModel.__tablename__)
     db.commit()
-    db.refresh(new_club_record)
+    db.refresh(club)
 
-    return new_club_record
+    return club
+
+
+async def create_club(new_club: ClubCreate, image: UploadFile, db: Session):
+    if image is None:
+        raise HTTPException(status_code=400, detail="Image file is required")
+
+    new_club_record = add_club(new_club, db)
+    img_path = await create_image(image, f"clubs/{new_club_record.id}")
+
+    return save_club(new_club_record, db, image=f"{img_path}")
 
 
 def get_club_by_id(club_id: int, db: Session):
@@ -75,23 +97,13 @@ def get_all_clubs(db: Session):
 async def update_club(
     club_id: int, club_data: ClubUpdate, image: Optional[UploadFile], db: Session
 ):
-    club = db.query(ClubModel).filter(ClubModel.id == club_id).first()
-
-    if not club:
-        raise club_not_found_exception
+    club = get_club_by_id(club_id, db)
 
+    img_path = None
     if image:
-        img_path = await update_image(image, f"clubs/{club_id}")
-        club.image = f"/{img_path}"
+        img_path = f"/{await update_image(image, f'clubs/{club_id}')}"
 
-    for key, value in club_data.dict(exclude_unset=True).items():
-        if value is not None:
-            setattr(club, key, value)
-
-    db.commit()
-    db.refresh(club)
-
-    return club
+    return save_club(club, db, club_data, img_path)
 
 
 def delete_club(club_id: int, db: Session):
@@ -100,22 +112,17 @@ def delete_club(club_id: int, db: Session):
     if not club:
         raise club_not_found_exception
 
-    if club.image:
-        # O campo 'image' armazena a URL completa da imagem no bucket S3
-        image_url = club.image
-        # Extrai a chave do objeto S3 da URL
-        image_key = image_url.split(f"{AWS_S3_BUCKET}/")[-1]
-
-        try:
-            s3_client.delete_object(Bucket=AWS_S3_BUCKET, Key=image_key)
-        except ClientError as e:
-            raise HTTPException(
-                status_code=400, detail=f"Error deleting image from S3: {e}"
-            )
-
+    db.query(StandingModel).filter(StandingModel.club_id == club_id).delete(
+        synchronize_session=False
+    )
+    record_change(db, "club", club, DELETE)
     db.delete(club)
+    bump_table_version(db, ClubModel.__tablename__)
     db.commit()
 
+    # Every variant of every image; in the background, like update_image
+    s3_executor.submit(delete_image_folder, f"clubs/{club_id}")
+
     return {"detail": "Club deleted successfully"}
 
 
@@ -135,3 +142,31 @@ def get_pavilion_by_club_id(club_id: int, db: Session):
         )
 
     return pavilion
+
+
+def get_games_by_club_id(
+    club_id: int,
+    db: Session,
+    season: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    get_club_by_id(club_id, db)
+
+    conditions = []
+    if season is not None:
+        conditions.append(GameModel.season == season)
+    if cursor is not None:
+        conditions.append(after_game_cursor(GameModel, cursor))
+
+    club_games = games_of_club(GameModel, club_id, conditions, limit)
+    query = db.query(club_games).order_by(
+        asc(club_games.date_time), asc(club_games.id)
+    )
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    games = query.all()
+
+    return games
@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from crud.gameRepo import bulk_create_games
+from crud.seasonRepo import season_for
+from models.club import Club as ClubModel
+from schemas.game import FixtureRequest, GameCreate
+
+
+def round_robin_rounds(club_ids, double_round_robin: bool = True):
+    """Rounds of (home, visitor) pairs using the polygon method.
+
+    With an odd number of clubs, club r rests in round r and the others meet
+    in pairs (r + k, r - k). Home advantage alternates with k, which gives
+    every club exactly the same number of home games. With an even number
+    of clubs, the last club plays whoever would rest, at home in even rounds,
+    so home counts differ by at most one. The second leg mirrors the first
+    with home and visitor swapped.
+    """
+    clubs = list(club_ids)
+    fixed = clubs.pop() if len(clubs) % 2 == 0 else None
+
+    n = len(clubs)
+    rounds = []
+    for r in range(n):
+        pairs = []
+        if fixed is not None:
+            pairs.append((fixed, clubs[r]) if r % 2 == 0 else (clubs[r], fixed))
+        for k in range(1, n // 2 + 1):
+            a, b = clubs[(r + k) % n], clubs[(r - k) % n]
+            pairs.append((a, b) if k % 2 else (b, a))
+        rounds.append(pairs)
+
+    if double_round_robin:
+        rounds += [[(visitor, home) for home, visitor in pairs] for pairs in rounds]
+
+    return rounds
+
+
+def generate_fixtures(request: FixtureRequest, db: Session):
+    club_ids = request.club_ids
+    if len(club_ids) < 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least two clubs are required",
+        )
+    if len(set(club_ids)) != len(club_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Duplicate club ids"
+        )
+
+    pavilions = dict(
+        db.query(ClubModel.id, ClubModel.pavilion_id).filter(
+            ClubModel.id.in_(club_ids)
+        )
+    )
+    missing = [club_id for club_id in club_ids if club_id not in pavilions]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Clubs not found: {', '.join(map(str, missing))}",
+        )
+
+    rounds = round_robin_rounds(club_ids, request.double_round_robin)
+
+    if request.slots is not None:
+        if len(request.slots) < len(rounds):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{len(rounds)} slots are required, got {len(request.slots)}",
+            )
+        slots = sorted(request.slots)[: len(rounds)]
+    else:
+        if request.start_date is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Either start_date or slots is required",
+            )
+        step = timedelta(days=request.days_between_rounds)
+        slots = [request.start_date + step * i for i in range(len(rounds))]
+
+    # The whole fixture list belongs to one season, even if it runs past the
+    # season boundary
+    season = request.season or season_for(slots[0])
+
+    return [
+        GameCreate(
+            season=season,
+            jornada=jornada,
+            date_time=date_time,
+            club_home_id=home,
+            club_visitor_id=visitor,
+            pavilion_id=pavilions[home],
+            finished=False,
+        )
+        for jornada, (pairs, date_time) in enumerate(zip(rounds, slots), start=1)
+        for home, visitor in pairs
+    ]
+
+
+def create_fixtures(request: FixtureRequest, db: Session):
+    games = generate_fixtures(request, db)
+
+    return bulk_create_games(
+        ((index, game.dict()) for index, game in enumerate(games, start=1)), db
+    )
@@ -1,20 +1,85 @@
+import base64
+import binascii
+import csv
+import io
+import json
 from datetime import datetime
-
-from fastapi import Depends, HTTPException, status
-from sqlalchemy import asc
-from sqlalchemy.orm import Session
-
+from typing import Optional, Set
+
+from fastapi import Depends, HTTPException, UploadFile, status
+from pydantic import ValidationError
+from sqlalchemy import and_, asc, insert, or_, select, tuple_, union_all
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, aliased
+
+from crud.bookingRepo import (booked_resources, describe_conflict,
+                              ensure_no_conflicts, find_conflicts)
+from crud.changeRepo import DELETE, record_change, record_changes
+from crud.gameSchedule import schedule_index
+from crud.liveHub import live_hub
+from crud.outboxDispatcher import outbox_dispatcher
+from crud.outboxRepo import (GAME_CREATED, GAME_DELETED, GAME_UPDATED,
+                             add_game_event, add_game_events)
+from crud.seasonRepo import season_for
+from crud.standingRepo import (apply_new_results, apply_result_change,
+                               game_result)
+from crud.versionRepo import bump_table_version
 from db.database import get_db
+from models.archive import ArchivedGame
+from models.club import Club as ClubModel
 from models.game import Game as GameModel
-from schemas.game import GameCreate, GameUpdate
+from models.pavilion import Pavilion as PavilionModel
+from schemas.club import ClubInDB
+from schemas.game import GameCreate, GameInDB, GameUpdate
+from schemas.pavilion import PavilionInDB
+
+BULK_INSERT_BATCH_SIZE = 500
+
+EXPANDABLE = {"clubs", "pavilion"}
 
 game_not_found_exception = HTTPException(
     status_code=status.HTTP_404_NOT_FOUND, detail="Game not found"
 )
 
+invalid_cursor_exception = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+)
+
+
+def encode_game_cursor(game) -> str:
+    raw = f"{game.date_time.isoformat()}|{game.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_game_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date_time, game_id = raw.split("|")
+        return datetime.fromisoformat(date_time), int(game_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise invalid_cursor_exception
+
+
+def after_game_cursor(games, cursor: str):
+    """Condition for the games strictly after cursor in (date_time, id) order.
+
+    Spelled out rather than as a row constructor, which MySQL only turns into
+    a range on the leading key part when equality filters precede it in the
+    index (season = ? AND (date_time, id) > ...). The date_time >= bound is
+    redundant but lets every engine seek to the cursor.
+    """
+    date_time, game_id = decode_game_cursor(cursor)
+    return and_(
+        games.date_time >= date_time,
+        or_(games.date_time > date_time, and_(games.date_time == date_time, games.id > game_id)),
+    )
+
 
 def create_game(new_game: GameCreate, db: Session):
+    ensure_no_conflicts(new_game, db)
+
     db_game = GameModel(
+        season=new_game.season or season_for(new_game.date_time),
         jornada=new_game.jornada,
         score_home=new_game.score_home,
         score_visitor=new_game.score_visitor,
@@ -26,71 +91,402 @@ def create_game(new_game: GameCreate, db: Session):
     )
 
     db.add(db_game)
+    apply_result_change(db, new_result=game_result(db_game))
+    record_change(db, "game", db_game)
+    add_game_event(db, GAME_CREATED, db_game)
+    bump_table_version(db, GameModel.__tablename__)
     db.commit()
     db.refresh(db_game)
+    schedule_index.invalidate()
+    outbox_dispatcher.notify()
 
     return db_game
 
 
-def get_game_by_id(game_id: int, db: Session):
+def _iter_csv_rows(stream):
+    reader = csv.DictReader(stream)
+    # Row numbers count the header as row 1, like a spreadsheet would
+    for row_number, row in enumerate(reader, start=2):
+        yield row_number, {
+            key: (value if value != "" else None) for key, value in row.items()
+        }
+
+
+def _iter_ndjson_rows(stream):
+    for row_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, ValueError(f"Invalid JSON: {e.msg}")
+            continue
+        if not isinstance(row, dict):
+            yield row_number, ValueError("Each line must be a JSON object")
+            continue
+        yield row_number, row
+
+
+def _validation_detail(error: ValidationError):
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+def import_games(file: UploadFile, file_format: str, db: Session):
+    # Read the upload as a text stream so that only one row is in memory at a time
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    if file_format == "csv":
+        rows = _iter_csv_rows(stream)
+    elif file_format == "ndjson":
+        rows = _iter_ndjson_rows(stream)
+    else:
+        raise HTTPException(
+            status_code=400, detail="Unsupported format, use csv or ndjson"
+        )
+
+    try:
+        return bulk_create_games(rows, db)
+    finally:
+        stream.detach()
+
+
+def bulk_create_games(rows, db: Session):
+    """Insert (row_number, data) pairs in multi-row batches within one transaction.
+
+    Invalid or double-booked rows are skipped and reported; the valid ones are
+    committed together.
+    """
+    club_ids = {club_id for (club_id,) in db.query(ClubModel.id)}
+    pavilion_ids = {pavilion_id for (pavilion_id,) in db.query(PavilionModel.id)}
+
+    errors = {}
+    valid = []
+
+    for row_number, row in rows:
+        if isinstance(row, Exception):
+            errors[row_number] = str(row)
+            continue
+        try:
+            game = GameCreate(**row)
+        except (ValidationError, TypeError) as e:
+            detail = _validation_detail(e) if isinstance(e, ValidationError) else str(e)
+            errors[row_number] = detail
+            continue
+        if game.season is None:
+            game.season = season_for(game.date_time)
+
+        missing = [
+            f"{field} {value} does not exist"
+            for field, value, known in (
+                ("club_home_id", game.club_home_id, club_ids),
+                ("club_visitor_id", game.club_visitor_id, club_ids),
+                ("pavilion_id", game.pavilion_id, pavilion_ids),
+            )
+            if value not in known
+        ]
+        if missing:
+            errors[row_number] = "; ".join(missing)
+            continue
+
+        valid.append((row_number, game))
+
+    # Both rows of a conflict inside the batch are rejected: neither one wins,
+    # and each one's message names the other
+    for conflict in find_conflicts(valid, db):
+        errors.setdefault(conflict["key"], describe_conflict(conflict))
+        if conflict["conflicting_key"] is not None:
+            errors.setdefault(
+                conflict["conflicting_key"],
+                describe_conflict({**conflict, "conflicting_key": conflict["key"]}),
+            )
+
+    inserted = 0
+    batch = []
+    results = []
+    keys = []
+    try:
+        for row_number, game in valid:
+            if row_number in errors:
+                continue
+
+            values = game.dict()
+            values["finished"] = bool(values["finished"])
+            batch.append(values)
+            results.append(game_result(game))
+            keys.append((values["date_time"], values["club_home_id"]))
+
+            if len(batch) >= BULK_INSERT_BATCH_SIZE:
+                db.execute(insert(GameModel), batch)
+                inserted += len(batch)
+                batch = []
+
+        if batch:
+            db.execute(insert(GameModel), batch)
+            inserted += len(batch)
+
+        apply_new_results(db, results)
+        # Bulk inserts do not return ids; a club never has two games at the
+        # same time, so (date_time, club_home_id) finds the new rows
+        for start in range(0, len(keys), BULK_INSERT_BATCH_SIZE):
+            chunk = keys[start : start + BULK_INSERT_BATCH_SIZE]
+            games = (
+                db.query(GameModel)
+                .filter(tuple_(GameModel.date_time, GameModel.club_home_id).in_(chunk))
+                .order_by(GameModel.id)
+                .all()
+            )
+            record_changes(db, "game", games)
+            add_game_events(db, GAME_CREATED, games)
+        if inserted:
+            bump_table_version(db, GameModel.__tablename__)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Bulk import failed")
+
+    if inserted:
+        schedule_index.invalidate()
+        outbox_dispatcher.notify()
+
+    return {
+        "inserted": inserted,
+        "errors": [
+            {"row": row_number, "detail": detail}
+            for row_number, detail in sorted(errors.items())
+        ],
+    }
+
+
+def get_game_by_id(game_id: int, db: Session, include_archived: bool = False):
     game = db.query(GameModel).filter(GameModel.id == game_id).first()
 
+    if not game and include_archived:
+        game = db.query(ArchivedGame).filter(ArchivedGame.id == game_id).first()
+
     if not game:
         raise game_not_found_exception
 
     return game
 
 
-def get_next_game(db: Session):
-    current_time = datetime.now()
-
-    next_game = (
-        db.query(GameModel)
-        .filter(GameModel.date_time > current_time)
-        .order_by(asc(GameModel.date_time))
-        .first()
+def live_and_archived_games():
+    """Game entity over the union of the games and games_archive tables."""
+    columns = [column.name for column in GameModel.__table__.columns]
+    archive = ArchivedGame.__table__
+    union = union_all(
+        select(GameModel.__table__),
+        select(*(archive.c[name] for name in columns)),
     )
-
-    return next_game
-
-
-def get_all_games(db: Session):
-    games = db.query(GameModel).all()
+    return aliased(GameModel, union.subquery())
+
+
+def games_of_club(games, club_id: int, conditions=(), limit: Optional[int] = None):
+    """Game entity over the games of club_id that match conditions.
+
+    One indexed range scan per side instead of an OR over both club columns;
+    with a limit, each side stops after limit rows in (date_time, id) order.
+    """
+    branches = []
+    for branch in (
+        select(games).where(games.club_home_id == club_id),
+        # A game against itself is only listed once
+        select(games).where(
+            games.club_visitor_id == club_id, games.club_home_id != club_id
+        ),
+    ):
+        branch = branch.where(*conditions)
+        if limit is not None:
+            branch = branch.order_by(asc(games.date_time), asc(games.id)).limit(limit)
+        branches.append(branch.subquery().select())
+
+    return aliased(GameModel, union_all(*branches).subquery())
+
+
+def get_next_game(db: Session, season: str):
+    return schedule_index.get_next(db, season)
+
+
+def get_all_games(
+    db: Session,
+    season: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    jornada: Optional[int] = None,
+    club_id: Optional[int] = None,
+    pavilion_id: Optional[int] = None,
+    finished: Optional[bool] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    include_archived: bool = False,
+):
+    # The archive is only read when asked for; MySQL pushes the filters
+    # below down into both halves of the union
+    games = live_and_archived_games() if include_archived else GameModel
+
+    conditions = []
+    if season is not None:
+        conditions.append(games.season == season)
+    if jornada is not None:
+        conditions.append(games.jornada == jornada)
+    if pavilion_id is not None:
+        conditions.append(games.pavilion_id == pavilion_id)
+    if finished is not None:
+        conditions.append(games.finished == finished)
+    if date_from is not None:
+        conditions.append(games.date_time >= date_from)
+    if date_to is not None:
+        conditions.append(games.date_time < date_to)
+
+    # Keyset pagination: resume strictly after the (date_time, id) of the last
+    # game of the previous page, so every page is an index range scan. The
+    # equality filters are the prefix of an index and the cursor a range on
+    # its (date_time, id) tail: season alone uses ix_games_season_date_time_id,
+    # season with jornada, pavilion_id, finished or a club column (one per
+    # union branch) uses ix_games_season_<column>_date_time_id, and no filter
+    # ix_games_date_time_id.
+    if cursor is not None:
+        conditions.append(after_game_cursor(games, cursor))
+
+    if club_id is not None:
+        games = games_of_club(games, club_id, conditions, limit)
+        query = db.query(games)
+    else:
+        query = db.query(games).filter(*conditions)
+
+    query = query.order_by(asc(games.date_time), asc(games.id))
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    games = query.all()
 
     return games
 
 
-def get_all_games_except_next(db: Session):
-    next_game = get_next_game(db)
-
-    games = db.query(GameModel).filter(GameModel.id != next_game.id).all()
-
-    return games
+def parse_expand(expand: Optional[str]) -> Set[str]:
+    if not expand:
+        return set()
+
+    fields = {field.strip() for field in expand.split(",") if field.strip()}
+    unknown = fields - EXPANDABLE
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot expand: {', '.join(sorted(unknown))}",
+        )
+
+    return fields
+
+
+def expand_games(games, expand: Set[str], db: Session):
+    """Inline the clubs and/or pavilion of each game.
+
+    Related rows are fetched with one IN query per table for the whole list,
+    however many games there are.
+    """
+    if not expand:
+        return games
+
+    clubs = {}
+    if "clubs" in expand:
+        club_ids = {game.club_home_id for game in games} | {
+            game.club_visitor_id for game in games
+        }
+        if club_ids:
+            clubs = {
+                club.id: ClubInDB.model_validate(club, from_attributes=True)
+                for club in db.query(ClubModel).filter(ClubModel.id.in_(club_ids))
+            }
+
+    pavilions = {}
+    if "pavilion" in expand:
+        pavilion_ids = {game.pavilion_id for game in games}
+        if pavilion_ids:
+            pavilions = {
+                pavilion.id: PavilionInDB.model_validate(
+                    pavilion, from_attributes=True
+                )
+                for pavilion in db.query(PavilionModel).filter(
+                    PavilionModel.id.in_(pavilion_ids)
+                )
+            }
+
+    expanded = []
+    for game in games:
+        item = GameInDB.model_validate(game, from_attributes=True).dict()
+        if "clubs" in expand:
+            item["club_home"] = clubs.get(game.club_home_id)
+            item["club_visitor"] = clubs.get(game.club_visitor_id)
+        if "pavilion" in expand:
+            item["pavilion"] = pavilions.get(game.pavilion_id)
+        expanded.append(item)
+
+    return expanded
+
+
+def get_all_games_except_next(db: Session, season: str):
+    return schedule_index.get_all_except_next(db, season)
 
 
 def update_game(game_id: int, game_data: GameUpdate, db: Session):
-    game = db.query(GameModel).filter(GameModel.id == game_id).first()
+    game = (
+        db.query(GameModel).filter(GameModel.id == game_id).with_for_update().first()
+    )
 
     if not game:
         raise game_not_found_exception
 
+    old_result = game_result(game)
+    old_booking = (game.date_time, booked_resources(game))
+
     for key, value in game_data.dict(exclude_unset=True).items():
         if value is not None:
             setattr(game, key, value)
 
+    if (game.date_time, booked_resources(game)) != old_booking:
+        ensure_no_conflicts(game, db, exclude_ids={game.id})
+
+    new_result = game_result(game)
+    apply_result_change(db, old_result, new_result)
+    record_change(db, "game", game)
+    add_game_event(db, GAME_UPDATED, game)
+    bump_table_version(db, GameModel.__tablename__)
     db.commit()
     db.refresh(game)
+    schedule_index.invalidate()
+    outbox_dispatcher.notify()
+
+    # finished, score_home and score_visitor lead both result snapshots
+    if old_result[:3] != new_result[:3]:
+        live_hub.publish(
+            {
+                "id": game.id,
+                "score_home": game.score_home,
+                "score_visitor": game.score_visitor,
+                "finished": game.finished,
+            }
+        )
 
     return game
 
 
 def delete_game(game_id: int, db: Session):
-    game = db.query(GameModel).filter(GameModel.id == game_id).first()
+    game = (
+        db.query(GameModel).filter(GameModel.id == game_id).with_for_update().first()
+    )
 
     if not game:
         raise game_not_found_exception
 
+    apply_result_change(db, old_result=game_result(game))
+    record_change(db, "game", game, DELETE)
+    add_game_event(db, GAME_DELETED, game)
     db.delete(game)
+    bump_table_version(db, GameModel.__tablename__)
     db.commit()
+    schedule_index.invalidate()
+    outbox_dispatcher.notify()
 
     return {"detail": "Game deleted successfully"}
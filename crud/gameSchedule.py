@@ -0,0 +1,120 @@
+import threading
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import asc
+from sqlalchemy.orm import Session
+
+from crud.versionRepo import get_table_version
+from models.game import Game as GameModel
+from schemas.game import GameInDB
+
+
+# Seasons kept in memory at once; normally just the current one and
+# perhaps the previous one
+MAX_CACHED_SEASONS = 4
+
+
+class _SeasonSnapshot:
+    def __init__(self, games: List[GameInDB]):
+        self.games = games
+        self.keys: List[datetime] = [game.date_time for game in games]
+        self.next_pos = 0
+        self.except_next: Optional[List[GameInDB]] = None
+
+    def advance(self, now: datetime) -> int:
+        # Caller holds the lock. The first game strictly after now is next.
+        pos = self.next_pos
+        if pos < len(self.keys) and self.keys[pos] <= now:
+            pos = bisect_right(self.keys, now, lo=pos)
+        if pos != self.next_pos:
+            self.next_pos = pos
+            self.except_next = None
+        return pos
+
+
+class GameScheduleIndex:
+    """In-process, date-ordered snapshots of the games of recent seasons.
+
+    Answers "next game" and "all games except the next one" of a season from
+    memory. The snapshots are dropped by invalidate() after every game write
+    in this process and whenever the games table version moves, which also
+    picks up writes made by other workers at the cost of a primary key
+    lookup. The next-game pointer only moves forward as time passes, so
+    rolling over to the following game needs no reload.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._version = None
+        self._seasons: Dict[str, _SeasonSnapshot] = {}
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._seasons = {}
+
+    def _load(self, db: Session, season: str) -> Optional[_SeasonSnapshot]:
+        version, _ = get_table_version(db, GameModel.__tablename__)
+        with self._lock:
+            if version != self._version:
+                self._seasons = {}
+                self._version = version
+            snapshot = self._seasons.get(season)
+            if snapshot is not None:
+                return snapshot
+            generation = self._generation
+
+        rows = (
+            db.query(GameModel)
+            .filter(GameModel.season == season)
+            .order_by(asc(GameModel.date_time), asc(GameModel.id))
+            .all()
+        )
+        snapshot = _SeasonSnapshot(
+            [GameInDB.model_validate(row, from_attributes=True) for row in rows]
+        )
+
+        with self._lock:
+            # A write invalidated the index while we were reading: do not cache
+            # the stale snapshot, so the next call reloads.
+            if generation != self._generation or version != self._version:
+                return None
+            if len(self._seasons) >= MAX_CACHED_SEASONS:
+                del self._seasons[next(iter(self._seasons))]
+            self._seasons[season] = snapshot
+            return snapshot
+
+    def get_next(self, db: Session, season: str, now: Optional[datetime] = None):
+        snapshot = self._load(db, season)
+        if snapshot is None:
+            return _query_next_game(db, season, now or datetime.now())
+        with self._lock:
+            pos = snapshot.advance(now or datetime.now())
+            return snapshot.games[pos] if pos < len(snapshot.games) else None
+
+    def get_all_except_next(self, db: Session, season: str, now: Optional[datetime] = None):
+        snapshot = self._load(db, season)
+        if snapshot is None:
+            games = db.query(GameModel).filter(GameModel.season == season).all()
+            next_game = _query_next_game(db, season, now or datetime.now())
+            return [g for g in games if next_game is None or g.id != next_game.id]
+        with self._lock:
+            pos = snapshot.advance(now or datetime.now())
+            if snapshot.except_next is None:
+                snapshot.except_next = snapshot.games[:pos] + snapshot.games[pos + 1 :]
+            return snapshot.except_next
+
+
+def _query_next_game(db: Session, season: str, now: datetime):
+    return (
+        db.query(GameModel)
+        .filter(GameModel.season == season, GameModel.date_time > now)
+        .order_by(asc(GameModel.date_time))
+        .first()
+    )
+
+
+schedule_index = GameScheduleIndex()
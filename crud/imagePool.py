@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# Worker processes per API worker; 0 processes images in a thread of this
+# process instead (tests, development)
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+IMAGE_TIMEOUT_SECONDS = float(os.getenv("IMAGE_TIMEOUT_SECONDS", "20"))
+
+
+class ImagePool:
+    """Bounded process pool for CPU-bound image work.
+
+    Decoding and encoding hold the GIL for long stretches, so they run in
+    separate processes and the event loop only awaits the result. The pool
+    starts on first use. A job that overruns the timeout cannot be
+    cancelled, so the pool's processes are killed and a new pool is started;
+    jobs that were running alongside fail with BrokenProcessPool.
+    """
+
+    def __init__(self, workers: int = IMAGE_WORKERS, timeout: float = IMAGE_TIMEOUT_SECONDS):
+        self.workers = workers
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs threads can deadlock
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _restart(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        # ProcessPoolExecutor has no public way to stop a running job
+        for process in list(executor._processes.values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on the pool; raise asyncio.TimeoutError after timeout seconds."""
+        if self.workers == 0:
+            return await run_in_threadpool(fn, *args)
+
+        executor = self._get_executor()
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(executor.submit(fn, *args)), self.timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Image job timed out after %ss, restarting the pool", self.timeout)
+            self._restart(executor)
+            raise
+
+    def stop(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Stopped by the app lifespan
+image_pool = ImagePool()
@@ -1,23 +1,48 @@
+import asyncio
 import logging
 import os
-from hashlib import md5
-from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
 
 import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
+from botocore.exceptions import BotoCoreError, ClientError, NoCredentialsError
 from fastapi import Depends, HTTPException, UploadFile
-from PIL import Image as PILImage
-from PIL import ImageOps
+from starlette.concurrency import run_in_threadpool
 from starlette.datastructures import UploadFile as StarletteUploadFile
 
+from crud.imagePool import image_pool
+from crud.imageTransform import (CONTENT_TYPES, ImageTooLarge, InvalidImage,
+                                 content_key, probe_image, transform_image)
+from schemas.image import (IMAGE_FORMATS, PRIMARY_EXTENSION, PRIMARY_VARIANT,
+                           variant_key)
+
+# Set to use a local S3 stand-in (MinIO, LocalStack) instead of AWS
+AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL") or None
+
 s3 = boto3.client(
     "s3",
     aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
     aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
     region_name=os.getenv("AWS_REGION"),
+    endpoint_url=AWS_S3_ENDPOINT_URL,
 )
 
 AWS_S3_BUCKET = os.getenv("AWS_S3_BUCKET")
+# Base URL of stored images, e.g. http://localhost:9000/<bucket> for MinIO;
+# the bucket's AWS URL when empty
+S3_PUBLIC_URL = os.getenv("S3_PUBLIC_URL", "").rstrip("/")
+
+# boto3 calls block. They get their own threads, so that they neither hold
+# the event loop nor take threads from the pool that serves sync endpoints.
+S3_IO_WORKERS = int(os.getenv("S3_IO_WORKERS", "16"))
+# Most keys a single delete_objects call accepts
+S3_DELETE_BATCH_SIZE = 1000
+# Uploads are read in chunks and refused once over MAX_IMAGE_BYTES
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(10 * 1024 * 1024)))
+READ_CHUNK_SIZE = 1024 * 1024
+
+s3_executor = ThreadPoolExecutor(max_workers=S3_IO_WORKERS, thread_name_prefix="s3-io")
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -30,61 +55,95 @@ async def create_image(file: UploadFile, folder: str) -> str:
 
 
 async def update_image(file: UploadFile, folder: str) -> str:
-    try:
-        # List existing images in the folder and delete them from S3
-        response = s3.list_objects_v2(Bucket=AWS_S3_BUCKET, Prefix=f"{folder}/")
-        if "Contents" in response:
-            for obj in response["Contents"]:
-                s3.delete_object(Bucket=AWS_S3_BUCKET, Key=obj["Key"])
-    except ClientError as e:
-        logger.error(f"Error deleting old images from S3: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error updating image in S3")
+    """Upload the new image of folder and remove the ones it replaces.
+
+    The upload and the listing of the old images run concurrently. The old
+    images are deleted only once the upload succeeded, and in the
+    background, so the response waits for one S3 round trip.
+    """
+    s3_url, listing = await asyncio.gather(
+        process_image(file, folder),
+        _run_s3(list_image_keys, folder),
+        return_exceptions=True,
+    )
+    if isinstance(s3_url, BaseException):
+        raise s3_url
+
+    if isinstance(listing, BaseException):
+        logger.error(f"Error listing old images in S3: {str(listing)}")
+    else:
+        # The listing may or may not have seen the new variants
+        new_prefix = image_prefix(s3_url)
+        old_keys = [key for key in listing if not key.startswith(f"{new_prefix}/")]
+        if old_keys:
+            s3_executor.submit(delete_image_keys, old_keys)
 
-    return await process_image(file, folder)
+    return s3_url
+
+
+async def _run_s3(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(s3_executor, partial(fn, *args, **kwargs))
 
 
 async def process_image(file: UploadFile, folder: str) -> str:
+    # Read file content
+    if isinstance(file, StarletteUploadFile):
+        logger.info(f"Processing image: {file.filename}")
+        file = await read_upload(file)
+    elif len(file) > MAX_IMAGE_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large")
+
+    # Refuse bad uploads from their header, before they reach a worker
     try:
-        # Read file content
-        if isinstance(file, StarletteUploadFile):
-            logger.info(f"Processing image: {file.filename}")
-            file = await file.read()
-        img_bytes = BytesIO(file)
-        md5sum = md5(img_bytes.getbuffer())
-        img = PILImage.open(img_bytes)
-    except Exception as e:
+        probe_image(file)
+    except ImageTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidImage as e:
         logger.error(f"Error processing image: {str(e)}")
-        raise HTTPException(status_code=400, detail="Invalid image")
-
-    # Check image format
-    if img.format not in ["JPEG", "PNG", "BMP", "GIF"]:
-        logger.error(f"Invalid image format: {img.format}")
-        raise HTTPException(status_code=400, detail="Invalid image format")
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # Fix image orientation and convert to RGB
-    img = ImageOps.exif_transpose(img)
-    img = img.convert("RGB")
+    # hashlib releases the GIL on large inputs
+    prefix = f"{folder}/{await run_in_threadpool(content_key, file)}"
+    img_path = variant_key(prefix, PRIMARY_VARIANT, PRIMARY_EXTENSION)
+    s3_url = image_url(img_path)
 
-    # Create the image path using the MD5 hash
-    img_path = f"{folder}/{md5sum.hexdigest()}.jpg"
-
-    # Save the image to a BytesIO object
-    img_buffer = BytesIO()
-    img.save(
-        img_buffer, format="JPEG", quality="web_high", optimize=True, progressive=True
-    )
-    img_buffer.seek(0)
+    # The primary variant is written last, so once it exists all do
+    if await _run_s3(image_exists, img_path):
+        logger.info(f"Image already in S3 at: {prefix}")
+        return s3_url
 
     try:
-        # Upload the image to S3
-        s3.put_object(
+        variants = await image_pool.run(transform_image, file)
+    except ImageTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidImage as e:
+        logger.error(f"Error processing image: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Image processing timed out")
+    except BrokenProcessPool:
+        raise HTTPException(
+            status_code=503, detail="Image processing was interrupted, try again"
+        )
+
+    def put(variant, extension):
+        return _run_s3(
+            s3.put_object,
             Bucket=AWS_S3_BUCKET,
-            Key=img_path,
-            Body=img_buffer,
-            ContentType="image/jpeg",
+            Key=variant_key(prefix, variant, extension),
+            Body=variants[variant, extension],
+            ContentType=CONTENT_TYPES[IMAGE_FORMATS[extension]],
             ACL="public-read",  # Permitir leitura pública
         )
-        logger.info(f"Image successfully uploaded to S3 at: {img_path}")
+
+    try:
+        # Upload the other variants to S3 concurrently, then the primary one
+        await asyncio.gather(
+            *(put(*key) for key in variants if key != (PRIMARY_VARIANT, PRIMARY_EXTENSION))
+        )
+        await put(PRIMARY_VARIANT, PRIMARY_EXTENSION)
+        logger.info(f"Image successfully uploaded to S3 at: {prefix}")
     except NoCredentialsError as e:
         logger.error(f"Credentials not available: {str(e)}")
         raise HTTPException(status_code=500, detail="S3 credentials not available")
@@ -92,6 +151,75 @@ async def process_image(file: UploadFile, folder: str) -> str:
         logger.error(f"Failed to upload image to S3: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to upload image to S3")
 
-    # Return the full S3 URL of the uploaded image
-    s3_url = f"https://{AWS_S3_BUCKET}.s3.amazonaws.com/{img_path}"
+    # Return the full S3 URL of the primary variant; the others derive from it
     return s3_url
+
+
+async def read_upload(file: UploadFile, max_bytes: int = MAX_IMAGE_BYTES) -> bytes:
+    """Read an upload in chunks, raising 413 as soon as it is over max_bytes.
+
+    The multipart parser spools the body to a temporary file, so only what
+    is read here is held in memory.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail="Image too large")
+
+    data = bytearray()
+    while chunk := await file.read(READ_CHUNK_SIZE):
+        data += chunk
+        if len(data) > max_bytes:
+            raise HTTPException(status_code=413, detail="Image too large")
+    return bytes(data)
+
+
+def image_exists(key: str) -> bool:
+    try:
+        s3.head_object(Bucket=AWS_S3_BUCKET, Key=key)
+    except (BotoCoreError, ClientError):
+        # Missing, or not readable: processing the upload again is always safe;
+        # real S3 errors surface from the upload
+        return False
+    return True
+
+
+def image_url(key: str) -> str:
+    return f"{S3_PUBLIC_URL or f'https://{AWS_S3_BUCKET}.s3.amazonaws.com'}/{key}"
+
+
+def image_prefix(s3_url: str) -> str:
+    """Key prefix shared by the variants of the image at s3_url."""
+    return s3_url.split(f"{S3_PUBLIC_URL or '.amazonaws.com'}/", 1)[-1].rsplit("/", 1)[0]
+
+
+def list_image_keys(folder: str):
+    keys = []
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=AWS_S3_BUCKET, Prefix=f"{folder}/"):
+        keys += [obj["Key"] for obj in page.get("Contents", [])]
+    return keys
+
+
+def delete_image_folder(folder: str):
+    """Delete every image under folder, all variants included; errors are logged."""
+    try:
+        keys = list_image_keys(folder)
+    except (BotoCoreError, ClientError) as e:
+        logger.error(f"Error listing images in S3: {str(e)}")
+        return
+    delete_image_keys(keys)
+
+
+def delete_image_keys(keys):
+    """Delete keys with one delete_objects call per S3_DELETE_BATCH_SIZE keys."""
+    for start in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+        batch = keys[start : start + S3_DELETE_BATCH_SIZE]
+        try:
+            response = s3.delete_objects(
+                Bucket=AWS_S3_BUCKET,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+        except ClientError as e:
+            logger.error(f"Error deleting old images from S3: {str(e)}")
+            continue
+        for error in response.get("Errors", []):
+            logger.error(f"Error deleting {error.get('Key')} from S3: {error.get('Message')}")
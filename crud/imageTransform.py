@@ -0,0 +1,102 @@
+import os
+from hashlib import md5
+from math import ceil
+from io import BytesIO
+
+from PIL import Image as PILImage
+from PIL import ImageOps
+
+from schemas.image import (IMAGE_FORMATS, IMAGE_VARIANTS, PRIMARY_EXTENSION,
+                           PRIMARY_VARIANT, variant_key)
+
+# Runs in the image worker processes, so it only imports PIL and the
+# variant naming of schemas.image
+
+ALLOWED_FORMATS = ["JPEG", "PNG", "BMP", "GIF"]
+# Larger images are refused from their header, before any pixel is decoded
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", "50000000"))
+CONTENT_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+# Bump when the encoder settings change, so that images are made again
+PROCESSING_VERSION = 1
+
+
+class InvalidImage(ValueError):
+    """The upload is not an image we accept; str() is the client message."""
+
+
+class ImageTooLarge(InvalidImage):
+    """The upload is over the size or dimension limits."""
+
+
+def content_key(data: bytes) -> str:
+    """Name of the variants of data: a hash of the upload and of how it is processed.
+
+    The same upload gets the same key, so it can be found already stored;
+    changing the variants, formats or PROCESSING_VERSION gives new keys.
+    """
+    digest = md5(data)
+    digest.update(
+        f"{PROCESSING_VERSION}|{sorted(IMAGE_VARIANTS.items())}|{sorted(IMAGE_FORMATS)}".encode()
+    )
+    return digest.hexdigest()
+
+
+def _encode(img, fmt: str) -> bytes:
+    buffer = BytesIO()
+    if fmt == "JPEG":
+        img.save(buffer, format="JPEG", quality="web_high", optimize=True, progressive=True)
+    else:
+        img.save(buffer, format=fmt, quality=80, method=4)
+    return buffer.getvalue()
+
+
+def probe_image(data: bytes):
+    """Open data and check its format and dimensions; only the header is read."""
+    try:
+        img = PILImage.open(BytesIO(data))
+    except Exception:
+        raise InvalidImage("Invalid image")
+
+    # Check image format
+    if img.format not in ALLOWED_FORMATS:
+        raise InvalidImage("Invalid image format")
+
+    width, height = img.size
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ImageTooLarge("Image dimensions too large")
+    return img
+
+
+def decode_image(data: bytes):
+    """Decode an upload to RGB, no larger than the largest variant needs.
+
+    JPEGs are decoded straight at 1/2, 1/4 or 1/8 of their size when that
+    still covers the largest variant, which is where most of the memory of
+    a phone photo goes.
+    """
+    img = probe_image(data)
+
+    scale = min(1, max(IMAGE_VARIANTS.values()) / max(img.size))
+    img.draft("RGB", (ceil(img.width * scale), ceil(img.height * scale)))
+
+    # Fix image orientation and convert to RGB
+    img = ImageOps.exif_transpose(img)
+    return img.convert("RGB")
+
+
+def transform_image(data: bytes):
+    """Decode an upload once and encode every variant.
+
+    Returns a {(variant, extension): bytes} dict. The variants are scaled
+    down from largest to smallest, each from the one before, so the
+    full-size image is only resampled once.
+    """
+    img = decode_image(data)
+
+    encoded = {}
+    for variant, edge in sorted(IMAGE_VARIANTS.items(), key=lambda item: -item[1]):
+        img.thumbnail((edge, edge), PILImage.LANCZOS)
+        for extension, fmt in IMAGE_FORMATS.items():
+            encoded[variant, extension] = _encode(img, fmt)
+
+    return encoded
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Optional
+
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "32"))
+LIVE_KEEPALIVE_SECONDS = float(os.getenv("LIVE_KEEPALIVE_SECONDS", "15"))
+
+# Put in a subscriber queue when it was dropped for being too slow
+DROPPED = None
+
+
+class Subscriber:
+    def __init__(self, loop, queue_size: int, game_id: Optional[int] = None):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.game_id = game_id
+
+
+class GameLiveHub:
+    """In-process broadcast of game score changes to streaming clients.
+
+    publish() can be called from any thread (the sync routes run in the
+    threadpool) and never blocks: the event is encoded once and handed to
+    each subscriber's event loop, which puts it on a bounded queue. A
+    subscriber whose queue is full is dropped instead of slowing down the
+    others; its stream ends and the client reconnects.
+    """
+
+    def __init__(self, queue_size: int = LIVE_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, game_id: Optional[int] = None) -> Subscriber:
+        subscriber = Subscriber(asyncio.get_running_loop(), self.queue_size, game_id)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event: dict):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+
+        frame = f"event: game\ndata: {json.dumps(event, default=str)}\n\n"
+
+        by_loop = defaultdict(list)
+        for subscriber in subscribers:
+            if subscriber.game_id is None or subscriber.game_id == event.get("id"):
+                by_loop[subscriber.loop].append(subscriber)
+
+        for loop, loop_subscribers in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self._fan_out, loop_subscribers, frame)
+            except RuntimeError:
+                # The loop is closed, so nobody is left to read these queues
+                for subscriber in loop_subscribers:
+                    self.unsubscribe(subscriber)
+
+    def _fan_out(self, subscribers, frame: str):
+        for subscriber in subscribers:
+            try:
+                subscriber.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self.unsubscribe(subscriber)
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(DROPPED)
+
+    async def stream(self, subscriber: Subscriber, is_disconnected):
+        """Yield SSE frames for a subscriber until it disconnects or is dropped."""
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(
+                        subscriber.queue.get(), LIVE_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if frame is DROPPED:
+                    break
+                yield frame
+        finally:
+            self.unsubscribe(subscriber)
+
+
+live_hub = GameLiveHub()
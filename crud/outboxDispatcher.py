@@ -0,0 +1,161 @@
+import importlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from crud.outboxRepo import (claim_due_events, mark_dispatched, mark_failed,
+                             prune_dispatched, to_message)
+from db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# file:<path>, <module>:<factory> for a custom sink, or memory for local runs.
+# Unset, no dispatcher runs and events stay pending until a sink is configured.
+OUTBOX_SINK = os.getenv("OUTBOX_SINK", "")
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "1"))
+# How often delivered events past their retention are deleted, in batches
+OUTBOX_PRUNE_SECONDS = float(os.getenv("OUTBOX_PRUNE_SECONDS", "3600"))
+OUTBOX_PRUNE_BATCH_SIZE = int(os.getenv("OUTBOX_PRUNE_BATCH_SIZE", "1000"))
+
+
+class MemorySink:
+    """Keeps the last published messages in memory; for local runs and tests.
+
+    Nothing reads them back, so never use it where events matter.
+    """
+
+    def __init__(self, max_messages: int = 10000):
+        self.messages = deque(maxlen=max_messages)
+
+    def publish(self, messages):
+        self.messages.extend(messages)
+
+
+class FileSink:
+    """Appends published messages to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def publish(self, messages):
+        with open(self.path, "a", encoding="utf-8") as sink_file:
+            for message in messages:
+                sink_file.write(json.dumps(message, default=str) + "\n")
+
+
+def make_sink(spec: str = OUTBOX_SINK):
+    """Sink described by spec; None when spec is empty."""
+    if not spec:
+        return None
+    if spec == "memory":
+        return MemorySink()
+    if spec.startswith("file:"):
+        return FileSink(spec.removeprefix("file:"))
+    module_name, _, factory = spec.partition(":")
+    if not factory:
+        raise ValueError(f"Unknown outbox sink: {spec}")
+    return getattr(importlib.import_module(module_name), factory)()
+
+
+class OutboxDispatcher:
+    """Background thread that delivers outbox events to a sink.
+
+    Each pass claims a batch of due events, publishes it with one sink call
+    and marks it dispatched in the same transaction. If the sink fails the
+    whole batch is retried later with exponential backoff, so delivery is
+    at least once and consumers deduplicate on the event id. Events that
+    fail OUTBOX_MAX_ATTEMPTS times are dead-lettered. Writers only call
+    notify(), which wakes the thread and never waits for delivery. Every
+    prune_seconds the thread also deletes delivered events past retention.
+    """
+
+    def __init__(self, session_factory, sink, batch_size: int = OUTBOX_BATCH_SIZE, poll_seconds: float = OUTBOX_POLL_SECONDS, prune_seconds: float = OUTBOX_PRUNE_SECONDS):
+        self.session_factory = session_factory
+        self.sink = sink
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.prune_seconds = prune_seconds
+        self._next_prune = 0.0
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def notify(self):
+        self._wake.set()
+
+    def dispatch_once(self) -> int:
+        """Deliver one batch; return how many events were published."""
+        db = self.session_factory()
+        try:
+            events = claim_due_events(db, self.batch_size)
+            if not events:
+                db.rollback()
+                return 0
+            try:
+                self.sink.publish([to_message(event) for event in events])
+            except Exception as e:
+                logger.warning("Outbox delivery of %s events failed: %s", len(events), e)
+                dead = mark_failed(db, events, str(e))
+                if dead:
+                    logger.error("Outbox events %s ran out of attempts", [event.id for event in dead])
+                db.commit()
+                return 0
+            mark_dispatched(db, events)
+            db.commit()
+            return len(events)
+        finally:
+            db.close()
+
+    def prune_once(self) -> int:
+        """Delete delivered events past retention; return how many."""
+        deleted = 0
+        while True:
+            # One short transaction per batch
+            db = self.session_factory()
+            try:
+                count = prune_dispatched(db, OUTBOX_PRUNE_BATCH_SIZE)
+                db.commit()
+            finally:
+                db.close()
+            deleted += count
+            if count < OUTBOX_PRUNE_BATCH_SIZE:
+                return deleted
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                if time.monotonic() >= self._next_prune:
+                    self._next_prune = time.monotonic() + self.prune_seconds
+                    self.prune_once()
+                # A full batch means there may be more waiting
+                if self.dispatch_once() == self.batch_size:
+                    continue
+            except Exception:
+                logger.exception("Outbox dispatcher pass failed")
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def start(self):
+        if self.sink is None:
+            # Marking events dispatched without delivering them would lose them
+            logger.warning("OUTBOX_SINK is not set; outbox events stay pending")
+            return
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+# Started and stopped by the app lifespan
+outbox_dispatcher = OutboxDispatcher(SessionLocal, make_sink())
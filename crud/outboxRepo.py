@@ -0,0 +1,130 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from models.outbox import OutboxEvent
+from schemas.game import GameInDB
+
+GAME_CREATED = "game.created"
+GAME_UPDATED = "game.updated"
+GAME_DELETED = "game.deleted"
+
+OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "1"))
+OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("OUTBOX_RETRY_MAX_SECONDS", "300"))
+# After this many failed deliveries an event is dead-lettered: it keeps its
+# last_error for inspection and is never retried
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+# Delivered events are deleted this long after delivery
+OUTBOX_RETENTION_DAYS = float(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+
+
+def utc_now() -> datetime:
+    # Naive, like the DATETIME columns, which hold UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def add_game_events(db: Session, event_type: str, games):
+    """Queue one event per game; call before the commit of the write.
+
+    The events commit or roll back with the write itself, so a game change
+    is published if and only if it happened.
+    """
+    games = list(games)
+    if not games:
+        return
+
+    # New games need their ids
+    db.flush()
+    now = utc_now()
+    db.execute(
+        insert(OutboxEvent),
+        [
+            {
+                "event_type": event_type,
+                "aggregate_id": game.id,
+                "payload": GameInDB.model_validate(game, from_attributes=True).model_dump(mode="json"),
+                "attempts": 0,
+                "next_attempt_at": now,
+            }
+            for game in games
+        ],
+    )
+
+
+def add_game_event(db: Session, event_type: str, game):
+    add_game_events(db, event_type, [game])
+
+
+def claim_due_events(db: Session, limit: int):
+    """Lock up to limit due events; other dispatchers skip the locked rows."""
+    return (
+        db.query(OutboxEvent)
+        .filter(
+            OutboxEvent.dispatched_at.is_(None),
+            OutboxEvent.failed_at.is_(None),
+            OutboxEvent.next_attempt_at <= utc_now(),
+        )
+        .order_by(OutboxEvent.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+
+def mark_dispatched(db: Session, events):
+    db.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id.in_([event.id for event in events]))
+        .values(dispatched_at=utc_now()),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    # Exponential backoff: 1s, 2s, 4s, ... capped
+    seconds = OUTBOX_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, OUTBOX_RETRY_MAX_SECONDS))
+
+
+def mark_failed(db: Session, events, error: str):
+    """Schedule a retry of events; return the ones that ran out of attempts."""
+    now = utc_now()
+    dead = []
+    for event in events:
+        event.attempts += 1
+        event.last_error = error[:1000]
+        if event.attempts >= OUTBOX_MAX_ATTEMPTS:
+            event.failed_at = now
+            dead.append(event)
+        else:
+            event.next_attempt_at = now + retry_delay(event.attempts)
+    return dead
+
+
+def prune_dispatched(db: Session, limit: int, retention_days: float = OUTBOX_RETENTION_DAYS) -> int:
+    """Delete up to limit events delivered before the retention window; return how many."""
+    cutoff = utc_now() - timedelta(days=retention_days)
+    ids = db.scalars(
+        select(OutboxEvent.id)
+        .where(OutboxEvent.dispatched_at < cutoff)
+        .order_by(OutboxEvent.dispatched_at)
+        .limit(limit)
+    ).all()
+    if ids:
+        db.execute(
+            delete(OutboxEvent).where(OutboxEvent.id.in_(ids)),
+            execution_options={"synchronize_session": False},
+        )
+    return len(ids)
+
+
+def to_message(event: OutboxEvent) -> dict:
+    return {
+        "id": event.id,
+        "type": event.event_type,
+        "game_id": event.aggregate_id,
+        "occurred_at": event.created_at.isoformat() if event.created_at else None,
+        "game": event.payload,
+    }
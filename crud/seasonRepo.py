@@ -0,0 +1,55 @@
+import os
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Query
+from sqlalchemy import desc
+from sqlalchemy.orm import Session
+
+from models.game import Game as GameModel
+
+# Month in which a new season starts; games before it belong to the season
+# that started the previous year
+SEASON_START_MONTH = int(os.getenv("SEASON_START_MONTH", "8"))
+# Pins the default season of the read endpoints, e.g. while a season that
+# is over is still the one people look at
+CURRENT_SEASON = os.getenv("CURRENT_SEASON")
+
+
+def season_for(date_time: datetime) -> str:
+    """Season a game played at date_time belongs to, e.g. "2024-25"."""
+    start_year = date_time.year if date_time.month >= SEASON_START_MONTH else date_time.year - 1
+    if SEASON_START_MONTH == 1:
+        return str(start_year)
+    return f"{start_year}-{(start_year + 1) % 100:02d}"
+
+
+def season_bounds(season: str):
+    """[start, end) of the dates season_for() maps to season."""
+    start_year = int(season[:4])
+    return (
+        datetime(start_year, SEASON_START_MONTH, 1),
+        datetime(start_year + 1, SEASON_START_MONTH, 1),
+    )
+
+
+def current_season(now: Optional[datetime] = None) -> str:
+    return CURRENT_SEASON or season_for(now or datetime.now())
+
+
+def get_seasons(db: Session):
+    return [
+        season
+        for (season,) in db.query(GameModel.season)
+        .distinct()
+        .order_by(desc(GameModel.season))
+    ]
+
+
+def season_query(
+    season: Optional[str] = Query(
+        None, max_length=16, description="Season, e.g. 2024-25; defaults to the current season"
+    )
+) -> str:
+    """Dependency for the season parameter of the read endpoints."""
+    return season or current_season()
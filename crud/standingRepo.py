@@ -0,0 +1,183 @@
+from collections import defaultdict
+from typing import Optional
+
+from sqlalchemy import desc
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models.archive import ArchivedGame
+from models.game import Game as GameModel
+from models.standing import Standing as StandingModel
+
+POINTS_WIN = 3
+POINTS_DRAW = 1
+POINTS_LOSS = 0
+
+# Tables whose finished games count; archived games still do
+STANDING_SOURCES = (GameModel, ArchivedGame)
+
+STANDING_FIELDS = (
+    "played",
+    "wins",
+    "draws",
+    "losses",
+    "goals_for",
+    "goals_against",
+    "points",
+)
+
+
+def game_result(game):
+    """Snapshot of the fields of a game that count towards the standings."""
+    return (
+        game.finished,
+        game.score_home,
+        game.score_visitor,
+        game.club_home_id,
+        game.club_visitor_id,
+        game.season,
+    )
+
+
+def _club_line(goals_for, goals_against):
+    if goals_for > goals_against:
+        wins, draws, losses, points = 1, 0, 0, POINTS_WIN
+    elif goals_for == goals_against:
+        wins, draws, losses, points = 0, 1, 0, POINTS_DRAW
+    else:
+        wins, draws, losses, points = 0, 0, 1, POINTS_LOSS
+    return {
+        "played": 1,
+        "wins": wins,
+        "draws": draws,
+        "losses": losses,
+        "goals_for": goals_for,
+        "goals_against": goals_against,
+        "points": points,
+    }
+
+
+def _add_result(deltas, result, sign):
+    finished, score_home, score_visitor, club_home_id, club_visitor_id, season = result
+    # Only finished games with a full score count
+    if not finished or score_home is None or score_visitor is None:
+        return
+
+    for club_id, line in (
+        (club_home_id, _club_line(score_home, score_visitor)),
+        (club_visitor_id, _club_line(score_visitor, score_home)),
+    ):
+        for field, value in line.items():
+            deltas[season, club_id][field] += sign * value
+
+
+def apply_result_change(db: Session, old_result=None, new_result=None):
+    """Move the standings from old_result to new_result without committing.
+
+    Results are game_result() snapshots; None stands for a game that does not
+    exist (creation or deletion). The caller commits together with the game
+    write, so the standings never drift from the games table.
+    """
+    if old_result == new_result:
+        return
+
+    deltas = defaultdict(lambda: defaultdict(int))
+    if old_result is not None:
+        _add_result(deltas, old_result, -1)
+    if new_result is not None:
+        _add_result(deltas, new_result, 1)
+
+    apply_deltas(db, deltas)
+
+
+def apply_new_results(db: Session, results):
+    """Add a batch of game_result() snapshots in one update per club and season."""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for result in results:
+        _add_result(deltas, result, 1)
+
+    apply_deltas(db, deltas)
+
+
+def upsert_standing(db: Session, season: str, club_id: int, delta):
+    """Add delta to the (season, club_id) row, creating it if needed.
+
+    One statement, so that there is no UPDATE finding no row followed by an
+    INSERT: on MySQL the gap locks of such UPDATEs deadlock the INSERTs of
+    concurrent first results, and two first results of one club both insert.
+    """
+    table = StandingModel.__table__
+    values = {"season": season, "club_id": club_id, **{field: delta[field] for field in STANDING_FIELDS}}
+
+    if db.get_bind().dialect.name == "mysql":
+        statement = mysql_insert(table).values(**values)
+        statement = statement.on_duplicate_key_update(
+            {field: table.c[field] + statement.inserted[field] for field in STANDING_FIELDS}
+        )
+    else:
+        statement = sqlite_insert(table).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.season, table.c.club_id],
+            set_={field: table.c[field] + statement.excluded[field] for field in STANDING_FIELDS},
+        )
+    db.execute(statement)
+
+
+def apply_deltas(db: Session, deltas):
+    # Every writer locks the rows in the same (season, club_id) order, so
+    # concurrent results for A-vs-B and B-vs-A cannot deadlock
+    for (season, club_id), delta in sorted(deltas.items()):
+        if not any(delta.values()):
+            continue
+
+        upsert_standing(db, season, club_id, delta)
+
+
+def rebuild_standings(db: Session, season: Optional[str] = None, sources=STANDING_SOURCES):
+    """Recompute the standings of every season; return those of season, or all."""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for model in sources:
+        rows = db.query(
+            model.finished,
+            model.score_home,
+            model.score_visitor,
+            model.club_home_id,
+            model.club_visitor_id,
+            model.season,
+        ).filter(model.finished.is_(True))
+        for row in rows:
+            _add_result(deltas, tuple(row), 1)
+
+    db.query(StandingModel).delete(synchronize_session=False)
+    db.add_all(
+        StandingModel(
+            season=season_key,
+            club_id=club_id,
+            **{field: delta[field] for field in STANDING_FIELDS},
+        )
+        for (season_key, club_id), delta in deltas.items()
+    )
+    db.commit()
+
+    return get_standings(db, season)
+
+
+def get_standings(db: Session, season: Optional[str] = None):
+    query = db.query(StandingModel)
+
+    if season is not None:
+        query = query.filter(StandingModel.season == season)
+
+    standings = (
+        query.order_by(
+            desc(StandingModel.season),
+            desc(StandingModel.points),
+            desc(StandingModel.goals_for - StandingModel.goals_against),
+            desc(StandingModel.goals_for),
+            StandingModel.club_id,
+        )
+        .all()
+    )
+
+    return standings
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+from botocore.exceptions import BotoCoreError, ClientError
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from crud.changeRepo import record_change
+from crud.imageRepo import AWS_S3_BUCKET, MAX_IMAGE_BYTES, s3, update_image
+from crud.outboxRepo import retry_delay
+from crud.versionRepo import bump_table_version
+from db.database import SessionLocal
+from models.club import Club as ClubModel
+from models.pavilion import Pavilion as PavilionModel
+from models.upload import ImageUpload
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"  # waiting for the client to upload the file
+QUEUED = "queued"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+# Change log entity of each target: its model and S3 folder
+UPLOAD_TARGETS = {
+    "club": (ClubModel, "clubs"),
+    "pavilion": (PavilionModel, "pavilions"),
+}
+
+# Raw uploads land here. Give the prefix a bucket lifecycle rule that
+# expires objects after a day, so uploads that were never completed go away.
+IMAGE_UPLOAD_PREFIX = os.getenv("IMAGE_UPLOAD_PREFIX", "uploads")
+IMAGE_UPLOAD_MAX_ATTEMPTS = int(os.getenv("IMAGE_UPLOAD_MAX_ATTEMPTS", "5"))
+# An upload still processing after this is taken to have lost its worker
+IMAGE_UPLOAD_LEASE_SECONDS = float(os.getenv("IMAGE_UPLOAD_LEASE_SECONDS", "300"))
+IMAGE_UPLOAD_POLL_SECONDS = float(os.getenv("IMAGE_UPLOAD_POLL_SECONDS", "1"))
+# Uploads are processed by separate processes (python -m db.uploads), so that
+# API workers never hold image bytes. 1 also runs a processor in every API
+# worker, for local runs without one.
+IMAGE_UPLOAD_PROCESSOR_IN_API = os.getenv("IMAGE_UPLOAD_PROCESSOR_IN_API", "0") == "1"
+
+
+def upload_key(upload: ImageUpload) -> str:
+    return f"{IMAGE_UPLOAD_PREFIX}/{upload.id}"
+
+
+def claim_upload(db: Session):
+    """Lock the oldest due upload and mark it processing; None when there is none.
+
+    Processing uploads are due again once their lease runs out, so an upload
+    whose worker died is picked up by another.
+    """
+    now = datetime.utcnow()
+    upload = (
+        db.query(ImageUpload)
+        .filter(
+            ImageUpload.status.in_((QUEUED, PROCESSING)),
+            ImageUpload.next_attempt_at <= now,
+        )
+        .order_by(ImageUpload.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if upload is not None:
+        upload.status = PROCESSING
+        upload.attempts += 1
+        upload.next_attempt_at = now + timedelta(seconds=IMAGE_UPLOAD_LEASE_SECONDS)
+    return upload
+
+
+def finish_upload(db: Session, upload: ImageUpload, image: str):
+    """Store image on the club or pavilion of upload; call before the commit."""
+    model, _ = UPLOAD_TARGETS[upload.target]
+    row = db.get(model, upload.target_id)
+    if row is None:
+        fail_upload(upload, f"{upload.target.capitalize()} not found", retry=False)
+        return
+
+    row.image = image
+    record_change(db, upload.target, row)
+    bump_table_version(db, model.__tablename__)
+    upload.status = DONE
+    upload.image = image
+    upload.error = None
+    upload.next_attempt_at = None
+
+
+def fail_upload(upload: ImageUpload, error: str, retry: bool):
+    upload.error = error[:1000]
+    if retry and upload.attempts < IMAGE_UPLOAD_MAX_ATTEMPTS:
+        upload.status = QUEUED
+        upload.next_attempt_at = datetime.utcnow() + retry_delay(upload.attempts)
+    else:
+        upload.status = FAILED
+        upload.next_attempt_at = None
+
+
+def read_uploaded_image(key: str) -> bytes:
+    obj = s3.get_object(Bucket=AWS_S3_BUCKET, Key=key)
+    # The presigned form already caps the size; objects put by other means may not be
+    if obj["ContentLength"] > MAX_IMAGE_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large")
+    return obj["Body"].read()
+
+
+def delete_uploaded_image(key: str):
+    try:
+        s3.delete_object(Bucket=AWS_S3_BUCKET, Key=key)
+    except (BotoCoreError, ClientError) as e:
+        logger.error(f"Error deleting uploaded image {key}: {str(e)}")
+
+
+class UploadProcessor:
+    """Background thread that turns completed uploads into club and pavilion images.
+
+    Each pass claims one due upload and commits the claim, so the row is not
+    locked while the image is read from S3, processed and stored. The result
+    and the new image of the club or pavilion then commit together. Uploads
+    the image pipeline rejects fail at once; other errors are retried with
+    exponential backoff up to IMAGE_UPLOAD_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, session_factory, poll_seconds: float = IMAGE_UPLOAD_POLL_SECONDS):
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def notify(self):
+        self._wake.set()
+
+    def process_once(self) -> bool:
+        """Process one due upload; return whether there was one."""
+        db = self.session_factory()
+        try:
+            upload = claim_upload(db)
+            if upload is None:
+                db.rollback()
+                return False
+            db.commit()
+
+            key = upload_key(upload)
+            _, folder = UPLOAD_TARGETS[upload.target]
+            try:
+                data = read_uploaded_image(key)
+                image = asyncio.run(update_image(data, f"{folder}/{upload.target_id}"))
+            except HTTPException as e:
+                if e.status_code >= 500:
+                    logger.warning("Image upload %s failed: %s", upload.id, e.detail)
+                fail_upload(upload, str(e.detail), retry=e.status_code >= 500)
+            except Exception as e:
+                logger.warning("Image upload %s failed: %s", upload.id, e)
+                fail_upload(upload, str(e), retry=True)
+            else:
+                finish_upload(db, upload, image)
+            db.commit()
+
+            if upload.status in (DONE, FAILED):
+                delete_uploaded_image(key)
+            return True
+        finally:
+            db.close()
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                if self.process_once():
+                    continue
+            except Exception:
+                logger.exception("Upload processor pass failed")
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self.run, name="upload-processor", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+# Run on its own by python -m db.uploads, or by the app lifespan when
+# IMAGE_UPLOAD_PROCESSOR_IN_API=1
+upload_processor = UploadProcessor(SessionLocal)
@@ -0,0 +1,78 @@
+import os
+from datetime import datetime
+
+from botocore.exceptions import ClientError
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from crud.imageRepo import AWS_S3_BUCKET, MAX_IMAGE_BYTES, s3
+from crud.uploadProcessor import (PENDING, QUEUED, UPLOAD_TARGETS, upload_key,
+                                  upload_processor)
+from models.upload import ImageUpload
+
+# How long the client has to send the file
+IMAGE_UPLOAD_EXPIRES_SECONDS = int(os.getenv("IMAGE_UPLOAD_EXPIRES_SECONDS", "900"))
+
+upload_not_found_exception = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found"
+)
+
+
+def create_upload(target: str, target_id: int, db: Session):
+    """Start an image upload for a club or pavilion.
+
+    Returns a presigned POST that lets the client send the file straight to
+    the bucket, so the image bytes never pass through the API. S3 enforces
+    the size limit of the form.
+    """
+    model, _ = UPLOAD_TARGETS[target]
+    if db.get(model, target_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"{target.capitalize()} not found"
+        )
+
+    upload = ImageUpload(target=target, target_id=target_id, status=PENDING, attempts=0)
+    db.add(upload)
+    db.commit()
+    db.refresh(upload)
+
+    form = s3.generate_presigned_post(
+        Bucket=AWS_S3_BUCKET,
+        Key=upload_key(upload),
+        Conditions=[["content-length-range", 1, MAX_IMAGE_BYTES]],
+        ExpiresIn=IMAGE_UPLOAD_EXPIRES_SECONDS,
+    )
+
+    return {"upload": upload, "url": form["url"], "fields": form["fields"]}
+
+
+def get_upload(upload_id: int, db: Session):
+    upload = db.get(ImageUpload, upload_id)
+
+    if not upload:
+        raise upload_not_found_exception
+
+    return upload
+
+
+def complete_upload(upload_id: int, db: Session):
+    """Queue an upload for processing once the client has sent the file.
+
+    Completing an upload again returns it unchanged.
+    """
+    upload = get_upload(upload_id, db)
+    if upload.status != PENDING:
+        return upload
+
+    try:
+        s3.head_object(Bucket=AWS_S3_BUCKET, Key=upload_key(upload))
+    except ClientError:
+        raise HTTPException(status_code=400, detail="Image not uploaded")
+
+    upload.status = QUEUED
+    upload.next_attempt_at = datetime.utcnow()
+    db.commit()
+    db.refresh(upload)
+    upload_processor.notify()
+
+    return upload
@@ -0,0 +1,163 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import md5
+from typing import Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from models.archive import ArchivedGame
+from models.change import Change
+from models.club import Club
+from models.game import Game
+from models.pavilion import Pavilion
+from models.version import TableVersion
+
+# Every table passed to bump_table_version. Their rows are inserted by
+# migrations, so writes never race to insert them; a table added here needs
+# a new migration that calls insert_table_versions.
+VERSIONED_TABLES = (
+    Pavilion.__tablename__,
+    Club.__tablename__,
+    Game.__tablename__,
+    Change.__tablename__,
+    ArchivedGame.__tablename__,
+)
+
+
+def insert_table_versions(connection):
+    """Insert the missing rows of VERSIONED_TABLES at version 0."""
+    existing = set(connection.scalars(select(TableVersion.table_name)))
+    missing = [name for name in VERSIONED_TABLES if name not in existing]
+    if missing:
+        connection.execute(
+            insert(TableVersion), [{"table_name": name, "version": 0} for name in missing]
+        )
+
+
+def bump_table_version(db: Session, table_name: str):
+    """Mark table_name as changed; call before the commit of every write to it.
+
+    table_name must be in VERSIONED_TABLES, whose rows always exist.
+    """
+    updated = db.query(TableVersion).filter(TableVersion.table_name == table_name).update(
+        {
+            TableVersion.version: TableVersion.version + 1,
+            TableVersion.updated_at: func.now(),
+        },
+        synchronize_session=False,
+    )
+    if not updated:
+        raise RuntimeError(f"No table_versions row for {table_name}")
+
+
+def get_table_version(db: Session, table_name: str):
+    row = db.execute(
+        select(TableVersion.version, TableVersion.updated_at).where(
+            TableVersion.table_name == table_name
+        )
+    ).first()
+
+    if row is None:
+        return 0, None
+
+    return row.version, row.updated_at
+
+
+def get_row_updated_at(db: Session, model, row_id: int) -> Optional[datetime]:
+    row = db.execute(select(model.updated_at).where(model.id == row_id)).first()
+
+    return row.updated_at if row is not None else None
+
+
+def make_etag(*parts) -> str:
+    digest = md5(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def _as_utc(value: datetime) -> datetime:
+    # MySQL DATETIME values are naive; the server clock is UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def check_not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+) -> Optional[Response]:
+    """Set the validators on response and return a 304 if the client is current."""
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    elif last_modified is not None and "if-modified-since" in request.headers:
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"])
+        except (TypeError, ValueError):
+            return None
+        not_modified = _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+    else:
+        return None
+
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
+
+
+def check_table_not_modified(
+    request: Request,
+    response: Response,
+    db: Session,
+    *table_names,
+    extra=(),
+    with_last_modified: bool = True,
+) -> Optional[Response]:
+    """Validators for a response built from whole tables (lists, feeds).
+
+    Pass with_last_modified=False when the body can change without a write
+    (it depends on the clock); extra must then hold what it depends on, and
+    only the ETag is used.
+    """
+    versions = [get_table_version(db, table_name) for table_name in table_names]
+    last_modified = None
+    if with_last_modified:
+        last_modified = max(
+            (updated_at for _, updated_at in versions if updated_at is not None),
+            default=None,
+        )
+    etag = make_etag(
+        *table_names,
+        *(version for version, _ in versions),
+        request.url.query,
+        *extra,
+    )
+    return check_not_modified(request, response, etag, last_modified)
+
+
+def check_row_not_modified(
+    request: Request, response: Response, db: Session, model, row_id: int
+) -> Optional[Response]:
+    """Validators for a single row; None when it does not exist."""
+    updated_at = get_row_updated_at(db, model, row_id)
+    if updated_at is None:
+        return None
+
+    version, _ = get_table_version(db, model.__tablename__)
+    etag = make_etag(model.__tablename__, version, row_id, request.url.query)
+    return check_not_modified(request, response, etag, updated_at)
@@ -0,0 +1,37 @@
+"""Move finished games of past seasons into the games_archive table.
+
+    python -m db.archive [--horizon-days 365] [--batch-size 500]
+
+Games stay reachable with ?include_archived=true. Each batch commits on
+its own, so the job can be stopped at any time and run again to carry on;
+schedule it (cron, a Kubernetes CronJob) off-peak.
+"""
+import argparse
+import sys
+
+from crud.archiveRepo import (ARCHIVE_BATCH_SIZE, ARCHIVE_HORIZON_DAYS,
+                              archive_games)
+from db.database import SessionLocal, engine
+from db.migrations import migrate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive finished games of past seasons")
+    parser.add_argument("--horizon-days", type=int, default=ARCHIVE_HORIZON_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    migrate(engine)
+
+    db = SessionLocal()
+    try:
+        archived = archive_games(db, horizon_days=args.horizon_days, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(f"Archived {archived} games")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
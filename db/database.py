@@ -2,8 +2,13 @@ import os
 
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from db.pool import engine_options, instrument_engine
+from db.replica import ReplicaSet, RoutingSession
+
 load_dotenv()
 
 MYSQL_DATABASE = os.environ.get("MYSQL_DATABASE")
@@ -15,15 +20,109 @@ SQLALCHEMY_DATABASE_URL = os.environ.get(
     f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DATABASE}",
 )
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async drivers for the sync URLs we support
+ASYNC_DRIVERS = {
+    "mysql": "aiomysql",
+    "sqlite": "aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver for {url.get_backend_name()}")
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
+ASYNC_SQLALCHEMY_DATABASE_URL = os.environ.get("ASYNC_MYSQL_URL")
+
+# Comma-separated URLs of read replicas; reads use the primary when empty
+REPLICA_DATABASE_URLS = [
+    url.strip() for url in os.environ.get("MYSQL_REPLICA_URLS", "").split(",") if url.strip()
+]
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={},
+    **engine_options(SQLALCHEMY_DATABASE_URL, "primary"),
+)
+instrument_engine(engine, "primary")
+
+
+def create_replica_engine(url: str, name: str):
+    replica_engine = create_engine(url, connect_args={}, **engine_options(url, name))
+    instrument_engine(replica_engine, name)
+    return replica_engine
+
+
+replicas = ReplicaSet(
+    create_replica_engine(url, f"replica-{i}")
+    for i, url in enumerate(REPLICA_DATABASE_URLS, start=1)
+)
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine, replicas=replicas
+)
+# For read-only requests: SELECTs go to a replica when one is configured
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    replicas=replicas,
+    use_replicas=True,
+)
+
+# expire_on_commit=False: attributes of committed objects must stay readable
+# without an implicit (and, in async code, impossible) lazy refresh.
+# RoutingSession reports the commits, so that reads after an async write
+# stay on the primary too.
+AsyncSessionLocal = async_sessionmaker(
+    sync_session_class=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    replicas=replicas,
+)
+_async_engine = None
 
 Base = declarative_base()
 
 
+def get_async_engine():
+    # Created on first use so that the sync-only paths (CLI scripts, tests)
+    # do not need the async driver installed.
+    global _async_engine
+    if _async_engine is None:
+        url = ASYNC_SQLALCHEMY_DATABASE_URL or to_async_url(SQLALCHEMY_DATABASE_URL)
+        _async_engine = create_async_engine(
+            url, **engine_options(url, "primary-async", is_async=True)
+        )
+        instrument_engine(_async_engine.sync_engine, "primary-async")
+        AsyncSessionLocal.configure(bind=_async_engine)
+    return _async_engine
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
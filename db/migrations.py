@@ -0,0 +1,278 @@
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, NamedTuple
+
+from sqlalchemy import (Column, DateTime, Integer, MetaData, String, Table,
+                        func, inspect, insert, select, text, update)
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
+
+from crud.seasonRepo import season_bounds, season_for
+from crud.standingRepo import rebuild_standings
+from crud.versionRepo import insert_table_versions
+from models.archive import ArchivedGame
+from models.change import Change
+from models.club import Club
+from models.game import Game
+from models.outbox import OutboxEvent
+from models.pavilion import Pavilion
+from models.standing import Standing
+from models.upload import ImageUpload
+from models.version import TableVersion
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_LOCK_NAME = "game_microservice_migrations"
+MIGRATION_LOCK_TIMEOUT = int(os.getenv("MIGRATION_LOCK_TIMEOUT", "300"))
+
+# Kept out of Base.metadata so that create_all never touches it
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable
+
+
+MIGRATIONS = []
+
+
+def migration(version: int, description: str):
+    def register(apply):
+        MIGRATIONS.append(Migration(version, description, apply))
+        return apply
+
+    return register
+
+
+def _columns(connection, table_name: str):
+    return {column["name"] for column in inspect(connection).get_columns(table_name)}
+
+
+def _index_names(connection, table_name: str):
+    return {index["name"] for index in inspect(connection).get_indexes(table_name)}
+
+
+# Migrations run in version order and each one is recorded once applied.
+# They check what already exists, because databases created before this
+# runner have some of these objects already; the same check lets a
+# migration that failed halfway (MySQL commits DDL implicitly) run again.
+
+
+@migration(1, "create pavilions, clubs and games")
+def _create_base_tables(connection):
+    tables = [Pavilion.__table__, Club.__table__, Game.__table__]
+    Pavilion.metadata.create_all(connection, tables=tables)
+
+
+@migration(2, "add updated_at to pavilions, clubs and games")
+def _add_updated_at(connection):
+    for model in (Pavilion, Club, Game):
+        table = model.__table__
+        if "updated_at" not in _columns(connection, table.name):
+            column_ddl = CreateColumn(table.c.updated_at).compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+
+
+# The games indexes as migration 3 created them, before games had a season
+_GAME_INDEXES_V3 = {
+    "ix_games_date_time_id": ("date_time", "id"),
+    "ix_games_jornada_date_time_id": ("jornada", "date_time", "id"),
+    "ix_games_club_home_date_time_id": ("club_home_id", "date_time", "id"),
+    "ix_games_club_visitor_date_time_id": ("club_visitor_id", "date_time", "id"),
+    "ix_games_pavilion_date_time_id": ("pavilion_id", "date_time", "id"),
+    "ix_games_finished_date_time_id": ("finished", "date_time", "id"),
+}
+
+
+@migration(3, "add games indexes for paging, filters and booking checks")
+def _add_game_indexes(connection):
+    if "season" in _columns(connection, Game.__tablename__):
+        # Created by migration 1 from the current model, indexes included
+        return
+
+    existing = _index_names(connection, Game.__tablename__)
+    for name, columns in _GAME_INDEXES_V3.items():
+        if name not in existing:
+            connection.execute(
+                text(f"CREATE INDEX {name} ON {Game.__tablename__} ({', '.join(columns)})")
+            )
+
+
+@migration(4, "create standings and table_versions")
+def _create_standings_and_versions(connection):
+    # Migration 7 fills the standings, once games have a season
+    Standing.metadata.create_all(
+        connection, tables=[Standing.__table__, TableVersion.__table__]
+    )
+
+
+@migration(5, "create changes")
+def _create_changes(connection):
+    Change.metadata.create_all(connection, tables=[Change.__table__])
+
+
+@migration(6, "create outbox")
+def _create_outbox(connection):
+    OutboxEvent.metadata.create_all(connection, tables=[OutboxEvent.__table__])
+
+
+@migration(7, "add season to games and standings")
+def _add_seasons(connection):
+    games = Game.__table__
+    if "season" not in _columns(connection, games.name):
+        connection.execute(
+            text(f"ALTER TABLE {games.name} ADD COLUMN season VARCHAR(16) NOT NULL DEFAULT ''")
+        )
+
+    # One range update per season, oldest first
+    first, last = connection.execute(
+        select(func.min(games.c.date_time), func.max(games.c.date_time)).where(
+            games.c.season == ""
+        )
+    ).first()
+    if first is not None:
+        season = season_for(first)
+        while True:
+            start, end = season_bounds(season)
+            connection.execute(
+                update(games)
+                .where(
+                    games.c.season == "",
+                    games.c.date_time >= start,
+                    games.c.date_time < end,
+                )
+                .values(season=season)
+            )
+            if end > last:
+                break
+            season = season_for(end)
+
+    if connection.dialect.name == "mysql":
+        connection.execute(text(f"ALTER TABLE {games.name} ALTER COLUMN season DROP DEFAULT"))
+
+    existing = _index_names(connection, games.name)
+    for index in games.indexes:
+        if index.name not in existing:
+            index.create(connection)
+    # The old club and pavilion indexes stay: MySQL uses them to enforce the
+    # foreign keys, which the season-led indexes cannot
+    for name in ("ix_games_jornada_date_time_id", "ix_games_finished_date_time_id"):
+        if name in existing:
+            on_table = f" ON {games.name}" if connection.dialect.name == "mysql" else ""
+            connection.execute(text(f"DROP INDEX {name}{on_table}"))
+
+    if "season" not in _columns(connection, Standing.__tablename__):
+        # The primary key changes
+        Standing.__table__.drop(connection)
+        Standing.__table__.create(connection)
+    # Count every game per season; the session joins our transaction. There
+    # is no archive yet.
+    rebuild_standings(Session(bind=connection), sources=(Game,))
+
+
+@migration(8, "create games_archive")
+def _create_games_archive(connection):
+    ArchivedGame.metadata.create_all(connection, tables=[ArchivedGame.__table__])
+
+
+@migration(9, "create image_uploads")
+def _create_image_uploads(connection):
+    ImageUpload.metadata.create_all(connection, tables=[ImageUpload.__table__])
+
+
+@migration(10, "insert table_versions rows")
+def _insert_table_versions(connection):
+    insert_table_versions(connection)
+
+
+@migration(11, "add failed_at to outbox")
+def _add_outbox_failed_at(connection):
+    outbox = OutboxEvent.__table__
+    if "failed_at" not in _columns(connection, outbox.name):
+        column_ddl = CreateColumn(outbox.c.failed_at).compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE {outbox.name} ADD COLUMN {column_ddl}"))
+
+    existing = _index_names(connection, outbox.name)
+    for index in outbox.indexes:
+        if index.name not in existing:
+            index.create(connection)
+    # Replaced by ix_outbox_due, which skips dead-lettered events
+    if "ix_outbox_pending" in existing:
+        on_table = f" ON {outbox.name}" if connection.dialect.name == "mysql" else ""
+        connection.execute(text(f"DROP INDEX ix_outbox_pending{on_table}"))
+
+
+LATEST_VERSION = max(m.version for m in MIGRATIONS)
+
+
+def current_version(connection) -> int:
+    if not inspect(connection).has_table(schema_migrations.name):
+        return 0
+    return connection.scalar(select(func.max(schema_migrations.c.version))) or 0
+
+
+@contextmanager
+def migration_lock(connection, timeout: int = MIGRATION_LOCK_TIMEOUT):
+    """Hold a database-wide advisory lock so that only one worker migrates.
+
+    Uses MySQL GET_LOCK, which belongs to the connection and survives
+    commits. Other databases (SQLite in development) have a single writer
+    anyway, so no lock is taken.
+    """
+    if connection.dialect.name != "mysql":
+        yield
+        return
+
+    acquired = connection.scalar(
+        text("SELECT GET_LOCK(:name, :timeout)"),
+        {"name": MIGRATION_LOCK_NAME, "timeout": timeout},
+    )
+    if acquired != 1:
+        raise RuntimeError(f"Timed out waiting for the {MIGRATION_LOCK_NAME} lock")
+    try:
+        yield
+    finally:
+        connection.scalar(text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK_NAME})
+
+
+def migrate(engine) -> bool:
+    """Apply pending migrations; return whether any were applied.
+
+    When the recorded version is current this costs two small queries and
+    takes no lock, which is the normal case on every worker start.
+    """
+    with engine.connect() as connection:
+        if current_version(connection) >= LATEST_VERSION:
+            return False
+        connection.commit()
+
+        with migration_lock(connection):
+            schema_migrations.create(connection, checkfirst=True)
+            connection.commit()
+
+            # Another worker may have migrated while we waited for the lock
+            applied = set(connection.scalars(select(schema_migrations.c.version)))
+            pending = [m for m in sorted(MIGRATIONS) if m.version not in applied]
+            for m in pending:
+                logger.info("Applying migration %s: %s", m.version, m.description)
+                m.apply(connection)
+                connection.execute(
+                    insert(schema_migrations).values(
+                        version=m.version,
+                        description=m.description,
+                        applied_at=datetime.utcnow(),
+                    )
+                )
+                connection.commit()
+
+            return bool(pending)
@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Below MySQL's default wait_timeout, so the server never closes a pooled
+# connection before we recycle it
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+
+
+class PoolStats:
+    """Counters for one pool, updated from pool events and checkouts."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "timeouts": self.timeouts,
+                "checkout_wait_avg_ms": round(
+                    self.wait_total * 1000 / max(self.checkouts + self.timeouts, 1), 3
+                ),
+                "checkout_wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        return stats
+
+
+# One entry per instrumented engine in this worker, keyed by pool name
+pool_stats = {}
+
+
+class _MeteredPoolMixin:
+    # Times every checkout, including waiting for a free connection and
+    # opening a new one. Pools are looked up by logging name, which survives
+    # Pool.recreate() after engine.dispose().
+    def _do_get(self):
+        stats = pool_stats.get(self.logging_name)
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if stats is not None:
+                stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        if stats is not None:
+            stats.record_wait(time.perf_counter() - start)
+        return connection
+
+
+class MeteredQueuePool(_MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(_MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, name: str, is_async: bool = False) -> dict:
+    """Keyword arguments for create_engine with the pool settings from the environment."""
+    if make_url(url).get_backend_name() == "sqlite":
+        # SQLite picks its own pool class; sizing options do not apply
+        return {"pool_pre_ping": DB_POOL_PRE_PING}
+
+    return {
+        "poolclass": MeteredAsyncQueuePool if is_async else MeteredQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_logging_name": name,
+    }
+
+
+def instrument_engine(engine, name: str) -> PoolStats:
+    """Register pool event listeners on engine and publish its stats under name."""
+    stats = pool_stats[name] = PoolStats(name)
+    stats.pool = engine.pool
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.increment("connects")
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.increment("invalidations")
+
+    @event.listens_for(engine, "soft_invalidate")
+    def on_soft_invalidate(dbapi_connection, connection_record, exception):
+        stats.increment("soft_invalidations")
+
+    @event.listens_for(engine, "engine_disposed")
+    def on_disposed(disposed_engine):
+        stats.pool = disposed_engine.pool
+
+    return stats
+
+
+def get_pool_stats() -> dict:
+    return {name: stats.snapshot() for name, stats in pool_stats.items()}
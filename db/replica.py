@@ -0,0 +1,119 @@
+import itertools
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+# How long a replica that failed is left out of the rotation
+DB_REPLICA_EJECT_SECONDS = float(os.getenv("DB_REPLICA_EJECT_SECONDS", "30"))
+# How long after a write committed in this worker reads stay on the primary,
+# so that a client reading its own write does not hit a lagging replica
+DB_REPLICA_LAG_SECONDS = float(os.getenv("DB_REPLICA_LAG_SECONDS", "1"))
+
+
+class ReplicaSet:
+    """Round-robin over replica engines, skipping the ones that recently failed.
+
+    A replica is ejected when a query on it fails with a connection error
+    and rejoins the rotation after eject_seconds.
+    """
+
+    def __init__(
+        self,
+        engines=(),
+        eject_seconds: float = DB_REPLICA_EJECT_SECONDS,
+        lag_seconds: float = DB_REPLICA_LAG_SECONDS,
+    ):
+        self.engines = list(engines)
+        self.eject_seconds = eject_seconds
+        self.lag_seconds = lag_seconds
+        self._lock = threading.Lock()
+        self._cycle = itertools.cycle(self.engines)
+        self._ejected_until = {}
+        self._last_write = float("-inf")
+
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        if context.is_disconnect or context.connection is None:
+            self.eject(context.engine)
+
+    def eject(self, engine):
+        with self._lock:
+            self._ejected_until[engine] = time.monotonic() + self.eject_seconds
+
+    def is_healthy(self, engine) -> bool:
+        return self._ejected_until.get(engine, 0) <= time.monotonic()
+
+    def record_write(self):
+        with self._lock:
+            self._last_write = time.monotonic()
+
+    def choose(self):
+        """Next healthy replica, or None when the primary should serve the read."""
+        with self._lock:
+            if time.monotonic() - self._last_write < self.lag_seconds:
+                return None
+            for _ in range(len(self.engines)):
+                engine = next(self._cycle)
+                if self.is_healthy(engine):
+                    return engine
+        return None
+
+
+class RoutingSession(Session):
+    """Session that can send plain reads to a replica.
+
+    With use_replicas, SELECTs go to a healthy replica, picked once per
+    session so that all its reads see the same replica; writes,
+    flushes and SELECT ... FOR UPDATE use the primary bind. Once the session
+    has done any of those it is pinned to the primary, so it reads its own
+    writes. Sessions without use_replicas always use the primary but still
+    report their commits, which keeps this worker's reads on the primary for
+    the replica lag window.
+    """
+
+    def __init__(self, *args, replicas: ReplicaSet = None, use_replicas: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.use_replicas = use_replicas
+        self.pinned = False
+        self._replica_chosen = False
+        self._replica = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.use_replicas
+            and self.replicas is not None
+            and not self.pinned
+            and not self._flushing
+            and isinstance(clause, Select)
+        ):
+            if not self._replica_chosen:
+                self._replica = self.replicas.choose()
+                self._replica_chosen = True
+            if self._replica is not None:
+                return self._replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _pin_on_write(orm_execute_state):
+    statement = orm_execute_state.statement
+    if not orm_execute_state.is_select or statement._for_update_arg is not None:
+        orm_execute_state.session.pinned = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _pin_after_flush(session, flush_context):
+    session.pinned = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_write(session):
+    if session.pinned and session.replicas is not None:
+        session.replicas.record_write()
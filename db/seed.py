@@ -0,0 +1,144 @@
+"""Seed an empty database from a snapshot file.
+
+    python -m db.seed [--snapshot static/seed.json] [--workers 8] [--skip-images]
+
+The snapshot is a JSON object with "pavilions", "clubs" and "games" lists.
+Pavilions and clubs carry explicit ids, which games refer to and which name
+their images: static/pavilions_populate/<id>.<ext> and
+static/clubs_populate/<id>.<ext>. Images are processed and uploaded
+concurrently; rows are bulk-inserted in one transaction, with their change log entries. The database is
+migrated first, and a database that already has clubs is left alone.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import insert
+
+from crud.changeRepo import record_changes
+from crud.gameRepo import bulk_create_games
+from crud.imageRepo import process_image
+from crud.versionRepo import bump_table_version
+from db.database import SessionLocal, engine
+from db.migrations import migrate
+from models.club import Club
+from models.pavilion import Pavilion
+
+DEFAULT_SNAPSHOT = "static/seed.json"
+PAVILION_IMAGES = "static/pavilions_populate"
+CLUB_IMAGES = "static/clubs_populate"
+
+
+def load_snapshot(path: str) -> dict:
+    with open(path, encoding="utf-8") as snapshot_file:
+        snapshot = json.load(snapshot_file)
+
+    for key in ("pavilions", "clubs", "games"):
+        snapshot.setdefault(key, [])
+    for key in ("pavilions", "clubs"):
+        if any("id" not in row for row in snapshot[key]):
+            raise ValueError(f"Every row in {key} needs an id")
+    return snapshot
+
+
+def find_images(folder: str) -> dict:
+    """Map row id to image path for files named <id>.<ext> in folder."""
+    if not os.path.isdir(folder):
+        return {}
+
+    images = {}
+    for file_name in os.listdir(folder):
+        row_id, _ = os.path.splitext(file_name)
+        if row_id.isdigit():
+            images[int(row_id)] = os.path.join(folder, file_name)
+    return images
+
+
+def _upload_image(job):
+    path, folder = job
+    with open(path, "rb") as image_file:
+        data = image_file.read()
+    return asyncio.run(process_image(data, folder))
+
+
+def upload_images(jobs, workers: int) -> list:
+    """Process and upload (path, folder) jobs on a thread pool, in order.
+
+    Each thread hands decoding and encoding to the image process pool and
+    then waits on the network-bound S3 upload, so threads overlap both.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_upload_image, jobs))
+
+
+def seed(snapshot: dict, db, workers: int, with_images: bool = True):
+    images = {}
+    if with_images:
+        jobs = []
+        for kind, folder, rows in (
+            ("pavilions", PAVILION_IMAGES, snapshot["pavilions"]),
+            ("clubs", CLUB_IMAGES, snapshot["clubs"]),
+        ):
+            available = find_images(folder)
+            jobs += [
+                ((kind, row["id"]), (available[row["id"]], f"{kind}/{row['id']}"))
+                for row in rows
+                if row["id"] in available
+            ]
+        urls = upload_images([job for _, job in jobs], workers)
+        images = {key: url for (key, _), url in zip(jobs, urls)}
+
+    for model, kind, entity in ((Pavilion, "pavilions", "pavilion"), (Club, "clubs", "club")):
+        rows = [
+            {**row, "image": images.get((kind, row["id"]), row.get("image", ""))}
+            for row in snapshot[kind]
+        ]
+        if rows:
+            db.execute(insert(model), rows)
+            # The change log is the full history: consumers need these rows
+            # before the games that refer to them
+            record_changes(
+                db,
+                entity,
+                db.query(model).filter(model.id.in_([row["id"] for row in rows])).order_by(model.id),
+            )
+            bump_table_version(db, model.__tablename__)
+
+    # Commits pavilions, clubs and games together
+    return bulk_create_games(enumerate(snapshot["games"], start=1), db)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed an empty database")
+    parser.add_argument("--snapshot", default=DEFAULT_SNAPSHOT)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--skip-images", action="store_true")
+    args = parser.parse_args(argv)
+
+    snapshot = load_snapshot(args.snapshot)
+    migrate(engine)
+
+    db = SessionLocal()
+    try:
+        if db.query(Club.id).first() is not None:
+            print("Database already has data, nothing to seed")
+            return 0
+
+        result = seed(snapshot, db, args.workers, with_images=not args.skip_images)
+    finally:
+        db.close()
+
+    print(
+        f"Seeded {len(snapshot['pavilions'])} pavilions, {len(snapshot['clubs'])} clubs "
+        f"and {result['inserted']} games"
+    )
+    for error in result["errors"]:
+        print(f"Game row {error['row']}: {error['detail']}", file=sys.stderr)
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Process completed image uploads outside the API.
+
+    python -m db.uploads
+
+Run one or more of these next to the API: by default the API only
+queues uploads, so that its workers never hold image bytes. Processors
+share the queue through row locks; stop with Ctrl+C or SIGTERM.
+"""
+import signal
+import sys
+
+from crud.imagePool import image_pool
+from crud.uploadProcessor import upload_processor
+from db.database import engine
+from db.migrations import migrate
+
+
+def main(argv=None):
+    migrate(engine)
+
+    signal.signal(signal.SIGTERM, lambda *_: upload_processor.stop(timeout=0))
+    try:
+        upload_processor.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        image_pool.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
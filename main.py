@@ -2,23 +2,30 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
 from starlette import status
+from starlette.concurrency import run_in_threadpool
 
-from db.create_database import create_tables, populate_db
-from db.database import SessionLocal
-from routers import club, game, pavilion
+from crud.imagePool import image_pool
+from crud.outboxDispatcher import outbox_dispatcher
+from crud.uploadProcessor import (IMAGE_UPLOAD_PROCESSOR_IN_API,
+                                  upload_processor)
+from db.database import SessionLocal, engine
+from db.migrations import migrate
+from db.pool import get_pool_stats
+from routers import change, club, game, pavilion, standing, upload
 
 
 @asynccontextmanager
 async def lifespan(app):
-    create_tables()
-    db: Session = SessionLocal()
-    try:
-        await populate_db(db)
-    finally:
-        db.close()
+    # Seeding is a separate step: python -m db.seed
+    await run_in_threadpool(migrate, engine)
+    outbox_dispatcher.start()
+    if IMAGE_UPLOAD_PROCESSOR_IN_API:
+        upload_processor.start()
     yield
+    outbox_dispatcher.stop()
+    upload_processor.stop()
+    image_pool.stop()
 
 
 app = FastAPI(
@@ -54,9 +61,22 @@ def get_health():
     return {"status": "ok"}
 
 
+@app.get(
+    "/health/db-pool",
+    tags=["healthcheck"],
+    summary="Database connection pool metrics for this worker",
+    status_code=status.HTTP_200_OK,
+)
+def get_db_pool_health():
+    return get_pool_stats()
+
+
 app.include_router(club.router)
 app.include_router(game.router)
 app.include_router(pavilion.router)
+app.include_router(standing.router)
+app.include_router(change.router)
+app.include_router(upload.router)
 
 
 @app.middleware("http")
@@ -0,0 +1,32 @@
+from sqlalchemy import (Boolean, Column, DateTime, ForeignKey, Index, Integer,
+                        String, func)
+
+from db.database import Base
+
+
+class ArchivedGame(Base):
+    """Finished game of a past season, moved out of the games table.
+
+    Same columns as Game, so that a game keeps its id and can be read back
+    through include_archived.
+    """
+
+    __tablename__ = "games_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    season = Column(String(16), nullable=False)
+    jornada = Column(Integer, nullable=False)
+    score_home = Column(Integer, nullable=True)
+    score_visitor = Column(Integer, nullable=True)
+    date_time = Column(DateTime, nullable=False)
+    club_home_id = Column(Integer, ForeignKey("clubs.id"), nullable=False)
+    club_visitor_id = Column(Integer, ForeignKey("clubs.id"), nullable=False)
+    pavilion_id = Column(Integer, ForeignKey("pavilions.id"), nullable=False)
+    finished = Column(Boolean, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_games_archive_date_time_id", "date_time", "id"),
+        Index("ix_games_archive_season_date_time_id", "season", "date_time", "id"),
+    )
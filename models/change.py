@@ -0,0 +1,17 @@
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, func
+
+from db.database import Base
+
+
+class Change(Base):
+    __tablename__ = "changes"
+
+    # The id is the feed cursor: it only grows, in commit order
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(16), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String(8), nullable=False)
+    data = Column(JSON, nullable=True)
+    changed_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (Index("ix_changes_entity_id", "entity", "id"),)
@@ -1,7 +1,7 @@
 from typing import List, Optional
 
 from sqlalchemy import (ARRAY, Boolean, Column, DateTime, Float, ForeignKey,
-                        Integer, String, Text)
+                        Integer, String, Text, func)
 
 from db.database import Base
 
@@ -12,4 +12,7 @@ class Club(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), index=True, nullable=False)
     image = Column(String(2048), nullable=False)
-    pavilion_id = Column(Integer, ForeignKey("pavilions.id"), nullable=False)
\ No newline at end of file
+    pavilion_id = Column(Integer, ForeignKey("pavilions.id"), nullable=False)
+    updated_at = Column(
+        DateTime, nullable=False, server_default=func.now(), onupdate=func.now()
+    )
@@ -1,7 +1,7 @@
 from typing import List, Optional
 
 from sqlalchemy import (ARRAY, Boolean, Column, DateTime, Float, ForeignKey,
-                        Integer, String, Text)
+                        Index, Integer, String, Text, func)
 
 from db.database import Base
 
@@ -10,6 +10,8 @@ class Game(Base):
     __tablename__ = "games"
 
     id = Column(Integer, primary_key=True, index=True)
+    # Season or competition, e.g. "2024-25"; partitions every game query
+    season = Column(String(16), nullable=False)
     jornada = Column(Integer, nullable=False)
     score_home = Column(Integer, nullable=True)
     score_visitor = Column(Integer, nullable=True)
@@ -18,4 +20,51 @@ class Game(Base):
     club_visitor_id = Column(Integer, ForeignKey("clubs.id"), nullable=False)
     pavilion_id = Column(Integer, ForeignKey("pavilions.id"), nullable=False)
     finished = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(
+        DateTime, nullable=False, server_default=func.now(), onupdate=func.now()
+    )
 
+    # Every listing index leads with season, so that queries scoped to one
+    # season only touch its rows, and ends in (date_time, id) so that each
+    # filter combined with the keyset cursor of get_all_games is a single
+    # range scan. ix_games_date_time_id serves the booking checks, which
+    # look at a time window across seasons.
+    __table_args__ = (
+        Index("ix_games_date_time_id", "date_time", "id"),
+        Index("ix_games_season_date_time_id", "season", "date_time", "id"),
+        Index(
+            "ix_games_season_jornada_date_time_id",
+            "season",
+            "jornada",
+            "date_time",
+            "id",
+        ),
+        Index(
+            "ix_games_season_club_home_date_time_id",
+            "season",
+            "club_home_id",
+            "date_time",
+            "id",
+        ),
+        Index(
+            "ix_games_season_club_visitor_date_time_id",
+            "season",
+            "club_visitor_id",
+            "date_time",
+            "id",
+        ),
+        Index(
+            "ix_games_season_pavilion_date_time_id",
+            "season",
+            "pavilion_id",
+            "date_time",
+            "id",
+        ),
+        Index(
+            "ix_games_season_finished_date_time_id",
+            "season",
+            "finished",
+            "date_time",
+            "id",
+        ),
+    )
@@ -0,0 +1,27 @@
+from sqlalchemy import (JSON, Column, DateTime, Index, Integer, String, Text,
+                        func)
+
+from db.database import Base
+
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(String(32), nullable=False)
+    aggregate_id = Column(Integer, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+    dispatched_at = Column(DateTime, nullable=True)
+    # Set when the event ran out of attempts (dead-lettered)
+    failed_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    # The dispatcher polls undelivered, live events that are due, oldest
+    # first; dead-lettered events fall outside that range. Pruning scans the
+    # delivered ones by dispatched_at.
+    __table_args__ = (
+        Index("ix_outbox_due", "dispatched_at", "failed_at", "next_attempt_at", "id"),
+    )
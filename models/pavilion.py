@@ -1,7 +1,7 @@
 from typing import List, Optional
 
 from sqlalchemy import (ARRAY, Boolean, Column, DateTime, Float, ForeignKey,
-                        Integer, String, Text)
+                        Integer, String, Text, func)
 
 from db.database import Base
 
@@ -14,3 +14,6 @@ class Pavilion(Base):
     location = Column(String(264), nullable=False)
     location_link = Column(String(2048), nullable=True)
     image = Column(String(2048), nullable=False)
+    updated_at = Column(
+        DateTime, nullable=False, server_default=func.now(), onupdate=func.now()
+    )
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, ForeignKey, Integer, String
+
+from db.database import Base
+
+
+class Standing(Base):
+    __tablename__ = "standings"
+
+    season = Column(String(16), primary_key=True)
+    club_id = Column(Integer, ForeignKey("clubs.id"), primary_key=True)
+    played = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    draws = Column(Integer, nullable=False, default=0)
+    losses = Column(Integer, nullable=False, default=0)
+    goals_for = Column(Integer, nullable=False, default=0)
+    goals_against = Column(Integer, nullable=False, default=0)
+    points = Column(Integer, nullable=False, default=0)
+
+    @property
+    def goal_difference(self):
+        return self.goals_for - self.goals_against
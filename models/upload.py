@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, func
+
+from db.database import Base
+
+
+class ImageUpload(Base):
+    __tablename__ = "image_uploads"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # club or pavilion, and its id: whose image the upload becomes
+    target = Column(String(16), nullable=False)
+    target_id = Column(Integer, nullable=False)
+    status = Column(String(16), nullable=False)
+    image = Column(String(2048), nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(
+        DateTime, nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+
+    # The processor polls uploads that are due, oldest first
+    __table_args__ = (
+        Index("ix_image_uploads_pending", "status", "next_attempt_at", "id"),
+    )
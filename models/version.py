@@ -0,0 +1,11 @@
+from sqlalchemy import Column, DateTime, Integer, String, func
+
+from db.database import Base
+
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
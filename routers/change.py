@@ -0,0 +1,19 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.orm import Session
+
+from crud.changeRepo import get_changes
+from crud.versionRepo import check_table_not_modified
+from db.database import get_read_db
+from models.change import Change as ChangeModel
+from schemas.change import ChangePage
+
+router = APIRouter(tags=["Changes"])
+
+@router.get("/changes", response_model=ChangePage)
+def get_changes_endpoint(request: Request, response: Response, since: int = Query(0, ge=0, description="next_since of the previous page; 0 for the full history"), limit: int = Query(100, ge=1, le=1000), entity: Optional[str] = Query(None, pattern="^(game|club|pavilion)$"), db: Session = Depends(get_read_db)):
+    not_modified = check_table_not_modified(request, response, db, ChangeModel.__tablename__)
+    if not_modified:
+        return not_modified
+    return get_changes(db, since=since, limit=limit, entity=entity)
@@ -1,19 +1,29 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import (APIRouter, Depends, File, Form, HTTPException, Query,
+                     Request, Response, UploadFile)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from crud.clubRepo import (create_club, delete_club, get_all_clubs,
-                           get_club_by_id, get_pavilion_by_club_id,
-                           update_club)
-from db.database import get_db
+from crud.asyncClubRepo import create_club, update_club
+from crud.calendarRepo import get_club_calendar
+from crud.clubRepo import (delete_club, get_all_clubs, get_club_by_id,
+                           get_games_by_club_id, get_pavilion_by_club_id)
+from crud.gameRepo import encode_game_cursor
+from crud.seasonRepo import season_query
+from crud.versionRepo import check_row_not_modified, check_table_not_modified
+from db.database import get_async_db, get_db, get_read_db
 from models.club import Club as ClubModel
+from models.game import Game as GameModel
+from models.pavilion import Pavilion as PavilionModel
 from schemas.club import ClubCreate, ClubInDB, ClubUpdate
+from schemas.game import GameInDB
 
 router = APIRouter(tags=["Clubs"])
 
 @router.post("/clubs", response_model=ClubInDB)
-async def create_club_endpoint(name: str = Form(...), pavilion_id: int = Form(...), image: UploadFile = File(...), db: Session = Depends(get_db)):
+async def create_club_endpoint(name: str = Form(...), pavilion_id: int = Form(...), image: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
     if not name.strip() or not pavilion_id:
         raise HTTPException(status_code=400, detail="Name and pavilion_id are required and cannot be empty")
     
@@ -21,18 +31,24 @@ async def create_club_endpoint(name: str = Form(...), pavilion_id: int = Form(..
     return await create_club(new_club, image, db)
 
 @router.get("/clubs/{club_id}", response_model=ClubInDB)
-def get_club_by_id_endpoint(club_id: int, db: Session = Depends(get_db)):
+def get_club_by_id_endpoint(club_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    not_modified = check_row_not_modified(request, response, db, ClubModel, club_id)
+    if not_modified:
+        return not_modified
     club = get_club_by_id(club_id, db)
     if club is None:
         raise HTTPException(status_code=404, detail="Club not found")
     return club
 
 @router.get("/clubs", response_model=List[ClubInDB])
-def get_all_clubs_endpoint(db: Session = Depends(get_db)):
+def get_all_clubs_endpoint(request: Request, response: Response, db: Session = Depends(get_read_db)):
+    not_modified = check_table_not_modified(request, response, db, ClubModel.__tablename__)
+    if not_modified:
+        return not_modified
     return get_all_clubs(db)
 
 @router.put("/clubs/{club_id}", response_model=ClubInDB)
-async def update_club_endpoint(club_id: int, name: Optional[str] = Form(None), pavilion_id: Optional[int] = Form(None), image: Optional[UploadFile] = File(None), db: Session = Depends(get_db)):
+async def update_club_endpoint(club_id: int, name: Optional[str] = Form(None), pavilion_id: Optional[int] = Form(None), image: Optional[UploadFile] = File(None), db: AsyncSession = Depends(get_async_db)):
     club_data = ClubUpdate(name=name, pavilion_id=pavilion_id)
     return await update_club(club_id, club_data, image, db)
 
@@ -41,5 +57,29 @@ def delete_club_endpoint(club_id: int, db: Session = Depends(get_db)):
     return delete_club(club_id, db)
 
 @router.get("/clubs/{club_id}/pavilion")
-def get_pavilion_by_club_id_endpoint(club_id: int, db: Session = Depends(get_db)):
-    return get_pavilion_by_club_id(club_id, db)
\ No newline at end of file
+def get_pavilion_by_club_id_endpoint(club_id: int, db: Session = Depends(get_read_db)):
+    return get_pavilion_by_club_id(club_id, db)
+
+@router.get("/clubs/{club_id}/games", response_model=List[GameInDB])
+def get_games_by_club_id_endpoint(club_id: int, request: Request, response: Response, cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=500), season: str = Depends(season_query), db: Session = Depends(get_read_db)):
+    not_modified = check_table_not_modified(request, response, db, GameModel.__tablename__, extra=(club_id, season))
+    if not_modified:
+        return not_modified
+    games = get_games_by_club_id(club_id, db, season=season, cursor=cursor, limit=limit)
+    if len(games) == limit:
+        response.headers["X-Next-Cursor"] = encode_game_cursor(games[-1])
+    return games
+
+@router.get("/clubs/{club_id}/games.ics", response_class=StreamingResponse)
+def get_club_calendar_endpoint(club_id: int, request: Request, response: Response, season: str = Depends(season_query), db: Session = Depends(get_read_db)):
+    tables = (GameModel.__tablename__, ClubModel.__tablename__, PavilionModel.__tablename__)
+    not_modified = check_table_not_modified(request, response, db, *tables, extra=(club_id, season))
+    if not_modified:
+        return not_modified
+    calendar = get_club_calendar(club_id, db, season=season)
+    validators = {key: value for key, value in response.headers.items() if key in ("etag", "last-modified")}
+    return StreamingResponse(
+        calendar,
+        media_type="text/calendar; charset=utf-8",
+        headers={**validators, "Content-Disposition": f'inline; filename="club-{club_id}.ics"'},
+    )
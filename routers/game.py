@@ -1,47 +1,164 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import (APIRouter, Depends, File, HTTPException, Query, Request,
+                     Response, UploadFile)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from crud.gameRepo import (create_game, delete_game, get_all_games,
+from crud.asyncGameRepo import create_game, delete_game, update_game
+from crud.gameRepo import (encode_game_cursor, expand_games, get_all_games,
                            get_all_games_except_next, get_game_by_id,
-                           get_next_game, update_game)
-from db.database import get_db
+                           get_next_game, import_games, parse_expand)
+from crud.fixtureRepo import create_fixtures, generate_fixtures
+from crud.liveHub import live_hub
+from crud.seasonRepo import get_seasons, season_query
+from crud.versionRepo import check_row_not_modified, check_table_not_modified
+from db.database import get_async_db, get_db, get_read_db
+from models.archive import ArchivedGame
+from models.club import Club as ClubModel
 from models.game import Game as GameModel
-from schemas.game import GameCreate, GameInDB, GameUpdate
+from models.pavilion import Pavilion as PavilionModel
+from schemas.game import (FixtureRequest, GameBulkResult, GameCreate,
+                          GameExpanded, GameInDB, GameUpdate)
 
 router = APIRouter(tags=["Games"])
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+EXPAND_DESCRIPTION = "Comma-separated related objects to inline: clubs, pavilion"
+ARCHIVED_DESCRIPTION = "Also read finished games of past seasons that were archived"
+
+
+def expanded_tables(expand, include_archived=False):
+    tables = [GameModel.__tablename__]
+    if include_archived:
+        tables.append(ArchivedGame.__tablename__)
+    if "clubs" in expand:
+        tables.append(ClubModel.__tablename__)
+    if "pavilion" in expand:
+        tables.append(PavilionModel.__tablename__)
+    return tables
+
 @router.post("/games", response_model=GameInDB)
-def create_game_endpoint(new_game: GameCreate, db: Session = Depends(get_db)):
-    return create_game(new_game, db)
+async def create_game_endpoint(new_game: GameCreate, db: AsyncSession = Depends(get_async_db)):
+    return await create_game(new_game, db)
+
+@router.post("/games/bulk", response_model=GameBulkResult)
+def bulk_create_games_endpoint(file: UploadFile = File(...), format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"), db: Session = Depends(get_db)):
+    if format is None:
+        filename = (file.filename or "").lower()
+        if filename.endswith(".csv") or file.content_type == "text/csv":
+            format = "csv"
+        elif filename.endswith((".ndjson", ".jsonl")) or file.content_type == "application/x-ndjson":
+            format = "ndjson"
+        else:
+            raise HTTPException(status_code=400, detail="Could not detect file format, pass ?format=csv or ?format=ndjson")
+    return import_games(file, format, db)
 
-@router.get("/games/next", response_model=GameInDB)
-def get_next_game_endpoint(db: Session = Depends(get_db)):
-    game = get_next_game(db)
+@router.post("/games/fixtures/preview", response_model=List[GameCreate])
+def preview_fixtures_endpoint(request: FixtureRequest, db: Session = Depends(get_db)):
+    return generate_fixtures(request, db)
+
+@router.post("/games/fixtures", response_model=GameBulkResult)
+def create_fixtures_endpoint(request: FixtureRequest, db: Session = Depends(get_db)):
+    return create_fixtures(request, db)
+
+@router.get("/games/live")
+async def live_games_endpoint(request: Request, game_id: Optional[int] = None):
+    subscriber = live_hub.subscribe(game_id)
+    return StreamingResponse(
+        live_hub.stream(subscriber, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/games/next", response_model=GameExpanded, response_model_exclude_unset=True)
+def get_next_game_endpoint(request: Request, response: Response, expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION), season: str = Depends(season_query), db: Session = Depends(get_read_db)):
+    expand = parse_expand(expand)
+    game = get_next_game(db, season)
     if game is None:
         raise HTTPException(status_code=404, detail="No upcoming game found")
-    return game
+    # The next game rolls over with the clock, not with a write: ETag only
+    not_modified = check_table_not_modified(request, response, db, *expanded_tables(expand), extra=(season, game.id), with_last_modified=False)
+    if not_modified:
+        return not_modified
+    return expand_games([game], expand, db)[0]
 
 @router.get("/games/exclude-next", response_model=List[GameInDB])
-def get_all_games_except_next_endpoint(db: Session = Depends(get_db)):
-    return get_all_games_except_next(db)
+def get_all_games_except_next_endpoint(request: Request, response: Response, season: str = Depends(season_query), db: Session = Depends(get_read_db)):
+    next_game = get_next_game(db, season)
+    not_modified = check_table_not_modified(request, response, db, GameModel.__tablename__, extra=(season, next_game.id if next_game else None), with_last_modified=False)
+    if not_modified:
+        return not_modified
+    return get_all_games_except_next(db, season)
+
+@router.get("/seasons", response_model=List[str])
+def get_seasons_endpoint(request: Request, response: Response, db: Session = Depends(get_read_db)):
+    not_modified = check_table_not_modified(request, response, db, GameModel.__tablename__)
+    if not_modified:
+        return not_modified
+    return get_seasons(db)
 
-@router.get("/games/{game_id}", response_model=GameInDB)
-def get_game_by_id_endpoint(game_id: int, db: Session = Depends(get_db)):
-    game = get_game_by_id(game_id, db)
+@router.get("/games/{game_id}", response_model=GameExpanded, response_model_exclude_unset=True)
+def get_game_by_id_endpoint(game_id: int, request: Request, response: Response, expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION), include_archived: bool = Query(False, description=ARCHIVED_DESCRIPTION), db: Session = Depends(get_read_db)):
+    expand = parse_expand(expand)
+    if expand or include_archived:
+        not_modified = check_table_not_modified(request, response, db, *expanded_tables(expand, include_archived), extra=(game_id,))
+    else:
+        not_modified = check_row_not_modified(request, response, db, GameModel, game_id)
+    if not_modified:
+        return not_modified
+    game = get_game_by_id(game_id, db, include_archived=include_archived)
     if game is None:
         raise HTTPException(status_code=404, detail="Game not found")
-    return game
+    return expand_games([game], expand, db)[0]
 
-@router.get("/games", response_model=List[GameInDB])
-def get_all_games_endpoint(db: Session = Depends(get_db)):
-    return get_all_games(db)
+@router.get("/games", response_model=List[GameExpanded], response_model_exclude_unset=True)
+def get_all_games_endpoint(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    jornada: Optional[int] = None,
+    club_id: Optional[int] = None,
+    pavilion_id: Optional[int] = None,
+    finished: Optional[bool] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    include_archived: bool = Query(False, description=ARCHIVED_DESCRIPTION),
+    season: str = Depends(season_query),
+    db: Session = Depends(get_read_db),
+):
+    expand = parse_expand(expand)
+    not_modified = check_table_not_modified(request, response, db, *expanded_tables(expand, include_archived), extra=(season,))
+    if not_modified:
+        return not_modified
+    games = get_all_games(
+        db,
+        season=season,
+        cursor=cursor,
+        limit=limit,
+        jornada=jornada,
+        club_id=club_id,
+        pavilion_id=pavilion_id,
+        finished=finished,
+        date_from=date_from,
+        date_to=date_to,
+        include_archived=include_archived,
+    )
+    # A full page means there may be more games; the client passes this back as ?cursor=
+    if len(games) == limit:
+        response.headers["X-Next-Cursor"] = encode_game_cursor(games[-1])
+    return expand_games(games, expand, db)
 
 @router.put("/games/{game_id}", response_model=GameInDB)
-def update_game_endpoint(game_id: int, game_data: GameUpdate, db: Session = Depends(get_db)):
-    return update_game(game_id, game_data, db)
+async def update_game_endpoint(game_id: int, game_data: GameUpdate, db: AsyncSession = Depends(get_async_db)):
+    return await update_game(game_id, game_data, db)
 
 @router.delete("/games/{game_id}")
-def delete_game_endpoint(game_id: int, db: Session = Depends(get_db)):
-    return delete_game(game_id, db)
+async def delete_game_endpoint(game_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await delete_game(game_id, db)
@@ -1,18 +1,21 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import (APIRouter, Depends, File, Form, HTTPException, Request,
+                     Response, UploadFile)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from crud.pavilionRepo import (create_pavilion, delete_pavilion,
-                               get_pavilion_by_id, update_pavilion)
-from db.database import get_db
+from crud.asyncPavilionRepo import create_pavilion, update_pavilion
+from crud.pavilionRepo import delete_pavilion, get_pavilion_by_id
+from crud.versionRepo import check_row_not_modified
+from db.database import get_async_db, get_db, get_read_db
 from models.pavilion import Pavilion as PavilionModel
 from schemas.pavilion import CreatePavilion, PavilionInDB, UpdatePavilion
 
 router = APIRouter(tags=["Pavilions"])
 
 @router.post("/pavilions", response_model=PavilionInDB)
-async def create_pavilion_endpoint(name: str = Form(...), location: str = Form(...), location_link: Optional[str] = Form(None), image: UploadFile = File(...), db: Session = Depends(get_db)):
+async def create_pavilion_endpoint(name: str = Form(...), location: str = Form(...), location_link: Optional[str] = Form(None), image: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
     if not name.strip() or not location.strip() or not location_link.strip():
         raise HTTPException(status_code=400, detail="Name, location, and location link are required and cannot be empty")
     
@@ -20,14 +23,17 @@ async def create_pavilion_endpoint(name: str = Form(...), location: str = Form(.
     return await create_pavilion(new_pavilion, image, db)
 
 @router.get("/pavilions/{pavilion_id}", response_model=PavilionInDB)
-def get_pavilion_by_id_endpoint(pavilion_id: int, db: Session = Depends(get_db)):
+def get_pavilion_by_id_endpoint(pavilion_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    not_modified = check_row_not_modified(request, response, db, PavilionModel, pavilion_id)
+    if not_modified:
+        return not_modified
     pavilion = get_pavilion_by_id(pavilion_id, db)
     if pavilion is None:
         raise HTTPException(status_code=404, detail="Pavilion not found")
     return pavilion
 
 @router.put("/pavilions/{pavilion_id}", response_model=PavilionInDB)
-async def update_pavilion_endpoint(pavilion_id: int, name: Optional[str] = Form(None), location: Optional[str] = Form(None), location_link: Optional[str] = Form(None), image: Optional[UploadFile] = File(None), db: Session = Depends(get_db)):
+async def update_pavilion_endpoint(pavilion_id: int, name: Optional[str] = Form(None), location: Optional[str] = Form(None), location_link: Optional[str] = Form(None), image: Optional[UploadFile] = File(None), db: AsyncSession = Depends(get_async_db)):
     pavilion_data = UpdatePavilion(name=name, location=location, location_link=location_link)
     return await update_pavilion(pavilion_id, pavilion_data, image, db)
 
@@ -0,0 +1,19 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from crud.seasonRepo import season_query
+from crud.standingRepo import get_standings, rebuild_standings
+from db.database import get_db, get_read_db
+from schemas.standing import StandingInDB
+
+router = APIRouter(tags=["Standings"])
+
+@router.get("/standings", response_model=List[StandingInDB])
+def get_standings_endpoint(season: str = Depends(season_query), db: Session = Depends(get_read_db)):
+    return get_standings(db, season)
+
+@router.post("/standings/rebuild", response_model=List[StandingInDB])
+def rebuild_standings_endpoint(season: str = Depends(season_query), db: Session = Depends(get_db)):
+    return rebuild_standings(db, season)
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from crud.uploadRepo import complete_upload, create_upload, get_upload
+from db.database import get_db
+from schemas.upload import ImageUploadInDB, ImageUploadTicket
+
+router = APIRouter(tags=["Image uploads"])
+
+@router.post("/clubs/{club_id}/image-uploads", response_model=ImageUploadTicket)
+def create_club_image_upload_endpoint(club_id: int, db: Session = Depends(get_db)):
+    return create_upload("club", club_id, db)
+
+@router.post("/pavilions/{pavilion_id}/image-uploads", response_model=ImageUploadTicket)
+def create_pavilion_image_upload_endpoint(pavilion_id: int, db: Session = Depends(get_db)):
+    return create_upload("pavilion", pavilion_id, db)
+
+@router.post("/image-uploads/{upload_id}/complete", response_model=ImageUploadInDB, status_code=202)
+def complete_image_upload_endpoint(upload_id: int, db: Session = Depends(get_db)):
+    return complete_upload(upload_id, db)
+
+# Polled right after writes, so it reads the primary rather than a replica
+@router.get("/image-uploads/{upload_id}", response_model=ImageUploadInDB)
+def get_image_upload_endpoint(upload_id: int, db: Session = Depends(get_db)):
+    return get_upload(upload_id, db)
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class ChangeInDB(BaseModel):
+    id: int
+    entity: str
+    entity_id: int
+    operation: str
+    data: Optional[dict] = None
+    changed_at: datetime
+
+class ChangePage(BaseModel):
+    changes: List[ChangeInDB]
+    next_since: int
+    has_more: bool
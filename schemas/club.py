@@ -1,6 +1,8 @@
-from typing import Optional
+from typing import Dict, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
+
+from schemas.image import variant_urls
 
 
 class Club(BaseModel):
@@ -18,4 +20,10 @@ class ClubUpdate(Club):
 
 class ClubInDB(Club):
     id: int
-    image: str
\ No newline at end of file
+    image: str
+
+    # {"thumb": {"jpg": url, "webp": url}, "card": {...}, "full": {...}}
+    @computed_field
+    @property
+    def image_variants(self) -> Dict[str, Dict[str, str]]:
+        return variant_urls(self.image)
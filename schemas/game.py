@@ -1,10 +1,15 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from schemas.club import ClubInDB
+from schemas.pavilion import PavilionInDB
 
 
 class Game(BaseModel):
+    # Defaults to the season of date_time when a game is created
+    season: Optional[str] = Field(None, min_length=1, max_length=16)
     jornada: int
     score_home: Optional[int] = None     # ignoring for now
     score_visitor: Optional[int] = None #ignoring for now
@@ -18,6 +23,7 @@ class GameCreate(Game):
     pass
 
 class GameUpdate(Game):
+    season: Optional[str] = Field(None, min_length=1, max_length=16)
     jornada: Optional[int] = None
     score_home: Optional[int] = None
     score_visitor: Optional[int] = None
@@ -30,4 +36,23 @@ class GameUpdate(Game):
 class GameInDB(Game):
     id: int
 
-
+class GameExpanded(GameInDB):
+    club_home: Optional[ClubInDB] = None
+    club_visitor: Optional[ClubInDB] = None
+    pavilion: Optional[PavilionInDB] = None
+
+class GameBulkError(BaseModel):
+    row: int
+    detail: str
+
+class GameBulkResult(BaseModel):
+    inserted: int
+    errors: List[GameBulkError]
+
+class FixtureRequest(BaseModel):
+    club_ids: List[int]
+    season: Optional[str] = Field(None, min_length=1, max_length=16)
+    start_date: Optional[datetime] = None
+    days_between_rounds: int = Field(7, ge=1)
+    slots: Optional[List[datetime]] = None
+    double_round_robin: bool = True
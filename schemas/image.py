@@ -0,0 +1,52 @@
+import os
+
+# How stored images are named. Shared by the schemas, which return the
+# variant URLs, and by crud.imageTransform, which makes the variants.
+
+
+def _parse_variants(spec: str):
+    variants = {}
+    for item in spec.split(","):
+        name, _, edge = item.strip().partition(":")
+        variants[name] = int(edge)
+    return variants
+
+
+# name:longest edge in pixels; every upload is stored in each of these sizes
+IMAGE_VARIANTS = _parse_variants(os.getenv("IMAGE_VARIANTS", "thumb:128,card:640,full:2048"))
+# Output formats by file extension; clients pick one they can decode
+IMAGE_FORMATS = {
+    extension: fmt
+    for extension, fmt in {"jpg": "JPEG", "webp": "WEBP"}.items()
+    if extension in os.getenv("IMAGE_FORMATS", "jpg,webp").split(",")
+}
+# The variant stored in the image column of clubs and pavilions
+PRIMARY_VARIANT = "full"
+PRIMARY_EXTENSION = "jpg"
+
+if PRIMARY_VARIANT not in IMAGE_VARIANTS or PRIMARY_EXTENSION not in IMAGE_FORMATS:
+    raise ValueError(
+        f"IMAGE_VARIANTS needs {PRIMARY_VARIANT} and IMAGE_FORMATS needs {PRIMARY_EXTENSION}"
+    )
+
+
+def variant_key(prefix: str, variant: str, extension: str) -> str:
+    return f"{prefix}/{variant}.{extension}"
+
+
+def variant_urls(image_url: str) -> dict:
+    """URLs of every variant of an image, by variant name and extension.
+
+    Images stored before variants existed only have their own URL.
+    """
+    if not image_url:
+        return {}
+    primary = f"/{PRIMARY_VARIANT}.{PRIMARY_EXTENSION}"
+    if not image_url.endswith(primary):
+        return {PRIMARY_VARIANT: {PRIMARY_EXTENSION: image_url}}
+
+    base = image_url[: -len(primary)]
+    return {
+        variant: {extension: variant_key(base, variant, extension) for extension in IMAGE_FORMATS}
+        for variant in IMAGE_VARIANTS
+    }
@@ -1,6 +1,8 @@
-from typing import Optional
+from typing import Dict, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
+
+from schemas.image import variant_urls
 
 
 class Pavilion(BaseModel):
@@ -23,4 +25,10 @@ class PavilionInDB(Pavilion):
     image: str
 
 
-    
\ No newline at end of file
+    
+
+    # {"thumb": {"jpg": url, "webp": url}, "card": {...}, "full": {...}}
+    @computed_field
+    @property
+    def image_variants(self) -> Dict[str, Dict[str, str]]:
+        return variant_urls(self.image)
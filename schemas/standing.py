@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class StandingInDB(BaseModel):
+    season: str
+    club_id: int
+    played: int
+    wins: int
+    draws: int
+    losses: int
+    goals_for: int
+    goals_against: int
+    goal_difference: int
+    points: int
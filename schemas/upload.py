@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+
+class ImageUploadInDB(BaseModel):
+    id: int
+    target: str
+    target_id: int
+    # pending, queued, processing, done or failed
+    status: str
+    image: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+class ImageUploadTicket(BaseModel):
+    upload: ImageUploadInDB
+    # POST the image to url as multipart/form-data: every field, then the file as "file"
+    url: str
+    fields: Dict[str, str]
@@ -0,0 +1,28 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from crud.gameSchedule import schedule_index
+from crud.versionRepo import insert_table_versions
+from db.database import Base
+from models.club import Club
+from models.pavilion import Pavilion
+
+
+@pytest.fixture
+def sqlite_db():
+    """Session on an in-memory SQLite database with one pavilion and three clubs."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        insert_table_versions(connection)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    session.add(Pavilion(id=1, name="Pavilion 1", location="Location 1", image=""))
+    session.add_all(
+        Club(id=i, name=f"Club {i}", image="", pavilion_id=1) for i in (1, 2, 3)
+    )
+    session.commit()
+    schedule_index.invalidate()
+    yield session
+    session.close()
+    engine.dispose()
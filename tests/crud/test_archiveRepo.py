@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from crud.archiveRepo import archive_games
+from crud.gameRepo import create_game, get_all_games, get_game_by_id
+from crud.standingRepo import get_standings, rebuild_standings
+from models.archive import ArchivedGame
+from schemas.game import GameCreate
+
+NOW = datetime(2026, 10, 17)
+
+
+def new_game(day, month=10, year=2024, finished=True, home=1, visitor=2):
+    return GameCreate(
+        jornada=day,
+        score_home=2 if finished else None,
+        score_visitor=0 if finished else None,
+        date_time=datetime(year, month, day, 18),
+        club_home_id=home,
+        club_visitor_id=visitor,
+        pavilion_id=1,
+        finished=finished,
+    )
+
+
+@pytest.fixture
+def games(sqlite_db):
+    return [
+        create_game(game, sqlite_db).id
+        for game in (
+            new_game(1),
+            new_game(2),
+            new_game(3),
+            # Not finished, or in the current season: never archived
+            new_game(4, finished=False),
+            new_game(5, year=2026, home=3),
+        )
+    ]
+
+
+def test_archive_moves_finished_past_games_in_batches(sqlite_db, games):
+    assert archive_games(sqlite_db, now=NOW, batch_size=2) == 3
+
+    assert [game.id for game in get_all_games(sqlite_db)] == [games[3], games[4]]
+    assert sqlite_db.query(ArchivedGame).count() == 3
+    # Nothing left to do
+    assert archive_games(sqlite_db, now=NOW, batch_size=2) == 0
+
+
+def test_archive_respects_horizon(sqlite_db, games):
+    assert archive_games(sqlite_db, now=NOW, horizon_days=3650) == 0
+
+
+def test_archived_games_are_read_on_request(sqlite_db, games):
+    archive_games(sqlite_db, now=NOW)
+
+    with pytest.raises(HTTPException):
+        get_game_by_id(games[0], sqlite_db)
+    assert get_game_by_id(games[0], sqlite_db, include_archived=True).score_home == 2
+
+    season_games = get_all_games(sqlite_db, season="2024-25", include_archived=True, limit=3)
+    assert [game.id for game in season_games] == [games[0], games[1], games[2]]
+
+
+def test_archived_games_keep_counting_in_standings(sqlite_db, games):
+    before = [(s.season, s.club_id, s.points) for s in get_standings(sqlite_db)]
+    archive_games(sqlite_db, now=NOW)
+
+    rebuild_standings(sqlite_db)
+
+    assert [(s.season, s.club_id, s.points) for s in get_standings(sqlite_db)] == before
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from crud import asyncClubRepo, asyncGameRepo, clubRepo, gameRepo
+from crud.gameSchedule import schedule_index
+from crud.versionRepo import insert_table_versions
+from db.database import Base, to_async_url
+from models.club import Club
+from models.pavilion import Pavilion
+from schemas.club import ClubUpdate
+from schemas.game import GameCreate, GameUpdate
+
+
+@pytest_asyncio.fixture
+async def async_db(tmp_path):
+    engine = create_async_engine(to_async_url(f"sqlite:///{tmp_path / 'games.db'}"))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(insert_table_versions)
+    session = async_sessionmaker(engine, expire_on_commit=False)()
+    session.add(Pavilion(id=1, name="Pavilion 1", location="Location 1", image=""))
+    session.add_all(
+        Club(id=i, name=f"Club {i}", image="", pavilion_id=1) for i in (1, 2)
+    )
+    await session.commit()
+    schedule_index.invalidate()
+    yield session
+    await session.close()
+    await engine.dispose()
+
+
+def test_to_async_url():
+    assert (
+        to_async_url("mysql+pymysql://user:secret@db/games")
+        == "mysql+aiomysql://user:secret@db/games"
+    )
+    assert to_async_url("sqlite://") == "sqlite+aiosqlite://"
+
+
+@pytest.mark.asyncio
+async def test_async_game_repo(async_db):
+    game = await asyncGameRepo.create_game(
+        GameCreate(
+            jornada=1,
+            date_time=datetime(2030, 1, 1, 18),
+            club_home_id=1,
+            club_visitor_id=2,
+            pavilion_id=1,
+            score_home=2,
+            score_visitor=1,
+            finished=True,
+        ),
+        async_db,
+    )
+
+    await asyncGameRepo.update_game(game.id, GameUpdate(score_home=3), async_db)
+
+    assert (await async_db.run_sync(lambda s: gameRepo.get_game_by_id(game.id, s))).score_home == 3
+    assert await asyncGameRepo.delete_game(game.id, async_db)
+    with pytest.raises(HTTPException):
+        await async_db.run_sync(lambda s: gameRepo.get_game_by_id(game.id, s))
+
+
+@pytest.mark.asyncio
+async def test_async_club_repo(async_db):
+    club = await asyncClubRepo.update_club(1, ClubUpdate(name="Renamed"), None, async_db)
+
+    assert club.name == "Renamed"
+    assert (await async_db.run_sync(lambda s: clubRepo.get_club_by_id(1, s))).name == "Renamed"
+    with pytest.raises(HTTPException):
+        await asyncClubRepo.update_club(99, ClubUpdate(name="Missing"), None, async_db)
@@ -0,0 +1,99 @@
+import re
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from crud.bookingRepo import find_conflicts
+from crud.gameRepo import bulk_create_games, create_game, update_game
+from models.pavilion import Pavilion
+from schemas.game import GameCreate, GameUpdate
+
+
+def new_game(home, visitor, date_time, pavilion_id=1):
+    return GameCreate(jornada=1, date_time=date_time, club_home_id=home, club_visitor_id=visitor, pavilion_id=pavilion_id, finished=False)
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.add(Pavilion(id=2, name="Pavilion 2", location="Location 2", image=""))
+    sqlite_db.commit()
+    return sqlite_db
+
+
+def test_create_game_rejects_pavilion_double_booking(db):
+    game = create_game(new_game(1, 2, datetime(2099, 10, 19, 18, 0)), db)
+
+    with pytest.raises(HTTPException) as exc_info:
+        create_game(new_game(3, 3, datetime(2099, 10, 19, 19, 30)), db)
+
+    assert exc_info.value.status_code == 409
+    assert exc_info.value.detail == [{"resource": "pavilion", "resource_id": 1, "conflicting_game_id": game.id}]
+
+
+def test_create_game_rejects_club_double_booking(db):
+    create_game(new_game(1, 2, datetime(2099, 10, 19, 18, 0)), db)
+
+    with pytest.raises(HTTPException) as exc_info:
+        create_game(new_game(3, 2, datetime(2099, 10, 19, 18, 0), pavilion_id=2), db)
+
+    assert [conflict["resource"] for conflict in exc_info.value.detail] == ["club"]
+
+
+def test_games_further_apart_than_duration_do_not_conflict(db):
+    create_game(new_game(1, 2, datetime(2099, 10, 19, 18, 0)), db)
+
+    create_game(new_game(1, 2, datetime(2099, 10, 19, 20, 0)), db)
+
+
+def test_update_game_ignores_its_own_slot(db):
+    game = create_game(new_game(1, 2, datetime(2099, 10, 19, 18, 0)), db)
+
+    update_game(game.id, GameUpdate(date_time=datetime(2099, 10, 19, 18, 30)), db)
+
+
+def test_update_game_score_does_not_recheck_slot(db, monkeypatch):
+    game = create_game(new_game(1, 2, datetime(2099, 10, 19, 18, 0)), db)
+    monkeypatch.setattr("crud.gameRepo.ensure_no_conflicts", lambda *args, **kwargs: pytest.fail("checked"))
+
+    update_game(game.id, GameUpdate(score_home=1, score_visitor=1), db)
+
+
+def test_batch_conflicts_found_in_one_query(db):
+    existing = create_game(new_game(1, 2, datetime(2099, 10, 19, 18, 0)), db)
+    candidates = [
+        ("a", new_game(3, 3, datetime(2099, 10, 19, 19, 0), pavilion_id=1)),
+        ("b", new_game(2, 3, datetime(2099, 10, 26, 18, 0), pavilion_id=2)),
+        ("c", new_game(3, 1, datetime(2099, 10, 26, 19, 0), pavilion_id=1)),
+        ("d", new_game(1, 2, datetime(2099, 11, 2, 18, 0), pavilion_id=2)),
+    ]
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    conflicts = find_conflicts(candidates, db)
+
+    # The pavilion and club row locks, then one scan of games
+    assert len(statements) == 3
+    assert [re.search(r"FROM (\w+)", statement).group(1) for statement in statements] == ["pavilions", "clubs", "games"]
+    assert {(c["key"], c["conflicting_game_id"], c["conflicting_key"], c["resource"]) for c in conflicts} == {
+        ("a", existing.id, None, "pavilion"),
+        ("b", None, "c", "club"),
+    }
+
+
+def test_bulk_create_games_reports_conflicts(db):
+    rows = [
+        (2, new_game(1, 2, datetime(2099, 10, 19, 18, 0)).dict()),
+        (3, new_game(3, 1, datetime(2099, 10, 19, 19, 0), pavilion_id=2).dict()),
+        (4, new_game(2, 3, datetime(2099, 10, 26, 18, 0)).dict()),
+    ]
+
+    result = bulk_create_games(rows, db)
+
+    assert result["inserted"] == 1
+    assert [error["row"] for error in result["errors"]] == [2, 3]
+    assert [error["detail"] for error in result["errors"]] == [
+        "club 1 is already booked by row 3",
+        "club 1 is already booked by row 2",
+    ]
@@ -0,0 +1,76 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from crud.calendarRepo import _fold, get_club_calendar
+from crud.clubRepo import get_games_by_club_id
+from crud.gameRepo import (create_game, encode_game_cursor, get_all_games,
+                           update_game)
+from schemas.game import GameCreate, GameUpdate
+
+
+@pytest.fixture
+def games(sqlite_db):
+    fixtures = [(1, 2), (2, 3), (3, 1), (2, 1), (1, 3)]
+    return [
+        create_game(
+            GameCreate(jornada=day, date_time=f"2099-10-1{day}T21:30:00", club_home_id=home, club_visitor_id=visitor, pavilion_id=1, finished=False),
+            sqlite_db,
+        )
+        for day, (home, visitor) in enumerate(fixtures)
+    ]
+
+
+def test_get_games_by_club_id(sqlite_db, games):
+    club_games = get_games_by_club_id(1, sqlite_db)
+
+    assert [game.id for game in club_games] == [games[0].id, games[2].id, games[3].id, games[4].id]
+
+
+def test_get_games_by_club_id_pages(sqlite_db, games):
+    first_page = get_games_by_club_id(1, sqlite_db, limit=3)
+    second_page = get_games_by_club_id(1, sqlite_db, cursor=encode_game_cursor(first_page[-1]), limit=3)
+
+    assert [game.id for game in first_page + second_page] == [games[0].id, games[2].id, games[3].id, games[4].id]
+
+
+def test_get_all_games_by_club_pages_over_both_club_columns(sqlite_db, games):
+    statements = []
+    event.listen(sqlite_db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    first_page = get_all_games(sqlite_db, club_id=1, limit=3)
+    second_page = get_all_games(sqlite_db, club_id=1, cursor=encode_game_cursor(first_page[-1]), limit=3)
+
+    assert [game.id for game in first_page + second_page] == [games[0].id, games[2].id, games[3].id, games[4].id]
+    # One branch per club column, never an OR over both
+    assert all("UNION ALL" in statement and "OR games.club_visitor_id" not in statement for statement in statements)
+    assert [game.id for game in get_all_games(sqlite_db, club_id=1, jornada=3)] == [games[3].id]
+
+
+def test_get_games_by_club_id_not_found(sqlite_db):
+    with pytest.raises(HTTPException) as exc_info:
+        get_games_by_club_id(42, sqlite_db)
+    assert exc_info.value.status_code == 404
+
+
+def test_club_calendar(sqlite_db, games):
+    update_game(games[0].id, GameUpdate(score_home=3, score_visitor=1, finished=True), sqlite_db)
+
+    calendar = "".join(get_club_calendar(1, sqlite_db))
+
+    assert calendar.startswith("BEGIN:VCALENDAR\r\n")
+    assert calendar.endswith("END:VCALENDAR\r\n")
+    assert calendar.count("BEGIN:VEVENT") == 4
+    assert f"UID:game-{games[0].id}@clubsync" in calendar
+    assert "SUMMARY:Club 1 3 - 1 Club 2" in calendar
+    assert "SUMMARY:Club 3 vs Club 1" in calendar
+    assert "DTSTART:20991010T213000\r\nDTEND:20991010T233000" in calendar
+    assert "LOCATION:Pavilion 1\\, Location 1" in calendar
+
+
+def test_fold_long_lines():
+    line = "SUMMARY:" + "Pavilhão " * 20
+
+    folded = _fold(line)
+
+    assert all(len(part.encode()) <= 75 for part in folded.split("\r\n"))
+    assert folded.replace("\r\n ", "") == line + "\r\n"
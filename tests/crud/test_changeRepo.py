@@ -0,0 +1,80 @@
+from crud.changeRepo import get_changes
+from crud.clubRepo import add_club
+from crud.gameRepo import (bulk_create_games, create_game, delete_game,
+                           update_game)
+from crud.pavilionRepo import add_pavilion
+from crud.versionRepo import get_table_version
+from schemas.club import ClubCreate
+from schemas.game import GameCreate, GameUpdate
+from schemas.pavilion import CreatePavilion
+
+
+def game(**overrides):
+    values = dict(jornada=1, date_time="2099-10-19T22:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False)
+    values.update(overrides)
+    return GameCreate(**values)
+
+
+def test_game_writes_are_logged_in_order(sqlite_db):
+    created = create_game(game(), sqlite_db)
+    update_game(created.id, GameUpdate(score_home=2, score_visitor=0), sqlite_db)
+    delete_game(created.id, sqlite_db)
+
+    page = get_changes(sqlite_db)
+    changes = page["changes"]
+
+    assert [(c.entity, c.entity_id, c.operation) for c in changes] == [
+        ("game", created.id, "upsert"),
+        ("game", created.id, "upsert"),
+        ("game", created.id, "delete"),
+    ]
+    assert changes[0].data["score_home"] is None
+    assert changes[1].data["score_home"] == 2
+    assert changes[2].data is None
+    assert page["next_since"] == changes[-1].id
+    assert page["has_more"] is False
+    assert get_table_version(sqlite_db, "changes")[0] == 3
+
+
+def test_bulk_insert_is_logged(sqlite_db):
+    rows = [
+        game(date_time="2099-10-19T22:00:00").dict(),
+        game(date_time="2099-10-26T22:00:00", club_home_id=2, club_visitor_id=3).dict(),
+    ]
+
+    bulk_create_games(enumerate(rows, start=1), sqlite_db)
+
+    changes = get_changes(sqlite_db)["changes"]
+    assert [c.data["club_home_id"] for c in changes] == [1, 2]
+    assert all(c.operation == "upsert" for c in changes)
+
+
+def test_changes_pages_and_filters(sqlite_db):
+    for day in range(1, 6):
+        create_game(game(date_time=f"2099-10-{day:02d}T22:00:00"), sqlite_db)
+
+    first = get_changes(sqlite_db, limit=2)
+    second = get_changes(sqlite_db, since=first["next_since"], limit=2)
+    last = get_changes(sqlite_db, since=second["next_since"], limit=2)
+
+    assert first["has_more"] and second["has_more"]
+    assert not last["has_more"]
+    assert len(first["changes"] + second["changes"] + last["changes"]) == 5
+    assert get_changes(sqlite_db, entity="club")["changes"] == []
+    # A consumer that is up to date gets an empty page and keeps its cursor
+    assert get_changes(sqlite_db, since=last["next_since"]) == {
+        "changes": [],
+        "next_since": last["next_since"],
+        "has_more": False,
+    }
+
+
+def test_clubs_and_pavilions_are_logged_before_their_image(sqlite_db):
+    # Committed before the image is processed, which may then fail
+    pavilion = add_pavilion(CreatePavilion(name="Pavilion 2", location="Location 2"), sqlite_db)
+    club = add_club(ClubCreate(name="Club 4", pavilion_id=pavilion.id), sqlite_db)
+
+    changes = get_changes(sqlite_db)["changes"]
+    assert [(c.entity, c.entity_id) for c in changes] == [("pavilion", pavilion.id), ("club", club.id)]
+    assert get_table_version(sqlite_db, "pavilions")[0] == 1
+    assert get_table_version(sqlite_db, "clubs")[0] == 1
@@ -14,9 +14,10 @@ from crud.clubRepo import (create_club, delete_club, get_all_clubs,
 from crud.gameRepo import (create_game, delete_game, get_all_games,
                            get_all_games_except_next, get_game_by_id,
                            get_next_game, update_game)
+from crud.gameSchedule import schedule_index
 from crud.pavilionRepo import (create_pavilion, delete_pavilion,
                                get_pavilion_by_id, update_pavilion)
-from db.database import get_db
+from db.database import get_db, get_read_db
 from main import app
 from models.club import Club
 from models.game import Game
@@ -57,6 +58,7 @@ def setup():
             db.close()
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     logger.info("running setup")
     yield SessionLocal
     logger.info("ending setup")
@@ -97,6 +99,7 @@ def create_test_club(test_db, pavilion_id):
 
 def create_test_game(test_db, club_home_id, club_visitor_id, pavilion_id):
     test_game = Game(
+        season="2025-26",
         jornada=1,
         score_home=None,
         score_visitor=None,
@@ -109,6 +112,7 @@ def create_test_game(test_db, club_home_id, club_visitor_id, pavilion_id):
     test_db.add(test_game)
     test_db.commit()
     test_db.refresh(test_game)
+    schedule_index.invalidate()
     logger.info(f"Game ID: {test_game.id}")
     return test_game
 
@@ -135,6 +139,7 @@ def test_game_fixture(test_db, test_club, test_pavilion):
     logger.info(f"Deleting game ID: {test_game.id}")
     test_db.delete(test_game)
     test_db.commit()
+    schedule_index.invalidate()
 
 @pytest.mark.asyncio
 @patch("crud.imageRepo.process_image")
@@ -281,7 +286,7 @@ def test_get_game_by_id(test_db, test_game):
     assert game.finished == test_game.finished
 
 def test_get_next_game(test_db, test_game):
-    game = get_next_game(test_db)
+    game = get_next_game(test_db, "2025-26")
     assert game.jornada == test_game.jornada
     assert game.score_home == test_game.score_home
     assert game.score_visitor == test_game.score_visitor
@@ -305,7 +310,7 @@ def test_get_all_games(test_db, test_game):
     assert game.finished == test_game.finished
 
 def test_get_all_games_except_next(test_db, test_game):
-    games = get_all_games_except_next(test_db)
+    games = get_all_games_except_next(test_db, "2025-26")
     assert len(games) == 0
 
 def test_update_game(test_db, test_game):
@@ -0,0 +1,68 @@
+from collections import Counter
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from crud.fixtureRepo import (create_fixtures, generate_fixtures,
+                              round_robin_rounds)
+from crud.gameRepo import get_all_games
+from schemas.game import FixtureRequest
+
+
+@pytest.mark.parametrize("clubs", [2, 3, 14, 21])
+def test_double_round_robin_is_balanced(clubs):
+    rounds = round_robin_rounds(range(clubs))
+
+    pairings = Counter(frozenset(pair) for games in rounds for pair in games)
+    assert len(pairings) == clubs * (clubs - 1) // 2
+    assert set(pairings.values()) == {2}
+    home_games = Counter(home for games in rounds for home, _ in games)
+    assert set(home_games.values()) == {clubs - 1}
+    for games in rounds:
+        playing = [club for pair in games for club in pair]
+        assert len(playing) == len(set(playing))
+
+
+@pytest.mark.parametrize("clubs", [4, 7, 20])
+def test_single_round_robin_home_games_differ_by_at_most_one(clubs):
+    rounds = round_robin_rounds(range(clubs), double_round_robin=False)
+
+    home_games = Counter(home for games in rounds for home, _ in games)
+    assert max(home_games.values()) - min(home_games.values()) <= 1
+
+
+def test_generate_fixtures_uses_home_pavilion_and_dates(sqlite_db):
+    request = FixtureRequest(club_ids=[1, 2, 3], start_date=datetime(2024, 9, 7, 18, 0))
+
+    games = generate_fixtures(request, sqlite_db)
+
+    assert len(games) == 6
+    assert max(game.jornada for game in games) == 6
+    assert all(game.pavilion_id == 1 for game in games)
+    assert games[-1].date_time == datetime(2024, 10, 12, 18, 0)
+
+
+def test_generate_fixtures_requires_enough_slots(sqlite_db):
+    request = FixtureRequest(club_ids=[1, 2, 3], slots=[datetime(2024, 9, 7, 18, 0)])
+
+    with pytest.raises(HTTPException) as exc_info:
+        generate_fixtures(request, sqlite_db)
+    assert exc_info.value.status_code == 400
+
+
+def test_generate_fixtures_unknown_club(sqlite_db):
+    request = FixtureRequest(club_ids=[1, 42], start_date=datetime(2024, 9, 7, 18, 0))
+
+    with pytest.raises(HTTPException) as exc_info:
+        generate_fixtures(request, sqlite_db)
+    assert exc_info.value.status_code == 404
+
+
+def test_create_fixtures_persists_season(sqlite_db):
+    request = FixtureRequest(club_ids=[1, 2, 3], start_date=datetime(2024, 9, 7, 18, 0))
+
+    result = create_fixtures(request, sqlite_db)
+
+    assert result == {"inserted": 6, "errors": []}
+    assert len(get_all_games(sqlite_db)) == 6
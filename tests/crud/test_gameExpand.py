@@ -0,0 +1,25 @@
+from sqlalchemy import event
+
+from crud.gameRepo import create_game, expand_games, get_all_games
+from schemas.game import GameCreate
+
+
+def test_expand_games_batches_related_rows(sqlite_db):
+    for day, (home, visitor) in enumerate(((1, 2), (2, 3), (3, 1)), start=1):
+        create_game(
+            GameCreate(jornada=day, date_time=f"2099-10-1{day}T22:00:00", club_home_id=home, club_visitor_id=visitor, pavilion_id=1, finished=False),
+            sqlite_db,
+        )
+    games = get_all_games(sqlite_db)
+
+    statements = []
+    event.listen(sqlite_db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    expanded = expand_games(games, {"clubs", "pavilion"}, sqlite_db)
+
+    assert len(statements) == 2
+    assert [(game["club_home"].id, game["club_visitor"].id) for game in expanded] == [(1, 2), (2, 3), (3, 1)]
+    assert all(game["pavilion"].id == 1 for game in expanded)
+
+
+def test_expand_games_without_expand_returns_games(sqlite_db):
+    assert expand_games([], set(), sqlite_db) == []
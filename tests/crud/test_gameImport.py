@@ -0,0 +1,58 @@
+from io import BytesIO
+
+from fastapi import UploadFile
+
+from crud.gameRepo import get_all_games, get_next_game, import_games
+from crud.standingRepo import get_standings
+
+CSV_CONTENT = b"""jornada,score_home,score_visitor,date_time,club_home_id,club_visitor_id,pavilion_id,finished
+1,4,2,2024-10-19T22:00:00,1,2,1,true
+1,,,2099-10-19T22:00:00,2,3,1,false
+2,,,not-a-date,1,3,1,false
+2,,,2099-10-26T22:00:00,1,9,1,false
+"""
+
+NDJSON_CONTENT = b"""{"jornada": 1, "date_time": "2099-10-19T22:00:00", "club_home_id": 1, "club_visitor_id": 2, "pavilion_id": 1}
+
+{"jornada": 1, "date_time": "2099-10-19T22:00:00", "club_home_id": 3
+{"jornada": 2, "date_time": "2099-10-26T22:00:00", "club_home_id": 2, "club_visitor_id": 1, "pavilion_id": 7}
+"""
+
+
+def upload(content, filename):
+    return UploadFile(filename=filename, file=BytesIO(content))
+
+
+def test_import_csv(sqlite_db):
+    result = import_games(upload(CSV_CONTENT, "games.csv"), "csv", sqlite_db)
+
+    assert result["inserted"] == 2
+    assert [error["row"] for error in result["errors"]] == [4, 5]
+    assert "date_time" in result["errors"][0]["detail"]
+    assert result["errors"][1]["detail"] == "club_visitor_id 9 does not exist"
+    assert [game.season for game in get_all_games(sqlite_db)] == ["2024-25", "2099-00"]
+    assert get_next_game(sqlite_db, "2099-00").club_home_id == 2
+    assert {s.club_id: s.points for s in get_standings(sqlite_db, "2024-25")} == {1: 3, 2: 0}
+
+
+def test_import_ndjson(sqlite_db):
+    result = import_games(upload(NDJSON_CONTENT, "games.ndjson"), "ndjson", sqlite_db)
+
+    assert result["inserted"] == 1
+    assert [error["row"] for error in result["errors"]] == [3, 4]
+    assert result["errors"][0]["detail"].startswith("Invalid JSON")
+    assert result["errors"][1]["detail"] == "pavilion_id 7 does not exist"
+
+
+def test_import_batches(sqlite_db, monkeypatch):
+    monkeypatch.setattr("crud.gameRepo.BULK_INSERT_BATCH_SIZE", 2)
+    lines = b"".join(
+        b'{"jornada": %d, "date_time": "2099-10-1%dT22:00:00", "club_home_id": 1, "club_visitor_id": 2, "pavilion_id": 1}\n'
+        % (i, i)
+        for i in range(5)
+    )
+
+    result = import_games(upload(lines, "games.ndjson"), "ndjson", sqlite_db)
+
+    assert result == {"inserted": 5, "errors": []}
+    assert len(get_all_games(sqlite_db)) == 5
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from crud.gameRepo import encode_game_cursor, get_all_games
+from models.game import Game
+
+
+def query_plan(db, **filters):
+    statements = []
+    listen = lambda conn, cursor, statement, params, *args: statements.append((statement, params))
+    event.listen(db.get_bind(), "before_cursor_execute", listen)
+    cursor = encode_game_cursor(Game(id=5, date_time=datetime(2024, 10, 1, 21, 0)))
+    get_all_games(db, cursor=cursor, limit=10, **filters)
+    event.remove(db.get_bind(), "before_cursor_execute", listen)
+
+    statement, params = statements[-1]
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params).all()
+    return [row[3] for row in rows if row[3].startswith(("SEARCH", "SCAN games"))]
+
+
+@pytest.mark.parametrize(
+    "filters, plan",
+    [
+        ({}, ["SEARCH games USING INDEX ix_games_date_time_id (date_time>?)"]),
+        ({"season": "2024-25"}, ["SEARCH games USING INDEX ix_games_season_date_time_id (season=? AND date_time>?)"]),
+        (
+            {"season": "2024-25", "jornada": 3},
+            ["SEARCH games USING INDEX ix_games_season_jornada_date_time_id (season=? AND jornada=? AND date_time>?)"],
+        ),
+        (
+            {"season": "2024-25", "club_id": 3},
+            [
+                "SEARCH games USING INDEX ix_games_season_club_home_date_time_id (season=? AND club_home_id=? AND date_time>?)",
+                "SEARCH games USING INDEX ix_games_season_club_visitor_date_time_id (season=? AND club_visitor_id=? AND date_time>?)",
+            ],
+        ),
+    ],
+)
+def test_cursor_pages_seek_into_the_index(sqlite_db, filters, plan):
+    # Each page starts its range scan at the cursor, not at the filter prefix
+    assert query_plan(sqlite_db, **filters) == plan
+
+
+def test_cursor_resumes_after_games_at_the_same_time(sqlite_db):
+    # Inserted directly: the booking check would reject games at the same time
+    sqlite_db.add_all(
+        Game(id=game_id, season="2099-00", jornada=1, date_time=datetime(2099, 10, 19, 21, 0), club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False)
+        for game_id in (1, 2, 3)
+    )
+    sqlite_db.commit()
+
+    first_page = get_all_games(sqlite_db, limit=2)
+    second_page = get_all_games(sqlite_db, cursor=encode_game_cursor(first_page[-1]), limit=2)
+
+    assert [game.id for game in first_page + second_page] == [1, 2, 3]
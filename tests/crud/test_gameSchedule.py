@@ -0,0 +1,92 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.orm import Session
+
+from crud.gameSchedule import GameScheduleIndex
+from models.game import Game as GameModel
+
+SEASON = "2024-25"
+
+
+def make_game(game_id, date_time):
+    return GameModel(
+        id=game_id,
+        season=SEASON,
+        jornada=game_id,
+        score_home=None,
+        score_visitor=None,
+        date_time=date_time,
+        club_home_id=1,
+        club_visitor_id=2,
+        pavilion_id=1,
+        finished=False,
+    )
+
+
+@pytest.fixture
+def db():
+    db = MagicMock(spec=Session)
+    db.execute.return_value.first.return_value = None
+    db.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
+        make_game(1, datetime(2024, 10, 19, 22, 0)),
+        make_game(2, datetime(2024, 10, 26, 17, 0)),
+        make_game(3, datetime(2024, 11, 1, 22, 0)),
+    ]
+    return db
+
+
+def test_next_game_rolls_forward_without_reload(db):
+    index = GameScheduleIndex()
+
+    assert index.get_next(db, SEASON, now=datetime(2024, 10, 1)).id == 1
+    assert index.get_next(db, SEASON, now=datetime(2024, 10, 19, 22, 0)).id == 2
+    assert index.get_next(db, SEASON, now=datetime(2024, 10, 30)).id == 3
+    assert index.get_next(db, SEASON, now=datetime(2024, 12, 1)) is None
+    assert db.query.call_count == 1
+
+
+def test_all_except_next(db):
+    index = GameScheduleIndex()
+
+    games = index.get_all_except_next(db, SEASON, now=datetime(2024, 10, 20))
+
+    assert [game.id for game in games] == [1, 3]
+
+
+def test_invalidate_reloads(db):
+    index = GameScheduleIndex()
+    index.get_next(db, SEASON, now=datetime(2024, 10, 1))
+
+    db.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
+        make_game(4, datetime(2024, 10, 5, 18, 0))
+    ]
+    index.invalidate()
+
+    assert index.get_next(db, SEASON, now=datetime(2024, 10, 1)).id == 4
+    assert db.query.call_count == 2
+
+
+def test_table_version_change_reloads(db):
+    index = GameScheduleIndex()
+
+    index.get_next(db, SEASON, now=datetime(2024, 10, 1))
+    index.get_next(db, SEASON, now=datetime(2024, 10, 1))
+    assert db.query.call_count == 1
+
+    # Another worker wrote to the games table
+    db.execute.return_value.first.return_value = MagicMock(version=7, updated_at=None)
+    index.get_next(db, SEASON, now=datetime(2024, 10, 1))
+
+    assert db.query.call_count == 2
+
+
+def test_seasons_are_cached_separately(db):
+    index = GameScheduleIndex()
+
+    index.get_next(db, SEASON, now=datetime(2024, 10, 1))
+    index.get_next(db, "2023-24", now=datetime(2024, 10, 1))
+    index.get_next(db, SEASON, now=datetime(2024, 10, 1))
+
+    assert db.query.call_count == 2
@@ -0,0 +1,44 @@
+import asyncio
+import time
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from crud.imagePool import ImagePool
+from crud.imageTransform import InvalidImage, transform_image
+
+
+def png_bytes():
+    img_bytes = BytesIO()
+    Image.new("RGBA", (64, 32), color="blue").save(img_bytes, format="PNG")
+    return img_bytes.getvalue()
+
+
+@pytest.fixture
+def pool():
+    pool = ImagePool(workers=1, timeout=10)
+    yield pool
+    pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_transform_runs_in_worker_process(pool):
+    variants = await pool.run(transform_image, png_bytes())
+
+    assert Image.open(BytesIO(variants["full", "jpg"])).format == "JPEG"
+
+    with pytest.raises(InvalidImage):
+        await pool.run(transform_image, b"not_an_image")
+
+
+@pytest.mark.asyncio
+async def test_timed_out_job_restarts_the_pool(pool):
+    await pool.run(time.sleep, 0)
+    pool.timeout = 0.2
+
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.run(time.sleep, 30)
+
+    pool.timeout = 10
+    assert await pool.run(sum, [1, 2]) == 3
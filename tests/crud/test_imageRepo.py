@@ -1,17 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from unittest.mock import MagicMock, patch
 
 import pytest
+from botocore.exceptions import ClientError
 from fastapi import HTTPException, UploadFile
 from PIL import Image
 
-from crud.imageRepo import create_image, process_image, update_image
+from crud.imagePool import ImagePool
+from crud.imageTransform import content_key, decode_image
+from schemas.club import ClubInDB
+from schemas.image import IMAGE_FORMATS, IMAGE_VARIANTS, variant_urls
+from crud.imageRepo import (create_image, delete_image_folder, process_image,
+                            read_upload, update_image)
 
 
+VARIANT_COUNT = len(IMAGE_VARIANTS) * len(IMAGE_FORMATS)
+
+# Process images in a thread so that the patches below apply
+@pytest.fixture(autouse=True)
+def inline_image_pool():
+    with patch("crud.imageRepo.image_pool", ImagePool(workers=0)):
+        yield
+
 # Mock boto3 client
 @pytest.fixture
 def mock_s3_client():
     with patch("crud.imageRepo.s3") as mock_s3:
+        # Nothing stored yet
+        mock_s3.head_object.side_effect = ClientError({"Error": {"Code": "404"}}, "HeadObject")
         yield mock_s3
 
 # Mock the UploadFile object
@@ -38,32 +55,57 @@ async def test_create_image(mock_s3_client, mock_upload_file):
     result = await create_image(mock_upload_file, folder)
 
     # Assert that S3's put_object was called with the correct arguments
-    mock_s3_client.put_object.assert_called_once()
+    assert mock_s3_client.put_object.call_count == VARIANT_COUNT
     assert "https://" in result  # Check if the result is a URL
 
 # Test the update_image function
 @pytest.mark.asyncio
 @patch("crud.imageRepo.AWS_S3_BUCKET", "mocked_bucket")
 async def test_update_image(mock_s3_client, mock_upload_file):
-    # Mock the S3 list_objects_v2 and delete_object methods
-    mock_s3_client.list_objects_v2.return_value = {'Contents': [{'Key': 'test_folder/old_image.jpg'}]}
-    mock_s3_client.delete_object.return_value = {}
+    # Mock the S3 listing and batched delete
+    mock_s3_client.get_paginator.return_value.paginate.return_value = [
+        {'Contents': [{'Key': 'test_folder/old_image.jpg'}, {'Key': 'test_folder/other_image.jpg'}]}
+    ]
+    mock_s3_client.delete_objects.return_value = {}
 
     # Mock S3 put_object to not actually upload
     mock_s3_client.put_object.return_value = {}
 
-    # Call the function
+    # Call the function; the old images are deleted in the background
     folder = "test_folder"
-    result = await update_image(mock_upload_file, folder)
+    executor = ThreadPoolExecutor(max_workers=1)
+    with patch("crud.imageRepo.s3_executor", executor):
+        result = await update_image(mock_upload_file, folder)
+        executor.shutdown(wait=True)
 
-    # Assert that S3's list_objects_v2 and delete_object were called
-    mock_s3_client.list_objects_v2.assert_called_once()
-    mock_s3_client.delete_object.assert_called_once_with(Bucket="mocked_bucket", Key='test_folder/old_image.jpg')
+    # Assert that the old images were listed and deleted with one call
+    mock_s3_client.get_paginator.assert_called_once_with("list_objects_v2")
+    mock_s3_client.delete_objects.assert_called_once_with(
+        Bucket="mocked_bucket",
+        Delete={
+            "Objects": [{"Key": "test_folder/old_image.jpg"}, {"Key": "test_folder/other_image.jpg"}],
+            "Quiet": True,
+        },
+    )
 
     # Assert that S3's put_object was called to upload the new image
-    mock_s3_client.put_object.assert_called_once()
+    assert mock_s3_client.put_object.call_count == VARIANT_COUNT
     assert "https://" in result  # Check if the result is a URL
 
+# A failed upload leaves the old images alone
+@pytest.mark.asyncio
+async def test_update_image_upload_failure_keeps_old_images(mock_s3_client, mock_upload_file):
+    mock_s3_client.get_paginator.return_value.paginate.return_value = [
+        {'Contents': [{'Key': 'test_folder/old_image.jpg'}]}
+    ]
+    mock_s3_client.put_object.side_effect = ClientError({"Error": {"Code": "500"}}, "PutObject")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await update_image(mock_upload_file, "test_folder")
+
+    assert exc_info.value.status_code == 500
+    mock_s3_client.delete_objects.assert_not_called()
+
 # Test the process_image function
 @pytest.mark.asyncio
 async def test_process_image(mock_s3_client, mock_upload_file):
@@ -75,14 +117,14 @@ async def test_process_image(mock_s3_client, mock_upload_file):
     result = await process_image(mock_upload_file, folder)
 
     # Assert that S3's put_object was called
-    mock_s3_client.put_object.assert_called_once()
+    assert mock_s3_client.put_object.call_count == VARIANT_COUNT
 
     # Assert that the returned URL is correct
     assert "https://" in result
 
 # Teste para exceção lançada ao processar uma imagem inválida
 @pytest.mark.asyncio
-async def test_process_image_invalid_image():
+async def test_process_image_invalid_image(mock_s3_client):
     # Simula um arquivo inválido que não pode ser aberto como imagem
     invalid_file = UploadFile(filename="invalid.txt", file=BytesIO(b"not_an_image"))
 
@@ -95,7 +137,7 @@ async def test_process_image_invalid_image():
 
 # Teste para exceção lançada ao usar um formato de imagem não suportado
 @pytest.mark.asyncio
-async def test_process_image_invalid_format(monkeypatch):
+async def test_process_image_invalid_format(mock_s3_client, monkeypatch):
     # Simula uma imagem com formato inválido (não JPEG, PNG, BMP, GIF)
     img_mock = MagicMock()
     img_mock.format = "TIFF"  # Formato não suportado
@@ -115,3 +157,106 @@ async def test_process_image_invalid_format(monkeypatch):
     # Verifica se o status code da exceção é 400 e a mensagem é 'Invalid image format'
     assert exc_info.value.status_code == 400
     assert exc_info.value.detail == "Invalid image format"
+
+# Uploads over the size cap are refused while reading
+@pytest.mark.asyncio
+async def test_read_upload_stops_at_size_cap(mock_upload_file):
+    size = len(mock_upload_file.file.getvalue())
+
+    assert len(await read_upload(mock_upload_file, max_bytes=size)) == size
+
+    mock_upload_file.file.seek(0)
+    with patch("crud.imageRepo.READ_CHUNK_SIZE", 64), pytest.raises(HTTPException) as exc_info:
+        await read_upload(mock_upload_file, max_bytes=size - 1)
+    assert exc_info.value.status_code == 413
+    # Reading stopped at the first chunk over the cap
+    assert mock_upload_file.file.tell() < size + 64
+
+# Images with too many pixels are refused from their header
+@pytest.mark.asyncio
+async def test_process_image_too_many_pixels(mock_s3_client, mock_upload_file):
+    with patch("crud.imageTransform.MAX_IMAGE_PIXELS", 100 * 100 - 1), \
+            patch("crud.imageRepo.transform_image") as transform, \
+            pytest.raises(HTTPException) as exc_info:
+        await process_image(mock_upload_file, "test_folder")
+
+    assert exc_info.value.status_code == 413
+    transform.assert_not_called()
+    mock_s3_client.put_object.assert_not_called()
+
+# JPEGs are decoded at the smallest scale that covers the largest variant
+def test_decode_image_uses_reduced_jpeg_decoding():
+    img_bytes = BytesIO()
+    Image.new('RGB', (800, 600), color='red').save(img_bytes, format='JPEG')
+
+    with patch("crud.imageTransform.IMAGE_VARIANTS", {"full": 200}):
+        img = decode_image(img_bytes.getvalue())
+
+    assert img.size == (200, 150)
+    assert img.mode == "RGB"
+
+# Every variant is reachable from the URL stored on the club or pavilion
+@pytest.mark.asyncio
+@patch("crud.imageRepo.AWS_S3_BUCKET", "mocked_bucket")
+async def test_process_image_variants(mock_s3_client, mock_upload_file):
+    result = await process_image(mock_upload_file, "clubs/1")
+
+    keys = {call.kwargs["Key"] for call in mock_s3_client.put_object.call_args_list}
+    club = ClubInDB(id=1, name="Club", pavilion_id=1, image=result)
+    assert result.endswith("/full.jpg")
+    assert {
+        url.split("amazonaws.com/")[-1]
+        for formats in club.image_variants.values()
+        for url in formats.values()
+    } == keys
+    assert set(club.image_variants["thumb"]) == {"jpg", "webp"}
+
+# The same upload again is found in S3 and neither processed nor uploaded
+@pytest.mark.asyncio
+@patch("crud.imageRepo.AWS_S3_BUCKET", "mocked_bucket")
+async def test_process_image_same_upload_is_not_processed_again(mock_s3_client, mock_upload_file):
+    first = await process_image(mock_upload_file, "clubs/1")
+    primary = mock_s3_client.put_object.call_args_list[-1].kwargs["Key"]
+    assert first.endswith(primary)
+
+    mock_s3_client.reset_mock(side_effect=True)
+    mock_upload_file.file.seek(0)
+    with patch("crud.imageRepo.transform_image") as transform:
+        second = await process_image(mock_upload_file, "clubs/1")
+
+    assert second == first
+    mock_s3_client.head_object.assert_called_once_with(Bucket="mocked_bucket", Key=primary)
+    mock_s3_client.put_object.assert_not_called()
+    transform.assert_not_called()
+
+# Changing how images are processed stores the same upload anew
+def test_content_key_depends_on_processing():
+    with patch("crud.imageTransform.PROCESSING_VERSION", 2):
+        changed = content_key(b"image")
+    assert content_key(b"image") == content_key(b"image") != changed
+
+# Deleting a club or pavilion removes every variant of its images
+@pytest.mark.asyncio
+@patch("crud.imageRepo.AWS_S3_BUCKET", "mocked_bucket")
+async def test_delete_image_folder_removes_every_variant(mock_s3_client, mock_upload_file):
+    await process_image(mock_upload_file, "clubs/1")
+    keys = [call.kwargs["Key"] for call in mock_s3_client.put_object.call_args_list]
+    mock_s3_client.get_paginator.return_value.paginate.return_value = [
+        {"Contents": [{"Key": key} for key in keys]}
+    ]
+
+    delete_image_folder("clubs/1")
+
+    mock_s3_client.get_paginator.return_value.paginate.assert_called_once_with(
+        Bucket="mocked_bucket", Prefix="clubs/1/"
+    )
+    deleted = mock_s3_client.delete_objects.call_args.kwargs["Delete"]["Objects"]
+    assert sorted(obj["Key"] for obj in deleted) == sorted(keys)
+    assert len(keys) == VARIANT_COUNT
+
+# Images stored before variants existed keep their single URL
+def test_variant_urls_of_legacy_image():
+    assert variant_urls("https://bucket.s3.amazonaws.com/clubs/1/abc.jpg") == {
+        "full": {"jpg": "https://bucket.s3.amazonaws.com/clubs/1/abc.jpg"}
+    }
+    assert variant_urls("") == {}
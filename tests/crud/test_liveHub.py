@@ -0,0 +1,82 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from crud.gameRepo import create_game, update_game
+from crud.liveHub import DROPPED, GameLiveHub
+from schemas.game import GameCreate, GameUpdate
+
+
+def frame_data(frame):
+    return json.loads(frame.split("data: ", 1)[1])
+
+
+@pytest.mark.asyncio
+async def test_publish_from_another_thread_reaches_all_subscribers():
+    hub = GameLiveHub(queue_size=4)
+    first, second = hub.subscribe(), hub.subscribe()
+
+    thread = threading.Thread(target=hub.publish, args=({"id": 1, "score_home": 2},))
+    thread.start()
+    thread.join()
+
+    for subscriber in (first, second):
+        frame = await asyncio.wait_for(subscriber.queue.get(), 1)
+        assert frame_data(frame) == {"id": 1, "score_home": 2}
+
+
+@pytest.mark.asyncio
+async def test_game_filter():
+    hub = GameLiveHub(queue_size=4)
+    subscriber = hub.subscribe(game_id=2)
+
+    hub.publish({"id": 1})
+    hub.publish({"id": 2})
+    await asyncio.sleep(0)
+
+    assert subscriber.queue.qsize() == 1
+    assert frame_data(subscriber.queue.get_nowait()) == {"id": 2}
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped():
+    hub = GameLiveHub(queue_size=2)
+    slow, fast = hub.subscribe(), hub.subscribe()
+
+    for score in range(3):
+        hub.publish({"id": 1, "score_home": score})
+        await asyncio.sleep(0)
+        fast.queue.get_nowait()
+
+    async def is_disconnected():
+        return False
+
+    assert hub.subscriber_count == 1
+    assert list(slow.queue._queue) == [DROPPED]
+    frames = [frame async for frame in hub.stream(slow, is_disconnected)]
+    assert frames == ["retry: 3000\n\n"]
+
+
+@pytest.mark.asyncio
+async def test_update_game_publishes_score_changes(sqlite_db, monkeypatch):
+    hub = GameLiveHub(queue_size=4)
+    monkeypatch.setattr("crud.gameRepo.live_hub", hub)
+    subscriber = hub.subscribe()
+    game = create_game(
+        GameCreate(jornada=1, date_time="2099-10-19T22:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False),
+        sqlite_db,
+    )
+
+    update_game(game.id, GameUpdate(jornada=2), sqlite_db)
+    update_game(game.id, GameUpdate(score_home=1, score_visitor=0), sqlite_db)
+    await asyncio.sleep(0)
+
+    assert subscriber.queue.qsize() == 1
+    assert frame_data(subscriber.queue.get_nowait()) == {
+        "id": game.id,
+        "score_home": 1,
+        "score_visitor": 0,
+        "finished": False,
+    }
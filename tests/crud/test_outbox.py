@@ -0,0 +1,165 @@
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from crud.gameRepo import create_game, delete_game, update_game
+from crud.outboxDispatcher import (FileSink, MemorySink, OutboxDispatcher,
+                                   make_sink)
+from crud.outboxRepo import OUTBOX_MAX_ATTEMPTS, utc_now
+from crud.versionRepo import insert_table_versions
+from db.database import Base
+from models.club import Club
+from models.outbox import OutboxEvent
+from models.pavilion import Pavilion
+from schemas.game import GameCreate, GameUpdate
+
+NEW_GAME = GameCreate(jornada=1, date_time="2099-10-19T22:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False)
+
+
+class FailingSink:
+    def publish(self, messages):
+        raise ConnectionError("broker unavailable")
+
+
+def dispatcher_for(db, sink, batch_size=100):
+    return OutboxDispatcher(sessionmaker(bind=db.get_bind()), sink, batch_size=batch_size)
+
+
+def test_game_writes_queue_events(sqlite_db):
+    game = create_game(NEW_GAME, sqlite_db)
+    update_game(game.id, GameUpdate(score_home=1, score_visitor=0, finished=True), sqlite_db)
+    delete_game(game.id, sqlite_db)
+
+    events = sqlite_db.query(OutboxEvent).order_by(OutboxEvent.id).all()
+    assert [event.event_type for event in events] == ["game.created", "game.updated", "game.deleted"]
+    assert events[1].payload["score_home"] == 1
+    assert all(event.dispatched_at is None for event in events)
+
+
+def test_dispatch_publishes_batches(sqlite_db):
+    for day in range(1, 4):
+        create_game(NEW_GAME.model_copy(update={"date_time": datetime(2099, 10, day, 22)}), sqlite_db)
+    sink = MemorySink()
+    dispatcher = dispatcher_for(sqlite_db, sink, batch_size=2)
+
+    assert dispatcher.dispatch_once() == 2
+    assert dispatcher.dispatch_once() == 1
+    assert dispatcher.dispatch_once() == 0
+
+    assert [message["type"] for message in sink.messages] == ["game.created"] * 3
+    assert [message["id"] for message in sink.messages] == [1, 2, 3]
+    assert sink.messages[0]["game"]["club_home_id"] == 1
+
+
+def test_failed_delivery_backs_off(sqlite_db):
+    create_game(NEW_GAME, sqlite_db)
+
+    assert dispatcher_for(sqlite_db, FailingSink()).dispatch_once() == 0
+
+    sqlite_db.expire_all()
+    event = sqlite_db.query(OutboxEvent).one()
+    assert event.attempts == 1
+    assert event.last_error == "broker unavailable"
+    assert event.next_attempt_at > utc_now()
+
+    # Not due yet
+    sink = MemorySink()
+    assert dispatcher_for(sqlite_db, sink).dispatch_once() == 0
+
+    event.next_attempt_at = utc_now() - timedelta(seconds=1)
+    sqlite_db.commit()
+    assert dispatcher_for(sqlite_db, sink).dispatch_once() == 1
+    assert len(sink.messages) == 1
+
+
+def test_event_is_dead_lettered_after_max_attempts(sqlite_db):
+    create_game(NEW_GAME, sqlite_db)
+    event = sqlite_db.query(OutboxEvent).one()
+    event.attempts = OUTBOX_MAX_ATTEMPTS - 1
+    sqlite_db.commit()
+
+    assert dispatcher_for(sqlite_db, FailingSink()).dispatch_once() == 0
+
+    sqlite_db.expire_all()
+    event = sqlite_db.query(OutboxEvent).one()
+    assert event.attempts == OUTBOX_MAX_ATTEMPTS
+    assert event.failed_at is not None
+
+    # Never retried, even once due
+    event.next_attempt_at = utc_now() - timedelta(seconds=1)
+    sqlite_db.commit()
+    assert dispatcher_for(sqlite_db, MemorySink()).dispatch_once() == 0
+
+
+def test_prune_deletes_only_events_delivered_before_retention(sqlite_db):
+    for day in range(1, 4):
+        create_game(NEW_GAME.model_copy(update={"date_time": datetime(2099, 10, day, 22)}), sqlite_db)
+    dispatcher = dispatcher_for(sqlite_db, MemorySink())
+    assert dispatcher.dispatch_once() == 3
+    first, second, third = sqlite_db.query(OutboxEvent).order_by(OutboxEvent.id)
+    first.dispatched_at = second.dispatched_at = utc_now() - timedelta(days=30)
+    sqlite_db.commit()
+
+    assert dispatcher.prune_once() == 2
+
+    assert [event.id for event in sqlite_db.query(OutboxEvent)] == [third.id]
+
+
+def test_file_sink(tmp_path):
+    path = tmp_path / "events.ndjson"
+    sink = make_sink(f"file:{path}")
+
+    assert isinstance(sink, FileSink)
+    sink.publish([{"id": 1}, {"id": 2}])
+    assert [json.loads(line)["id"] for line in path.read_text().splitlines()] == [1, 2]
+    assert isinstance(make_sink("crud.outboxDispatcher:MemorySink"), MemorySink)
+    with pytest.raises(ValueError):
+        make_sink("kafka")
+    assert make_sink("") is None
+
+
+def test_memory_sink_is_bounded():
+    sink = MemorySink(max_messages=2)
+    sink.publish([{"id": 1}, {"id": 2}, {"id": 3}])
+    assert [message["id"] for message in sink.messages] == [2, 3]
+
+
+def test_dispatcher_without_sink_does_not_start(sqlite_db):
+    create_game(NEW_GAME, sqlite_db)
+    dispatcher = dispatcher_for(sqlite_db, None)
+
+    dispatcher.start()
+
+    assert dispatcher._thread is None
+    assert sqlite_db.query(OutboxEvent).one().dispatched_at is None
+
+
+def test_dispatcher_thread_delivers_after_notify(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        insert_table_versions(connection)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with session_factory() as db:
+        db.add(Pavilion(id=1, name="P", location="", image=""))
+        db.add_all(Club(id=i, name=f"C{i}", image="", pavilion_id=1) for i in (1, 2))
+        db.commit()
+        create_game(NEW_GAME, db)
+
+    sink = MemorySink()
+    dispatcher = OutboxDispatcher(session_factory, sink, poll_seconds=60)
+    dispatcher.start()
+    try:
+        dispatcher.notify()
+        deadline = time.monotonic() + 5
+        while not sink.messages and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        dispatcher.stop()
+        engine.dispose()
+
+    assert len(sink.messages) == 1
@@ -0,0 +1,114 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import Session
+
+from crud.gameRepo import create_game, delete_game, update_game
+from crud.standingRepo import (STANDING_FIELDS, get_standings,
+                               rebuild_standings, upsert_standing)
+from schemas.game import GameCreate, GameUpdate
+
+
+@pytest.fixture
+def db(sqlite_db):
+    return sqlite_db
+
+
+def new_game(home, visitor, score_home=None, score_visitor=None, finished=False, day=1):
+    return GameCreate(
+        jornada=day,
+        score_home=score_home,
+        score_visitor=score_visitor,
+        date_time=datetime(2024, 10, day, 22, 0),
+        club_home_id=home,
+        club_visitor_id=visitor,
+        pavilion_id=1,
+        finished=finished,
+    )
+
+
+def table(db):
+    return {
+        s.club_id: (s.played, s.wins, s.draws, s.losses, s.goals_for, s.goals_against, s.points)
+        for s in get_standings(db)
+    }
+
+
+def test_finishing_a_game_updates_standings(db):
+    game = create_game(new_game(1, 2), db)
+    assert table(db) == {}
+
+    update_game(game.id, GameUpdate(score_home=4, score_visitor=2, finished=True), db)
+
+    assert table(db) == {1: (1, 1, 0, 0, 4, 2, 3), 2: (1, 0, 0, 1, 2, 4, 0)}
+
+
+def test_score_correction_and_delete(db):
+    game = create_game(new_game(1, 2, 4, 2, finished=True), db)
+    create_game(new_game(3, 1, 1, 1, finished=True, day=2), db)
+
+    update_game(game.id, GameUpdate(score_home=2, score_visitor=2), db)
+    assert table(db) == {
+        1: (2, 0, 2, 0, 3, 3, 2),
+        2: (1, 0, 1, 0, 2, 2, 1),
+        3: (1, 0, 1, 0, 1, 1, 1),
+    }
+
+    delete_game(game.id, db)
+    assert table(db) == {
+        1: (1, 0, 1, 0, 1, 1, 1),
+        2: (0, 0, 0, 0, 0, 0, 0),
+        3: (1, 0, 1, 0, 1, 1, 1),
+    }
+
+
+def test_rebuild_matches_incremental(db):
+    create_game(new_game(1, 2, 4, 2, finished=True), db)
+    create_game(new_game(2, 3, 0, 5, finished=True, day=2), db)
+    create_game(new_game(3, 1, day=3), db)
+    incremental = table(db)
+
+    standings = rebuild_standings(db)
+
+    assert table(db) == incremental
+    assert [s.club_id for s in standings] == [3, 1, 2]
+
+
+def test_standings_are_kept_per_season(db):
+    create_game(new_game(1, 2, 1, 0, finished=True), db)
+    next_season = new_game(2, 1, 2, 0, finished=True)
+    next_season.date_time = datetime(2025, 10, 1, 22, 0)
+    create_game(next_season, db)
+
+    assert {s.club_id: s.points for s in get_standings(db, "2024-25")} == {1: 3, 2: 0}
+    assert {s.club_id: s.points for s in get_standings(db, "2025-26")} == {1: 0, 2: 3}
+
+
+def test_results_update_standings_in_club_order(db):
+    create_game(new_game(1, 2, 1, 0, finished=True), db)
+    game = create_game(new_game(2, 1, day=2), db)
+
+    parameters = []
+    event.listen(
+        db.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, statement, params, *args: statement.startswith("INSERT INTO standings") and parameters.append(params),
+    )
+    # The home row (club 2) comes first in the result, but is locked second
+    update_game(game.id, GameUpdate(score_home=0, score_visitor=3, finished=True), db)
+
+    assert [params[1] for params in parameters] == [1, 2]
+
+
+def test_upsert_standing_on_mysql_is_one_statement():
+    db = MagicMock(spec=Session)
+    db.get_bind.return_value.dialect.name = "mysql"
+
+    upsert_standing(db, "2024-25", 1, {field: 1 for field in STANDING_FIELDS})
+
+    statement = str(db.execute.call_args.args[0].compile(dialect=mysql.dialect()))
+    assert statement.startswith("INSERT INTO standings")
+    assert "ON DUPLICATE KEY UPDATE played = (standings.played + VALUES(played))" in statement
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from sqlalchemy.orm import sessionmaker
+
+from crud.uploadProcessor import UploadProcessor
+from crud.uploadRepo import complete_upload, create_upload, get_upload
+from models.change import Change
+from models.club import Club
+from models.upload import ImageUpload
+
+IMAGE_URL = "https://bucket.s3.amazonaws.com/clubs/1/abc/full.jpg"
+
+
+@pytest.fixture
+def mock_s3():
+    s3 = MagicMock()
+    s3.generate_presigned_post.return_value = {"url": "https://bucket.s3.amazonaws.com/", "fields": {"key": "uploads/1"}}
+    s3.get_object.return_value = {"ContentLength": 5, "Body": MagicMock(read=MagicMock(return_value=b"image"))}
+    with patch("crud.uploadRepo.s3", s3), patch("crud.uploadProcessor.s3", s3):
+        yield s3
+
+
+def processor_for(db):
+    return UploadProcessor(sessionmaker(bind=db.get_bind()))
+
+
+def queued_upload(db):
+    upload = create_upload("club", 1, db)["upload"]
+    return complete_upload(upload.id, db).id
+
+
+def test_create_upload_returns_presigned_form(sqlite_db, mock_s3):
+    ticket = create_upload("club", 1, sqlite_db)
+
+    assert ticket["upload"].status == "pending"
+    assert ticket["fields"] == {"key": "uploads/1"}
+    kwargs = mock_s3.generate_presigned_post.call_args.kwargs
+    assert kwargs["Key"] == f"uploads/{ticket['upload'].id}"
+    assert kwargs["Conditions"][0][0] == "content-length-range"
+
+    with pytest.raises(HTTPException) as exc_info:
+        create_upload("pavilion", 99, sqlite_db)
+    assert exc_info.value.status_code == 404
+
+
+def test_complete_upload_needs_the_file(sqlite_db, mock_s3):
+    upload = create_upload("club", 1, sqlite_db)["upload"]
+    mock_s3.head_object.side_effect = ClientError({"Error": {"Code": "404"}}, "HeadObject")
+
+    with pytest.raises(HTTPException) as exc_info:
+        complete_upload(upload.id, sqlite_db)
+    assert exc_info.value.status_code == 400
+    assert get_upload(upload.id, sqlite_db).status == "pending"
+
+    mock_s3.head_object.side_effect = None
+    assert complete_upload(upload.id, sqlite_db).status == "queued"
+    # Completing twice is harmless
+    assert complete_upload(upload.id, sqlite_db).status == "queued"
+
+
+@patch("crud.uploadProcessor.update_image", new_callable=AsyncMock)
+def test_processed_upload_becomes_the_club_image(update_image, sqlite_db, mock_s3):
+    update_image.return_value = IMAGE_URL
+    upload_id = queued_upload(sqlite_db)
+    processor = processor_for(sqlite_db)
+
+    assert processor.process_once() is True
+    assert processor.process_once() is False
+
+    update_image.assert_awaited_once_with(b"image", "clubs/1")
+    sqlite_db.expire_all()
+    upload = get_upload(upload_id, sqlite_db)
+    assert (upload.status, upload.image, upload.attempts) == ("done", IMAGE_URL, 1)
+    assert sqlite_db.get(Club, 1).image == IMAGE_URL
+    assert sqlite_db.query(Change).filter(Change.entity == "club").one().data["image"] == IMAGE_URL
+    assert mock_s3.delete_object.call_args.kwargs["Key"] == f"uploads/{upload_id}"
+
+
+@patch("crud.uploadProcessor.update_image", new_callable=AsyncMock)
+def test_rejected_image_fails_without_retry(update_image, sqlite_db, mock_s3):
+    update_image.side_effect = HTTPException(status_code=400, detail="Invalid image")
+    upload_id = queued_upload(sqlite_db)
+
+    processor_for(sqlite_db).process_once()
+
+    sqlite_db.expire_all()
+    upload = get_upload(upload_id, sqlite_db)
+    assert (upload.status, upload.error) == ("failed", "Invalid image")
+    assert sqlite_db.get(Club, 1).image == ""
+
+
+@patch("crud.uploadProcessor.IMAGE_UPLOAD_MAX_ATTEMPTS", 2)
+@patch("crud.uploadProcessor.update_image", new_callable=AsyncMock)
+def test_transient_errors_are_retried(update_image, sqlite_db, mock_s3):
+    update_image.side_effect = ConnectionError("S3 unavailable")
+    upload_id = queued_upload(sqlite_db)
+    processor = processor_for(sqlite_db)
+
+    assert processor.process_once() is True
+    sqlite_db.expire_all()
+    upload = get_upload(upload_id, sqlite_db)
+    assert (upload.status, upload.attempts) == ("queued", 1)
+    assert upload.next_attempt_at > datetime.utcnow()
+    # Not due yet
+    assert processor.process_once() is False
+
+    upload.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    sqlite_db.commit()
+    processor.process_once()
+
+    sqlite_db.expire_all()
+    upload = get_upload(upload_id, sqlite_db)
+    assert (upload.status, upload.attempts, upload.error) == ("failed", 2, "S3 unavailable")
+    mock_s3.delete_object.assert_called_once()
+
+
+def test_abandoned_processing_upload_is_claimed_again(sqlite_db, mock_s3):
+    upload_id = queued_upload(sqlite_db)
+    upload = sqlite_db.get(ImageUpload, upload_id)
+    # A worker died while processing it
+    upload.status, upload.attempts = "processing", 1
+    upload.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    sqlite_db.commit()
+
+    with patch("crud.uploadProcessor.update_image", new_callable=AsyncMock, return_value=IMAGE_URL):
+        assert processor_for(sqlite_db).process_once() is True
+
+    sqlite_db.expire_all()
+    upload = get_upload(upload_id, sqlite_db)
+    assert (upload.status, upload.attempts) == ("done", 2)
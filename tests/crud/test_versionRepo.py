@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import pytest
+
+from crud.gameRepo import create_game, delete_game
+from crud.versionRepo import (VERSIONED_TABLES, bump_table_version,
+                              get_row_updated_at, get_table_version,
+                              insert_table_versions, make_etag)
+from models.game import Game
+from models.version import TableVersion
+from schemas.game import GameCreate
+
+
+def test_bump_table_version(sqlite_db):
+    assert get_table_version(sqlite_db, "clubs")[0] == 0
+
+    bump_table_version(sqlite_db, "clubs")
+    bump_table_version(sqlite_db, "clubs")
+    sqlite_db.commit()
+
+    version, updated_at = get_table_version(sqlite_db, "clubs")
+    assert version == 2
+    assert isinstance(updated_at, datetime)
+
+
+def test_insert_table_versions_only_adds_missing_rows(sqlite_db):
+    bump_table_version(sqlite_db, "clubs")
+    sqlite_db.commit()
+
+    insert_table_versions(sqlite_db)
+
+    assert sqlite_db.query(TableVersion).count() == len(VERSIONED_TABLES)
+    assert get_table_version(sqlite_db, "clubs")[0] == 1
+
+
+def test_bump_table_version_without_row_raises(sqlite_db):
+    with pytest.raises(RuntimeError):
+        bump_table_version(sqlite_db, "unknown")
+
+
+def test_game_writes_bump_games_version(sqlite_db):
+    game = create_game(
+        GameCreate(jornada=1, date_time="2099-10-19T22:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False),
+        sqlite_db,
+    )
+    assert get_table_version(sqlite_db, "games")[0] == 1
+    assert get_row_updated_at(sqlite_db, Game, game.id) is not None
+
+    delete_game(game.id, sqlite_db)
+    assert get_table_version(sqlite_db, "games")[0] == 2
+    assert get_row_updated_at(sqlite_db, Game, game.id) is None
+
+
+def test_make_etag_is_weak_and_stable():
+    assert make_etag("games", 1) == make_etag("games", 1)
+    assert make_etag("games", 1) != make_etag("games", 2)
+    assert make_etag("games", 1).startswith('W/"')
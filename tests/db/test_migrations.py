@@ -0,0 +1,119 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from crud.versionRepo import VERSIONED_TABLES
+from db.migrations import (LATEST_VERSION, current_version, migrate,
+                           migration_lock)
+from models.club import Club
+from models.game import Game
+from models.pavilion import Pavilion
+from models.standing import Standing
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_migrate_fresh_database(engine):
+    assert migrate(engine) is True
+
+    tables = set(inspect(engine).get_table_names())
+    assert {"pavilions", "clubs", "games", "games_archive", "standings", "table_versions"} <= tables
+    with engine.connect() as connection:
+        assert current_version(connection) == LATEST_VERSION
+        versions = connection.execute(text("SELECT table_name, version FROM table_versions")).all()
+    assert sorted(versions) == sorted((name, 0) for name in VERSIONED_TABLES)
+
+    # Already current: nothing to do
+    assert migrate(engine) is False
+
+
+def test_migrate_adds_missing_table_versions_rows(engine):
+    # A database that applied migration 9 before the rows were inserted
+    migrate(engine)
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE table_versions SET version = 4 WHERE table_name = 'games'"))
+        connection.execute(text("DELETE FROM table_versions WHERE table_name != 'games'"))
+        connection.execute(text("DELETE FROM schema_migrations WHERE version >= 10"))
+
+    assert migrate(engine) is True
+
+    with engine.connect() as connection:
+        versions = dict(connection.execute(text("SELECT table_name, version FROM table_versions")).all())
+    assert versions == {name: 4 if name == "games" else 0 for name in VERSIONED_TABLES}
+
+
+def test_migrate_adds_outbox_failed_at(engine):
+    # An outbox created by migration 6 before events could be dead-lettered
+    migrate(engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE outbox"))
+        connection.execute(text(
+            "CREATE TABLE outbox (id INTEGER PRIMARY KEY, event_type VARCHAR(32) NOT NULL, "
+            "aggregate_id INTEGER NOT NULL, payload JSON NOT NULL, "
+            "created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP, attempts INTEGER NOT NULL, "
+            "next_attempt_at DATETIME NOT NULL, dispatched_at DATETIME, last_error TEXT)"
+        ))
+        connection.execute(text("CREATE INDEX ix_outbox_pending ON outbox (dispatched_at, next_attempt_at, id)"))
+        connection.execute(text("DELETE FROM schema_migrations WHERE version = 11"))
+
+    assert migrate(engine) is True
+
+    assert "failed_at" in {column["name"] for column in inspect(engine).get_columns("outbox")}
+    assert {index["name"] for index in inspect(engine).get_indexes("outbox")} == {"ix_outbox_due"}
+
+
+def test_migrate_database_created_before_migrations(engine):
+    # Tables made by the old create_all: games without season or indexes,
+    # standings keyed by club only
+    Pavilion.metadata.create_all(engine, tables=[Pavilion.__table__, Club.__table__])
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE games (id INTEGER PRIMARY KEY, jornada INTEGER NOT NULL, "
+            "score_home INTEGER, score_visitor INTEGER, date_time DATETIME NOT NULL, "
+            "club_home_id INTEGER NOT NULL REFERENCES clubs (id), "
+            "club_visitor_id INTEGER NOT NULL REFERENCES clubs (id), "
+            "pavilion_id INTEGER NOT NULL REFERENCES pavilions (id), finished BOOLEAN NOT NULL, "
+            "updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        connection.execute(text(
+            "CREATE TABLE standings (club_id INTEGER PRIMARY KEY, played INTEGER, wins INTEGER, "
+            "draws INTEGER, losses INTEGER, goals_for INTEGER, goals_against INTEGER, points INTEGER)"
+        ))
+    with sessionmaker(bind=engine)() as session:
+        session.add(Pavilion(id=1, name="P", location="", image=""))
+        session.add_all(Club(id=i, name=f"C{i}", image="", pavilion_id=1) for i in (1, 2))
+        session.commit()
+    with engine.begin() as connection:
+        for game_id, date_time in ((1, "2024-05-19 22:00:00"), (2, "2024-10-19 22:00:00")):
+            connection.execute(text(
+                "INSERT INTO games (id, jornada, score_home, score_visitor, date_time, club_home_id, "
+                "club_visitor_id, pavilion_id, finished) VALUES (:id, 1, 3, 1, :date_time, 1, 2, 1, 1)"
+            ), {"id": game_id, "date_time": date_time})
+
+    assert migrate(engine) is True
+
+    indexes = {index["name"] for index in inspect(engine).get_indexes("games")}
+    assert {index.name for index in Game.__table__.indexes} <= indexes
+    assert "ix_games_jornada_date_time_id" not in indexes
+    with sessionmaker(bind=engine)() as session:
+        assert [game.season for game in session.query(Game).order_by(Game.id)] == ["2023-24", "2024-25"]
+        assert session.get(Standing, ("2023-24", 1)).points == 3
+        assert session.get(Standing, ("2024-25", 2)).losses == 1
+
+
+def test_migration_lock_times_out():
+    connection = MagicMock()
+    connection.dialect.name = "mysql"
+    connection.scalar.return_value = 0
+
+    with pytest.raises(RuntimeError):
+        with migration_lock(connection, timeout=1):
+            pass
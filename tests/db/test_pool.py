@@ -0,0 +1,76 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+
+from db.pool import MeteredQueuePool, engine_options, instrument_engine, pool_stats
+from main import app
+
+
+@pytest.fixture
+def metered_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=MeteredQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+        pool_logging_name="test",
+    )
+    stats = instrument_engine(engine, "test")
+    yield engine, stats
+    pool_stats.pop("test")
+    engine.dispose()
+
+
+def test_engine_options_for_mysql():
+    options = engine_options("mysql+pymysql://user:secret@db/games", "primary")
+
+    assert options["poolclass"] is MeteredQueuePool
+    assert options["pool_pre_ping"] is True
+    assert options["pool_recycle"] == 1800
+    assert options["pool_logging_name"] == "primary"
+
+
+def test_engine_options_for_sqlite():
+    assert "pool_size" not in engine_options("sqlite://", "primary")
+
+
+def test_pool_stats_track_checkouts_and_timeouts(metered_engine):
+    engine, stats = metered_engine
+
+    with engine.connect() as connection:
+        connection.execute(text("select 1"))
+        assert stats.snapshot()["checked_out"] == 1
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    snapshot = stats.snapshot()
+    assert snapshot["checkouts"] == 1
+    assert snapshot["connects"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["checked_out"] == 0
+    assert snapshot["checkout_wait_max_ms"] >= 50
+
+
+def test_pool_stats_track_invalidations(metered_engine):
+    engine, stats = metered_engine
+
+    with engine.connect() as connection:
+        connection.invalidate()
+
+    assert stats.snapshot()["invalidations"] == 1
+
+
+def test_pool_stats_follow_dispose(metered_engine):
+    engine, stats = metered_engine
+    engine.dispose()
+
+    assert stats.pool is engine.pool
+
+
+def test_db_pool_health_endpoint(metered_engine):
+    response = TestClient(app).get("/health/db-pool")
+
+    assert response.status_code == 200
+    assert response.json()["test"]["size"] == 1
+    assert "primary" in response.json()
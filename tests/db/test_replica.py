@@ -0,0 +1,135 @@
+import pytest
+from sqlalchemy import create_engine, exc, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.database import AsyncSessionLocal, Base, to_async_url
+from db.replica import ReplicaSet, RoutingSession
+from models.pavilion import Pavilion
+
+
+def make_engine(path, name):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add(Pavilion(id=1, name=name, location="", image=""))
+        session.commit()
+    return engine
+
+
+@pytest.fixture
+def engines(tmp_path):
+    engines = [
+        make_engine(tmp_path / f"{name}.db", name)
+        for name in ("primary", "replica-1", "replica-2")
+    ]
+    yield engines
+    for engine in engines:
+        engine.dispose()
+
+
+def pavilion_name(session):
+    return session.scalar(select(Pavilion.name).where(Pavilion.id == 1))
+
+
+def sessions(engines, lag_seconds=0):
+    primary, *replica_engines = engines
+    replicas = ReplicaSet(replica_engines, lag_seconds=lag_seconds)
+    return (
+        sessionmaker(class_=RoutingSession, bind=primary, replicas=replicas),
+        sessionmaker(class_=RoutingSession, bind=primary, replicas=replicas, use_replicas=True),
+        replicas,
+    )
+
+
+def test_reads_round_robin_over_replicas(engines):
+    _, read_session, _ = sessions(engines)
+
+    names = []
+    for _ in range(4):
+        with read_session() as session:
+            names.append(pavilion_name(session))
+            # A session keeps the replica it started on
+            assert pavilion_name(session) == names[-1]
+
+    assert names == ["replica-1", "replica-2", "replica-1", "replica-2"]
+
+
+def test_write_sessions_use_primary(engines):
+    write_session, _, _ = sessions(engines)
+
+    with write_session() as session:
+        assert pavilion_name(session) == "primary"
+
+
+def test_read_session_is_pinned_after_write(engines):
+    _, read_session, _ = sessions(engines)
+
+    with read_session() as session:
+        session.add(Pavilion(id=2, name="new", location="", image=""))
+        session.flush()
+
+        assert pavilion_name(session) == "primary"
+        assert session.get(Pavilion, 2).name == "new"
+
+
+def test_select_for_update_uses_primary(engines):
+    _, read_session, _ = sessions(engines)
+
+    with read_session() as session:
+        session.query(Pavilion).with_for_update().first()
+        assert session.pinned
+        assert pavilion_name(session) == "primary"
+
+
+def test_reads_stay_on_primary_after_recent_write(engines):
+    write_session, read_session, _ = sessions(engines, lag_seconds=60)
+
+    with read_session() as session:
+        assert pavilion_name(session) == "replica-1"
+
+    with write_session() as session:
+        session.get(Pavilion, 1).name = "renamed"
+        session.commit()
+
+    with read_session() as session:
+        assert pavilion_name(session) == "renamed"
+
+
+@pytest.mark.asyncio
+async def test_reads_stay_on_primary_after_recent_async_write(engines):
+    _, read_session, replicas = sessions(engines, lag_seconds=60)
+    async_engine = create_async_engine(to_async_url(str(engines[0].url)))
+
+    async with AsyncSessionLocal(bind=async_engine, replicas=replicas) as session:
+        (await session.get(Pavilion, 1)).name = "renamed"
+        await session.commit()
+    await async_engine.dispose()
+
+    with read_session() as session:
+        assert pavilion_name(session) == "renamed"
+
+
+def test_failed_replica_is_ejected(engines, tmp_path):
+    primary, replica, _ = engines
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replicas = ReplicaSet([broken, replica])
+    read_session = sessionmaker(class_=RoutingSession, bind=primary, replicas=replicas, use_replicas=True)
+
+    with read_session() as session:
+        with pytest.raises(exc.OperationalError):
+            pavilion_name(session)
+
+    assert not replicas.is_healthy(broken)
+    for _ in range(3):
+        with read_session() as session:
+            assert pavilion_name(session) == "replica-1"
+
+
+def test_all_replicas_ejected_falls_back_to_primary(engines):
+    _, read_session, replicas = sessions(engines)
+    for engine in replicas.engines:
+        replicas.eject(engine)
+
+    with read_session() as session:
+        assert pavilion_name(session) == "primary"
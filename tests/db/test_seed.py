@@ -0,0 +1,80 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from crud.changeRepo import get_changes
+from crud.gameSchedule import schedule_index
+from crud.versionRepo import get_table_version, insert_table_versions
+from db.database import Base
+from db.seed import DEFAULT_SNAPSHOT, load_snapshot, seed
+from models.club import Club
+from models.game import Game
+from models.pavilion import Pavilion
+from models.standing import Standing
+
+
+@pytest.fixture
+def empty_db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        insert_table_versions(connection)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    schedule_index.invalidate()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@patch("db.seed.process_image", new_callable=AsyncMock)
+def test_seed_default_snapshot(mock_process_image, empty_db):
+    mock_process_image.side_effect = lambda data, folder: f"https://bucket/{folder}/image.jpg"
+    snapshot = load_snapshot(DEFAULT_SNAPSHOT)
+
+    result = seed(snapshot, empty_db, workers=4)
+
+    assert result == {"inserted": len(snapshot["games"]), "errors": []}
+    assert empty_db.query(Pavilion).count() == len(snapshot["pavilions"])
+    assert empty_db.query(Game).count() == len(snapshot["games"])
+    assert empty_db.get(Club, 3).image == "https://bucket/clubs/3/image.jpg"
+    assert empty_db.get(Pavilion, 8).image == "https://bucket/pavilions/8/image.jpg"
+    assert mock_process_image.call_count == 28
+    assert get_table_version(empty_db, "clubs")[0] == 1
+
+    # A consumer of the full history sees pavilions and clubs before games
+    changes = get_changes(empty_db, limit=1000)["changes"]
+    assert [change.entity for change in changes] == (
+        ["pavilion"] * len(snapshot["pavilions"])
+        + ["club"] * len(snapshot["clubs"])
+        + ["game"] * len(snapshot["games"])
+    )
+    assert changes[len(snapshot["pavilions"]) + 2].data["image"] == "https://bucket/clubs/3/image.jpg"
+
+
+def test_seed_without_images(empty_db, tmp_path):
+    snapshot_path = tmp_path / "snapshot.json"
+    snapshot_path.write_text(
+        '{"pavilions": [{"id": 1, "name": "P", "location": "L"}],'
+        ' "clubs": [{"id": 1, "name": "A", "pavilion_id": 1}, {"id": 2, "name": "B", "pavilion_id": 1}],'
+        ' "games": [{"jornada": 1, "date_time": "2024-10-19 22:00:00", "club_home_id": 1,'
+        ' "club_visitor_id": 2, "pavilion_id": 1, "score_home": 2, "score_visitor": 2, "finished": true},'
+        ' {"jornada": 1, "date_time": "2024-10-19 22:00:00", "club_home_id": 1,'
+        ' "club_visitor_id": 9, "pavilion_id": 1, "finished": false}]}'
+    )
+
+    result = seed(load_snapshot(snapshot_path), empty_db, workers=1, with_images=False)
+
+    assert result["inserted"] == 1
+    assert result["errors"] == [{"row": 2, "detail": "club_visitor_id 9 does not exist"}]
+    assert empty_db.get(Club, 2).image == ""
+    assert empty_db.get(Standing, ("2024-25", 2)).draws == 1
+
+
+def test_load_snapshot_requires_ids(tmp_path):
+    snapshot_path = tmp_path / "snapshot.json"
+    snapshot_path.write_text('{"clubs": [{"name": "A", "pavilion_id": 1}]}')
+
+    with pytest.raises(ValueError):
+        load_snapshot(snapshot_path)
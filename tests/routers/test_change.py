@@ -0,0 +1,45 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from db.database import get_db, get_read_db
+from main import app
+from models.change import Change as ChangeModel
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module")
+def mock_db():
+    db = MagicMock(spec=Session)
+    db.execute.return_value.first.return_value = None
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_read_db] = lambda: db
+    yield db
+
+@pytest.fixture(autouse=True)
+def reset_mock_db(mock_db):
+    mock_db.reset_mock()
+
+def test_get_changes(mock_db):
+    changes = [
+        ChangeModel(id=7, entity="club", entity_id=1, operation="upsert", data={"id": 1, "name": "Club", "pavilion_id": 1, "image": ""}, changed_at=datetime(2024, 10, 19)),
+        ChangeModel(id=8, entity="club", entity_id=2, operation="delete", data=None, changed_at=datetime(2024, 10, 19)),
+    ]
+    mock_db.query.return_value.filter.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = changes
+
+    response = client.get("/changes?since=6&entity=club&limit=5")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [change["id"] for change in data["changes"]] == [7, 8]
+    assert data["changes"][1]["data"] is None
+    assert data["next_since"] == 8
+    assert data["has_more"] is False
+
+def test_get_changes_invalid_entity(mock_db):
+    response = client.get("/changes?entity=standing")
+
+    assert response.status_code == 422
@@ -1,10 +1,12 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from db.database import get_db
+from db.database import get_async_db, get_db, get_read_db
+from crud.imageRepo import delete_image_folder
 from main import app
 from models.club import Club as ClubModel
 
@@ -14,13 +16,25 @@ client = TestClient(app)
 @pytest.fixture(scope="module")
 def mock_db():
     db = MagicMock(spec=Session)
+    db.execute.return_value.first.return_value = None
     app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_read_db] = lambda: db
+    yield db
+
+
+@pytest.fixture(scope="module")
+def mock_async_db(mock_db):
+    db = AsyncMock(spec=AsyncSession)
+    # The async repositories run the sync ones on the session's connection
+    db.run_sync.side_effect = lambda fn, *args, **kwargs: fn(mock_db, *args, **kwargs)
+    app.dependency_overrides[get_async_db] = lambda: db
     yield db
 
 
 @pytest.fixture(autouse=True)
-def reset_mock_db(mock_db):
+def reset_mock_db(mock_db, mock_async_db):
     mock_db.reset_mock()
+    mock_async_db.reset_mock()
 
 
 def create_club(mock_db):
@@ -31,7 +45,8 @@ def create_club(mock_db):
         pavilion_id=1,
         image="../images/test_club.jpg",
     )
-    mock_db.add.return_value = None  # Não precisa retornar nada
+    # O id é atribuído ao inserir, antes de registar a alteração
+    mock_db.add.side_effect = lambda obj: setattr(obj, "id", 1)
     mock_db.commit.return_value = None
     mock_db.refresh.side_effect = lambda obj: setattr(
         obj, "id", 1
@@ -40,7 +55,7 @@ def create_club(mock_db):
 
 # Teste para criação de clube
 @patch("crud.imageRepo.process_image")
-def test_create_club(mock_process_image, mock_db):
+def test_create_club(mock_process_image, mock_db, mock_async_db):
     mock_process_image.return_value = "../images/test_club.jpg"
 
     create_club(mock_db=mock_db)
@@ -151,7 +166,7 @@ def test_get_all_clubs(mock_db):
 @patch("crud.imageRepo.process_image")
 @patch("crud.imageRepo.s3")
 @patch("crud.imageRepo.AWS_S3_BUCKET", "mocked_bucket")
-def test_update_club(mock_s3, mock_process_image, mock_db):
+def test_update_club(mock_s3, mock_process_image, mock_db, mock_async_db):
     mock_process_image.return_value = "path/to/new_club_image.jpg"
 
     club_data = ClubModel(
@@ -176,7 +191,7 @@ def test_update_club(mock_s3, mock_process_image, mock_db):
     assert mock_db.commit.called is True
 
 
-def test_update_club_not_found(mock_db):
+def test_update_club_not_found(mock_db, mock_async_db):
     mock_db.query.return_value.filter.return_value.first.return_value = None
 
     response = client.put(
@@ -193,8 +208,8 @@ def test_update_club_not_found(mock_db):
 
 
 # Teste para deletar um clube
-@patch("crud.clubRepo.s3_client.delete_object")
-def test_delete_club(mock_s3_delete, mock_db):
+@patch("crud.clubRepo.s3_executor")
+def test_delete_club(mock_s3_executor, mock_db):
     club_data = ClubModel(
         id=1, name="Test Club", pavilion_id=1, image="path/to/image.jpg"
     )
@@ -207,7 +222,7 @@ def test_delete_club(mock_s3_delete, mock_db):
     assert data["detail"] == "Club deleted successfully"
     assert mock_db.delete.called is True
     assert mock_db.commit.called is True
-    assert mock_s3_delete.called is True
+    mock_s3_executor.submit.assert_called_once_with(delete_image_folder, "clubs/1")
 
 
 def test_delete_club_not_found(mock_db):
@@ -217,3 +232,25 @@ def test_delete_club_not_found(mock_db):
 
     assert response.status_code == 404
     assert response.json()["detail"] == "Club not found"
+
+
+def test_get_club_calendar_not_modified(mock_db):
+    club_data = ClubModel(id=1, name="Test Club", pavilion_id=1, image="image.jpg")
+    mock_db.query.return_value.filter.return_value.first.return_value = club_data
+    mock_db.query.return_value.order_by.return_value.all.return_value = []
+    mock_db.execute.return_value.first.return_value = MagicMock(
+        version=1, updated_at=None
+    )
+
+    try:
+        response = client.get("/clubs/1/games.ics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/calendar")
+        assert response.text.startswith("BEGIN:VCALENDAR")
+
+        response = client.get(
+            "/clubs/1/games.ics", headers={"If-None-Match": response.headers["ETag"]}
+        )
+        assert response.status_code == 304
+    finally:
+        mock_db.execute.return_value.first.return_value = None
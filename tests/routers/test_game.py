@@ -1,24 +1,37 @@
-from unittest.mock import MagicMock, patch
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from db.database import get_db
+from crud.gameRepo import decode_game_cursor, encode_game_cursor
+from crud.gameSchedule import schedule_index
+from db.database import get_async_db, get_db, get_read_db
 from main import app
+from models.club import Club as ClubModel
 from models.game import Game as GameModel
+from models.pavilion import Pavilion as PavilionModel
 
 client = TestClient(app)
 
 @pytest.fixture(scope="module")
 def mock_db():
     db = MagicMock(spec=Session)
+    db.execute.return_value.first.return_value = None
     app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_read_db] = lambda: db
+    # Game writes run the sync repository on the async session's connection
+    async_db = AsyncMock(spec=AsyncSession)
+    async_db.run_sync.side_effect = lambda fn, *args, **kwargs: fn(db, *args, **kwargs)
+    app.dependency_overrides[get_async_db] = lambda: async_db
     yield db
 
 @pytest.fixture(autouse=True)
 def reset_mock_db(mock_db):
     mock_db.reset_mock()
+    schedule_index.invalidate()
 
 def create_game(mock_db):
     # Simulando um objeto Game do SQLAlchemy com ID
@@ -33,7 +46,7 @@ def create_game(mock_db):
         pavilion_id=1,
         finished=False
     )
-    mock_db.add.return_value = None  # Não precisa retornar nada
+    mock_db.add.side_effect = lambda obj: setattr(obj, "id", 1)  # O ID é necessário antes do commit, para o registo de alterações
     mock_db.commit.return_value = None
     mock_db.refresh.side_effect = lambda obj: setattr(obj, "id", 1)  # Simulando o refresh para atribuir o ID
 
@@ -95,28 +108,41 @@ def test_get_game_by_id_not_found(mock_db):
     assert response.json()["detail"] == "Game not found"
 
 def test_get_next_game(mock_db):
-    game_data = GameModel(id=1, jornada=1, score_home=None, score_visitor=None, date_time="2023-10-10T10:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False)
-    mock_db.query.return_value.filter.return_value.order_by.return_value.first.return_value = game_data
+    game_data = [
+        GameModel(id=1, jornada=1, score_home=2, score_visitor=1, date_time="2023-10-10T10:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=True),
+        GameModel(id=2, jornada=2, score_home=None, score_visitor=None, date_time="2099-10-10T10:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False),
+        GameModel(id=3, jornada=3, score_home=None, score_visitor=None, date_time="2099-10-17T10:00:00", club_home_id=2, club_visitor_id=1, pavilion_id=2, finished=False)
+    ]
+    mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = game_data
 
     response = client.get("/games/next")
 
-    print(response.json())  # Debugging statement to print the response JSON
-
     assert response.status_code == 200
     data = response.json()
-    assert data["id"] == 1
-    assert data["jornada"] == 1
+    assert data["id"] == 2
+    assert data["jornada"] == 2
     assert data["score_home"] is None
     assert data["score_visitor"] is None
-    assert data["date_time"] == "2023-10-10T10:00:00"
+    assert data["date_time"] == "2099-10-10T10:00:00"
     assert data["club_home_id"] == 1
     assert data["club_visitor_id"] == 2
     assert data["pavilion_id"] == 1
     assert data["finished"] is False
     assert mock_db.query.called is True
 
+def test_get_next_game_served_from_index(mock_db):
+    game_data = [
+        GameModel(id=2, jornada=2, score_home=None, score_visitor=None, date_time="2099-10-10T10:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False)
+    ]
+    mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = game_data
+
+    assert client.get("/games/next").json()["id"] == 2
+    assert client.get("/games/exclude-next").json() == []
+    assert client.get("/games/next").json()["id"] == 2
+    assert mock_db.query.call_count == 1
+
 def test_get_next_game_not_found(mock_db):
-    mock_db.query.return_value.filter.return_value.order_by.return_value.first.return_value = None
+    mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = []
 
     response = client.get("/games/next")
     assert response.status_code == 404
@@ -127,7 +153,7 @@ def test_get_all_games(mock_db):
         GameModel(id=1, jornada=1, score_home=2, score_visitor=1, date_time="2023-10-10T10:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False),
         GameModel(id=2, jornada=2, score_home=3, score_visitor=2, date_time="2023-10-11T10:00:00", club_home_id=3, club_visitor_id=4, pavilion_id=2, finished=True)
     ]
-    mock_db.query.return_value.all.return_value = game_data
+    mock_db.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = game_data
 
     response = client.get("/games")
 
@@ -136,15 +162,45 @@ def test_get_all_games(mock_db):
     assert len(data) == 2
     assert data[0]["id"] == 1
     assert data[1]["id"] == 2
+    assert "X-Next-Cursor" not in response.headers
     assert mock_db.query.called is True
 
+def test_get_all_games_full_page_returns_cursor(mock_db):
+    game_data = [
+        GameModel(id=1, jornada=1, score_home=2, score_visitor=1, date_time=datetime(2023, 10, 10, 10, 0), club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False),
+        GameModel(id=2, jornada=2, score_home=3, score_visitor=2, date_time=datetime(2023, 10, 11, 10, 0), club_home_id=3, club_visitor_id=4, pavilion_id=2, finished=True)
+    ]
+    mock_db.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = game_data
+
+    response = client.get("/games?limit=2")
+
+    assert response.status_code == 200
+    cursor = response.headers["X-Next-Cursor"]
+    assert decode_game_cursor(cursor) == (datetime(2023, 10, 11, 10, 0), 2)
+
+def test_get_all_games_with_filters_and_cursor(mock_db):
+    cursor = encode_game_cursor(GameModel(id=7, date_time=datetime(2023, 10, 10, 10, 0)))
+    mock_db.query.return_value.order_by.return_value.limit.return_value.all.return_value = []
+
+    response = client.get(f"/games?jornada=1&club_id=3&cursor={cursor}")
+
+    assert response.status_code == 200
+    assert response.json() == []
+    # The filters and cursor go inside the per-club-column union
+    assert mock_db.query.return_value.filter.call_count == 0
+
+def test_get_all_games_invalid_cursor(mock_db):
+    response = client.get("/games?cursor=not-a-cursor")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
 def test_get_all_games_except_next(mock_db):
-    next_game = GameModel(id=1, jornada=1, score_home=None, score_visitor=None, date_time="2025-10-10T10:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False)
     game_data = [
-        GameModel(id=2, jornada=2, score_home=None, score_visitor=None, date_time="2025-10-11T10:00:00", club_home_id=3, club_visitor_id=4, pavilion_id=2, finished=False)
+        GameModel(id=1, jornada=1, score_home=None, score_visitor=None, date_time="2099-10-10T10:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False),
+        GameModel(id=2, jornada=2, score_home=None, score_visitor=None, date_time="2099-10-11T10:00:00", club_home_id=3, club_visitor_id=4, pavilion_id=2, finished=False)
     ]
-    mock_db.query.return_value.filter.return_value.order_by.return_value.first.return_value = next_game
-    mock_db.query.return_value.filter.return_value.all.return_value = game_data
+    mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = game_data
 
     response = client.get("/games/exclude-next")
 
@@ -154,9 +210,20 @@ def test_get_all_games_except_next(mock_db):
     assert data[0]["id"] == 2
     assert mock_db.query.called is True
 
+def test_get_all_games_except_next_without_upcoming_game(mock_db):
+    game_data = [
+        GameModel(id=1, jornada=1, score_home=2, score_visitor=1, date_time="2023-10-10T10:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=True)
+    ]
+    mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = game_data
+
+    response = client.get("/games/exclude-next")
+
+    assert response.status_code == 200
+    assert [game["id"] for game in response.json()] == [1]
+
 def test_update_game(mock_db):
     game_data = GameModel(id=1, jornada=1, score_home=2, score_visitor=1, date_time="2023-10-10T10:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False)
-    mock_db.query.return_value.filter.return_value.first.return_value = game_data
+    mock_db.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = game_data
 
     response = client.put(
         "/games/1",
@@ -185,7 +252,7 @@ def test_update_game(mock_db):
     assert mock_db.commit.called is True
 
 def test_update_game_not_found(mock_db):
-    mock_db.query.return_value.filter.return_value.first.return_value = None
+    mock_db.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = None
 
     response = client.put(
         "/games/999",
@@ -207,7 +274,7 @@ def test_update_game_not_found(mock_db):
 # Teste para eliminar um jogo
 def test_delete_game(mock_db):
     game_data = GameModel(id=1, jornada=1, score_home=2, score_visitor=1, date_time="2023-10-10T10:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False)
-    mock_db.query.return_value.filter.return_value.first.return_value = game_data
+    mock_db.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = game_data
 
     response = client.delete("/games/1")
 
@@ -218,9 +285,121 @@ def test_delete_game(mock_db):
     assert mock_db.commit.called is True
 
 def test_delete_game_not_found(mock_db):
-    mock_db.query.return_value.filter.return_value.first.return_value = None
+    mock_db.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = None
 
     response = client.delete("/games/999")
 
     assert response.status_code == 404
-    assert response.json()["detail"] == "Game not found"
\ No newline at end of file
+    assert response.json()["detail"] == "Game not found"
+def test_bulk_create_games_unknown_format(mock_db):
+    response = client.post("/games/bulk", files={"file": ("games.txt", b"jornada\n1\n", "text/plain")})
+
+    assert response.status_code == 400
+    assert mock_db.commit.called is False
+
+def test_bulk_create_games(mock_db):
+    mock_db.query.return_value.__iter__.side_effect = lambda: iter([(1,), (2,)])
+    mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = []
+
+    try:
+        response = client.post(
+            "/games/bulk",
+            files={"file": ("games.csv", b"jornada,date_time,club_home_id,club_visitor_id,pavilion_id\n1,2099-10-10T10:00:00,1,2,1\n", "text/csv")}
+        )
+    finally:
+        mock_db.query.return_value.__iter__.side_effect = None
+
+    assert response.status_code == 200
+    assert response.json() == {"inserted": 1, "errors": []}
+    # Pavilion and club locks, the conflict scan and the insert
+    assert mock_db.execute.call_count == 4
+    assert mock_db.commit.called is True
+
+def test_get_game_by_id_not_modified(mock_db):
+    game_data = GameModel(id=1, jornada=1, score_home=None, score_visitor=None, date_time="2023-10-10T10:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False)
+    mock_db.query.return_value.filter.return_value.first.return_value = game_data
+    mock_db.execute.return_value.first.return_value = MagicMock(version=3, updated_at=datetime(2024, 10, 1, 12, 0))
+
+    try:
+        response = client.get("/games/1")
+        assert response.status_code == 200
+        assert response.headers["Last-Modified"] == "Tue, 01 Oct 2024 12:00:00 GMT"
+        etag = response.headers["ETag"]
+
+        mock_db.reset_mock()
+        response = client.get("/games/1", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert mock_db.query.called is False
+
+        mock_db.execute.return_value.first.return_value = MagicMock(version=4, updated_at=datetime(2024, 10, 1, 12, 5))
+        response = client.get("/games/1", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+    finally:
+        mock_db.execute.return_value.first.return_value = None
+
+def test_get_all_games_not_modified_since(mock_db):
+    mock_db.execute.return_value.first.return_value = MagicMock(version=3, updated_at=datetime(2024, 10, 1, 12, 0))
+
+    try:
+        response = client.get("/games", headers={"If-Modified-Since": "Tue, 01 Oct 2024 12:00:00 GMT"})
+        assert response.status_code == 304
+        assert mock_db.query.called is False
+
+        response = client.get("/games", headers={"If-Modified-Since": "Tue, 01 Oct 2024 11:59:59 GMT"})
+        assert response.status_code == 200
+    finally:
+        mock_db.execute.return_value.first.return_value = None
+
+def test_get_next_game_ignores_if_modified_since(mock_db):
+    game_data = [
+        GameModel(id=2, jornada=2, score_home=None, score_visitor=None, date_time="2099-10-10T10:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False)
+    ]
+    mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = game_data
+    mock_db.execute.return_value.first.return_value = MagicMock(version=3, updated_at=datetime(2024, 10, 1, 12, 0))
+
+    try:
+        # The next game changes with the clock, so only the ETag can validate it
+        for path in ("/games/next", "/games/exclude-next"):
+            response = client.get(path, headers={"If-Modified-Since": "Tue, 01 Oct 2024 12:00:00 GMT"})
+            assert response.status_code == 200
+            assert "Last-Modified" not in response.headers
+
+            response = client.get(path, headers={"If-None-Match": response.headers["ETag"]})
+            assert response.status_code == 304
+    finally:
+        mock_db.execute.return_value.first.return_value = None
+
+def test_get_game_by_id_without_expand_has_no_nested_fields(mock_db):
+    game_data = GameModel(id=1, jornada=1, score_home=None, score_visitor=None, date_time="2023-10-10T10:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False)
+    mock_db.query.return_value.filter.return_value.first.return_value = game_data
+
+    response = client.get("/games/1")
+
+    assert response.status_code == 200
+    assert "club_home" not in response.json()
+    assert "pavilion" not in response.json()
+
+def test_get_game_by_id_expand_clubs_and_pavilion(mock_db):
+    game_data = GameModel(id=1, jornada=1, score_home=None, score_visitor=None, date_time="2023-10-10T10:00:00", club_home_id=1, club_visitor_id=2, pavilion_id=1, finished=False)
+    clubs = [ClubModel(id=1, name="Club 1", pavilion_id=1, image="club1.jpg"), ClubModel(id=2, name="Club 2", pavilion_id=2, image="club2.jpg")]
+    pavilions = [PavilionModel(id=1, name="Pavilion 1", location="Location 1", image="pavilion1.jpg")]
+    mock_db.query.return_value.filter.return_value.first.return_value = game_data
+    mock_db.query.return_value.filter.return_value.__iter__.side_effect = [iter(clubs), iter(pavilions)]
+
+    try:
+        response = client.get("/games/1?expand=clubs,pavilion")
+    finally:
+        mock_db.query.return_value.filter.return_value.__iter__.side_effect = None
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["club_home"]["name"] == "Club 1"
+    assert data["club_visitor"]["name"] == "Club 2"
+    assert data["pavilion"]["name"] == "Pavilion 1"
+
+def test_get_all_games_invalid_expand(mock_db):
+    response = client.get("/games?expand=referee")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cannot expand: referee"
@@ -1,10 +1,12 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from db.database import get_db
+from db.database import get_async_db, get_db, get_read_db
+from crud.imageRepo import delete_image_folder
 from main import app
 from models.pavilion import Pavilion as PavilionModel
 from schemas.pavilion import CreatePavilion
@@ -14,12 +16,24 @@ client = TestClient(app)
 @pytest.fixture(scope="module")
 def mock_db():
     db = MagicMock(spec=Session)
+    db.execute.return_value.first.return_value = None
     app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_read_db] = lambda: db
     yield db
 
+@pytest.fixture(scope="module")
+def mock_async_db(mock_db):
+    db = AsyncMock(spec=AsyncSession)
+    # The async repositories run the sync ones on the session's connection
+    db.run_sync.side_effect = lambda fn, *args, **kwargs: fn(mock_db, *args, **kwargs)
+    app.dependency_overrides[get_async_db] = lambda: db
+    yield db
+
+
 @pytest.fixture(autouse=True)
-def reset_mock_db(mock_db):
+def reset_mock_db(mock_db, mock_async_db):
     mock_db.reset_mock()
+    mock_async_db.reset_mock()
 
 
 # Teste para criar um pavilhão
@@ -31,13 +45,14 @@ def create_pavilion(mock_db):
         location="Test Location",
         image="../images/batata_pavilhao.jpg",
     )
-    mock_db.add.return_value = None  # Não precisa retornar nada
+    # O id é atribuído ao inserir, antes de registar a alteração
+    mock_db.add.side_effect = lambda obj: setattr(obj, "id", 1)
     mock_db.commit.return_value = None
     mock_db.refresh.side_effect = lambda obj: setattr(obj, "id", 1)  # Simulando o refresh para atribuir o ID
 
 # Teste para criação de pavilhão
-@patch("crud.pavilionRepo.create_image")
-def test_create_pavilion(mock_create_image, mock_db):
+@patch("crud.asyncPavilionRepo.create_image")
+def test_create_pavilion(mock_create_image, mock_db, mock_async_db):
     mock_create_image.return_value = "../images/batata_pavilhao.jpg"
 
     create_pavilion(mock_db=mock_db)
@@ -117,7 +132,7 @@ def test_get_pavilion_by_id_not_found(mock_db):
 @patch("crud.imageRepo.process_image")
 @patch("crud.imageRepo.s3")
 @patch("crud.imageRepo.AWS_S3_BUCKET", "mocked_bucket")
-def test_update_pavilion(mock_s3, mock_process_image, mock_db):
+def test_update_pavilion(mock_s3, mock_process_image, mock_db, mock_async_db):
     mock_process_image.return_value = "path/to/new_pavilion_image.jpg"
 
     pavilion_data = PavilionModel(id=1, name="Test Pavilion", location="Test Location", image="path/to/image.jpg")
@@ -143,8 +158,8 @@ def test_update_pavilion(mock_s3, mock_process_image, mock_db):
 
 
 # Teste para eliminar um pavilhão
-@patch("crud.pavilionRepo.s3_client.delete_object")
-def test_delete_pavilion(mock_s3_delete, mock_db):
+@patch("crud.pavilionRepo.s3_executor")
+def test_delete_pavilion(mock_s3_executor, mock_db):
     pavilion_data = PavilionModel(id=1, name="Test Pavilion", location="Test Location", image="https://clubs-and-pavilions-photos-bucket.s3.amazonaws.com/pavilions/1/test_image.jpg")
     mock_db.query.return_value.filter.return_value.first.return_value = pavilion_data
 
@@ -155,7 +170,7 @@ def test_delete_pavilion(mock_s3_delete, mock_db):
     assert data["detail"] == "Pavilion deleted successfully"
     assert mock_db.delete.called is True
     assert mock_db.commit.called is True
-    assert mock_s3_delete.called is True
+    mock_s3_executor.submit.assert_called_once_with(delete_image_folder, "pavilions/1")
 
 def test_delete_pavilion_not_found(mock_db):
     mock_db.query.return_value.filter.return_value.first.return_value = None
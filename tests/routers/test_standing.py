@@ -0,0 +1,51 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from db.database import get_db, get_read_db
+from main import app
+from models.standing import Standing as StandingModel
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module")
+def mock_db():
+    db = MagicMock(spec=Session)
+    db.execute.return_value.first.return_value = None
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_read_db] = lambda: db
+    yield db
+
+@pytest.fixture(autouse=True)
+def reset_mock_db(mock_db):
+    mock_db.reset_mock()
+
+def test_get_standings(mock_db):
+    standings = [
+        StandingModel(season="2024-25", club_id=1, played=2, wins=2, draws=0, losses=0, goals_for=7, goals_against=2, points=6),
+        StandingModel(season="2024-25", club_id=2, played=2, wins=0, draws=0, losses=2, goals_for=2, goals_against=7, points=0)
+    ]
+    mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = standings
+
+    response = client.get("/standings?season=2024-25")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 2
+    assert data[0]["season"] == "2024-25"
+    assert data[0]["club_id"] == 1
+    assert data[0]["points"] == 6
+    assert data[0]["goal_difference"] == 5
+    assert data[1]["goal_difference"] == -5
+
+def test_rebuild_standings(mock_db):
+    mock_db.query.return_value.filter.return_value.__iter__.return_value = iter([])
+    mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = []
+
+    response = client.post("/standings/rebuild")
+
+    assert response.status_code == 200
+    assert response.json() == []
+    assert mock_db.commit.called is True
@@ -0,0 +1,67 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from db.database import get_db, get_read_db
+from main import app
+from models.club import Club as ClubModel
+from models.upload import ImageUpload
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module")
+def mock_db():
+    db = MagicMock(spec=Session)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_read_db] = lambda: db
+    yield db
+
+@pytest.fixture(autouse=True)
+def reset_mock_db(mock_db):
+    mock_db.reset_mock(return_value=True, side_effect=True)
+
+def upload_record(**values):
+    return ImageUpload(**{"id": 7, "target": "club", "target_id": 1, "status": "pending", "attempts": 0, "created_at": datetime(2024, 10, 19), "updated_at": datetime(2024, 10, 19), **values})
+
+@patch("crud.uploadRepo.s3")
+def test_create_club_image_upload(mock_s3, mock_db):
+    mock_db.get.return_value = ClubModel(id=1, name="Club", pavilion_id=1, image="")
+    mock_db.refresh.side_effect = lambda upload: upload.__dict__.update(upload_record().__dict__)
+    mock_s3.generate_presigned_post.return_value = {"url": "https://bucket.s3.amazonaws.com/", "fields": {"key": "uploads/7", "policy": "p"}}
+
+    response = client.post("/clubs/1/image-uploads")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["upload"]["id"] == 7
+    assert data["upload"]["status"] == "pending"
+    assert data["fields"]["key"] == "uploads/7"
+
+def test_create_image_upload_for_missing_pavilion(mock_db):
+    mock_db.get.return_value = None
+
+    response = client.post("/pavilions/99/image-uploads")
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Pavilion not found"
+
+@patch("crud.uploadRepo.s3")
+def test_complete_image_upload(mock_s3, mock_db):
+    mock_db.get.return_value = upload_record()
+
+    response = client.post("/image-uploads/7/complete")
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "queued"
+    mock_s3.head_object.assert_called_once()
+
+def test_get_image_upload(mock_db):
+    mock_db.get.return_value = upload_record(status="done", image="https://bucket.s3.amazonaws.com/clubs/1/abc/full.jpg")
+
+    response = client.get("/image-uploads/7")
+
+    assert response.status_code == 200
+    assert response.json()["image"].endswith("/full.jpg")